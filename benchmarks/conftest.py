@@ -0,0 +1,273 @@
+"""
+Benchmarks harness.
+
+Each benchmark uses the ``benchmark`` fixture to time a callable:
+
+.. code-block:: python
+
+    def test_something(benchmark):
+        benchmark(func, *args, **kwargs)
+
+The callable is run for at least ``--benchmark-min-rounds`` rounds and ``--benchmark-min-time`` seconds,
+unless ``benchmark.pedantic(func, rounds=...)`` is used to pass the exact number of rounds, for example,
+for slow operations.
+
+The results are written, as JSON, to ``--benchmark-json``, by default under ``artifacts/benchmarks/``,
+and, when ``--benchmark-compare`` is passed a previous results file, the median of each benchmark is
+compared against it.
+"""
+import datetime
+import json
+import logging
+import os
+import pathlib
+import platform
+import statistics
+import subprocess
+import time
+
+import attr
+import pytest
+
+log = logging.getLogger(__name__)
+
+BENCHMARKS_PATH = pathlib.Path(__file__).resolve().parent
+REPO_ROOT = BENCHMARKS_PATH.parent
+RESULTS_FORMAT_VERSION = 1
+
+
+@attr.s(kw_only=True, slots=True)
+class Benchmark:
+    """
+    Time a callable.
+    """
+
+    name = attr.ib()
+    group = attr.ib(default=None)
+    min_rounds = attr.ib(default=5)
+    min_time = attr.ib(default=1.0)
+    extra_info = attr.ib(factory=dict)
+    timings = attr.ib(init=False, repr=False, factory=list)
+
+    def __call__(self, func, *args, **kwargs):
+        """
+        Time ``func(*args, **kwargs)``, calibrating the number of rounds.
+        """
+        result = None
+        started_at = time.perf_counter()
+        while len(self.timings) < self.min_rounds or time.perf_counter() - started_at < self.min_time:
+            result = self._time(func, args, kwargs)
+        return result
+
+    def pedantic(self, func, args=(), kwargs=None, setup=None, teardown=None, rounds=1):
+        """
+        Time ``func(*args, **kwargs)`` exactly ``rounds`` times.
+
+        ``setup`` and ``teardown``, if passed, run before and after each round, and are not timed.
+        """
+        result = None
+        for _ in range(rounds):
+            if setup is not None:
+                setup()
+            try:
+                result = self._time(func, args, kwargs or {})
+            finally:
+                if teardown is not None:
+                    teardown()
+        return result
+
+    def _time(self, func, args, kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.timings.append(time.perf_counter() - start)
+        return result
+
+    def stats(self):
+        """
+        Return the timing statistics, in seconds.
+        """
+        timings = self.timings
+        median = statistics.median(timings)
+        return {
+            "rounds": len(timings),
+            "min": min(timings),
+            "max": max(timings),
+            "mean": statistics.mean(timings),
+            "median": median,
+            "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+            "ops": 1 / median if median else None,
+        }
+
+    def to_dict(self):
+        """
+        Return the benchmark result as a JSON serializable dictionary.
+        """
+        return {
+            "name": self.name,
+            "group": self.group,
+            "extra_info": self.extra_info,
+            "stats": self.stats(),
+        }
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("Salt Factories Benchmarks")
+    group.addoption(
+        "--benchmark-json",
+        type=pathlib.Path,
+        default=None,
+        help="Where to write the results. Defaults to artifacts/benchmarks/<timestamp>.json",
+    )
+    group.addoption(
+        "--benchmark-compare",
+        type=pathlib.Path,
+        default=None,
+        help="A previous results file to compare the medians against",
+    )
+    group.addoption(
+        "--benchmark-compare-fail",
+        type=float,
+        default=None,
+        help="Fail the run if any median is slower, by more than this percentage, than the compared results",
+    )
+    group.addoption(
+        "--benchmark-min-rounds",
+        type=int,
+        default=5,
+        help="The minimum number of rounds of each calibrated benchmark",
+    )
+    group.addoption(
+        "--benchmark-min-time",
+        type=float,
+        default=1.0,
+        help="The minimum time, in seconds, to run each calibrated benchmark for",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "benchmark_group(name): The group the benchmark results are reported under"
+    )
+    config._benchmarks = []  # pylint: disable=protected-access
+
+
+@pytest.fixture
+def benchmark(request):
+    marker = request.node.get_closest_marker("benchmark_group")
+    _benchmark = Benchmark(
+        name=request.node.nodeid,
+        group=marker.args[0] if marker else request.module.__name__.rpartition(".")[-1],
+        min_rounds=request.config.getoption("--benchmark-min-rounds"),
+        min_time=request.config.getoption("--benchmark-min-time"),
+    )
+    yield _benchmark
+    if _benchmark.timings:
+        request.config._benchmarks.append(_benchmark)  # pylint: disable=protected-access
+
+
+def _machine_info():
+    # Do not move these deferred imports, this way, the import time is not accounted for
+    import salt.version  # pylint: disable=import-outside-toplevel
+
+    import saltfactories  # pylint: disable=import-outside-toplevel
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],  # noqa: S603,S607
+            cwd=str(REPO_ROOT),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "salt": salt.version.__version__,
+        "saltfactories": saltfactories.__version__,
+        "commit": commit,
+    }
+
+
+def _compare(results, previous):
+    """
+    Return a ``(name, previous_median, median, change_percent)`` tuple per benchmark.
+    """
+    previous_medians = {
+        benchmark["name"]: benchmark["stats"]["median"] for benchmark in previous["benchmarks"]
+    }
+    comparison = []
+    for benchmark in results["benchmarks"]:
+        name = benchmark["name"]
+        median = benchmark["stats"]["median"]
+        previous_median = previous_medians.get(name)
+        if previous_median is None:
+            comparison.append((name, None, median, None))
+            continue
+        change = (median - previous_median) / previous_median * 100
+        comparison.append((name, previous_median, median, change))
+    return comparison
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_sessionfinish(session):
+    config = session.config
+    benchmarks = config._benchmarks  # pylint: disable=protected-access
+    if not benchmarks:
+        return
+    results = {
+        "version": RESULTS_FORMAT_VERSION,
+        "datetime": datetime.datetime.now(tz=datetime.timezone.utc).isoformat(),
+        "machine_info": _machine_info(),
+        "benchmarks": [benchmark.to_dict() for benchmark in benchmarks],
+    }
+    json_path = config.getoption("--benchmark-json")
+    if json_path is None:
+        timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")  # noqa: DTZ005
+        json_path = REPO_ROOT / "artifacts" / "benchmarks" / f"{timestamp}.json"
+    json_path.parent.mkdir(parents=True, exist_ok=True)
+    json_path.write_text(json.dumps(results, indent=2, sort_keys=True))
+    config._benchmark_results = (results, json_path)  # pylint: disable=protected-access
+    compare_path = config.getoption("--benchmark-compare")
+    if compare_path is None:
+        return
+    comparison = _compare(results, json.loads(compare_path.read_text()))
+    config._benchmark_comparison = (compare_path, comparison)  # pylint: disable=protected-access
+    fail_percent = config.getoption("--benchmark-compare-fail")
+    if fail_percent is None:
+        return
+    if any(change is not None and change > fail_percent for _, _, _, change in comparison):
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    try:
+        results, json_path = config._benchmark_results  # pylint: disable=protected-access
+    except AttributeError:
+        return
+    terminalreporter.section("Benchmarks")
+    for benchmark in results["benchmarks"]:
+        stats = benchmark["stats"]
+        terminalreporter.write_line(
+            f"{benchmark['name']}: median={stats['median']:.6f}s min={stats['min']:.6f}s "
+            f"rounds={stats['rounds']}"
+        )
+    terminalreporter.write_line(f"Benchmark results written to {json_path}")
+    try:
+        compare_path, comparison = config._benchmark_comparison  # pylint: disable=protected-access
+    except AttributeError:
+        return
+    fail_percent = config.getoption("--benchmark-compare-fail")
+    terminalreporter.section(f"Benchmarks compared to {compare_path}")
+    for name, previous_median, median, change in comparison:
+        if change is None:
+            terminalreporter.write_line(f"{name}: {median:.6f}s (new)")
+            continue
+        terminalreporter.write_line(
+            f"{name}: {previous_median:.6f}s -> {median:.6f}s ({change:+.1f}%)",
+            red=fail_percent is not None and change > fail_percent,
+        )
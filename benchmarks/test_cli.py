@@ -0,0 +1,36 @@
+"""
+Salt CLI benchmarks.
+"""
+import json
+
+import pytest
+
+from saltfactories.utils import random_string
+
+
+@pytest.fixture(scope="module")
+def salt_master(salt_factories):
+    # Not started, only its configuration is needed
+    return salt_factories.salt_master_daemon(random_string("master-"))
+
+
+@pytest.fixture
+def salt_cli(salt_master):
+    return salt_master.salt_cli()
+
+
+def test_cmdline(benchmark, salt_cli):
+    benchmark(salt_cli.cmdline, "test.ping", minion_tgt="*")
+
+
+@pytest.mark.parametrize("minions", [1, 100, 1000])
+def test_process_output(benchmark, salt_cli, minions):
+    # Like salt's JSON outputter, one document per minion, spanning several lines
+    stdout = "\n".join(
+        json.dumps({f"minion-{num}": {"foo": list(range(50)), "bar": "x" * 256}}, indent=0)
+        for num in range(minions)
+    )
+    cmdline = salt_cli.cmdline("test.ping", minion_tgt="*")
+    stdout, stderr, json_out = benchmark(salt_cli.process_output, stdout, "", cmdline=cmdline)
+    assert len(json_out) == minions
+    benchmark.extra_info["stdout_bytes"] = len(stdout)
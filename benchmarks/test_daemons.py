@@ -0,0 +1,29 @@
+"""
+Salt daemons start-to-ready benchmarks.
+"""
+import pytest
+
+from saltfactories.utils import random_string
+
+
+@pytest.fixture(scope="module")
+def salt_master(salt_factories):
+    factory = salt_factories.salt_master_daemon(random_string("master-"))
+    with factory.started():
+        yield factory
+
+
+def test_master_start(benchmark, salt_factories):
+    factory = salt_factories.salt_master_daemon(random_string("master-"))
+    try:
+        benchmark.pedantic(factory.start, teardown=factory.terminate, rounds=3)
+    finally:
+        factory.terminate()
+
+
+def test_minion_start(benchmark, salt_master):
+    factory = salt_master.salt_minion_daemon(random_string("minion-"))
+    try:
+        benchmark.pedantic(factory.start, teardown=factory.terminate, rounds=3)
+    finally:
+        factory.terminate()
@@ -0,0 +1,69 @@
+"""
+Event listener benchmarks.
+"""
+import time
+
+import pytest
+
+from saltfactories.plugins.event_listener import EventListener
+
+
+def _payload(num, daemon_id="master"):
+    jid = f"2022100911374{num:07d}"
+    return {
+        "id": daemon_id,
+        "tag": f"salt/job/{jid}/ret/minion-{num % 10}",
+        "data": {
+            "jid": jid,
+            "id": f"minion-{num % 10}",
+            "fun": "test.ping",
+            "return": True,
+            "retcode": 0,
+            "_stamp": time.time(),
+        },
+    }
+
+
+@pytest.fixture(params=[False, True], ids=["deque", "columnar"])
+def columnar_store(request):
+    return request.param
+
+
+def _filled_listener(store_size, columnar_store):
+    # The event listener is not started, the payloads are processed directly
+    listener = EventListener(columnar_store=columnar_store)
+    for num in range(store_size):
+        listener._process_event_payload(_payload(num, daemon_id=f"master-{num % 4}"))
+    return listener
+
+
+def test_process_event_payload(benchmark, columnar_store):
+    listener = EventListener(columnar_store=columnar_store)
+    payloads = [_payload(num) for num in range(1000)]
+
+    def _process():
+        for payload in payloads:
+            # The listener doesn't modify the payload
+            listener._process_event_payload(payload)
+
+    benchmark(_process)
+    benchmark.extra_info["events_per_round"] = len(payloads)
+
+
+@pytest.mark.parametrize("store_size", [1000, 10000])
+def test_get_events(benchmark, store_size, columnar_store):
+    listener = _filled_listener(store_size, columnar_store)
+    patterns = [("master-1", "salt/job/*/ret/minion-1"), ("master-2", "salt/job/*/ret/minion-3")]
+    found = benchmark(listener.get_events, patterns, after_time=0.0)
+    assert found
+    benchmark.extra_info["store_size"] = store_size
+
+
+@pytest.mark.parametrize("store_size", [1000, 10000])
+def test_wait_for_events(benchmark, store_size, columnar_store):
+    listener = _filled_listener(store_size, columnar_store)
+    last = _payload(store_size - 1, daemon_id=f"master-{(store_size - 1) % 4}")
+    patterns = [(last["id"], last["tag"])]
+    matched = benchmark(listener.wait_for_events, patterns, timeout=5, after_time=0.0)
+    assert matched.found_all_events
+    benchmark.extra_info["store_size"] = store_size
@@ -0,0 +1,37 @@
+"""
+Salt loaders benchmarks.
+"""
+import pytest
+
+from saltfactories.utils import random_string
+from saltfactories.utils.functional import Loaders
+
+
+@pytest.fixture(scope="module")
+def minion_opts(salt_factories):
+    # Not started, only its configuration is needed
+    factory = salt_factories.salt_minion_daemon(
+        random_string("minion-"), overrides={"file_client": "local"}
+    )
+    return factory.config.copy()
+
+
+@pytest.fixture(scope="module")
+def loaders(minion_opts):
+    return Loaders(minion_opts)
+
+
+def test_construction(benchmark, minion_opts):
+    benchmark.pedantic(Loaders, args=(minion_opts,), rounds=3)
+
+
+def test_reload_all(benchmark, loaders):
+    benchmark.pedantic(loaders.reload_all, rounds=5)
+
+
+def test_reload_all_and_call(benchmark, loaders):
+    def _reload_and_call():
+        loaders.reload_all()
+        return loaders.modules.test.ping()
+
+    assert benchmark.pedantic(_reload_and_call, rounds=5) is True
@@ -0,0 +1,97 @@
+"""
+Log server and log handler benchmarks.
+"""
+import logging
+import threading
+
+import pytest
+
+from saltfactories.plugins.log_server import LogServer
+from saltfactories.utils.saltext.log_handlers.pytest_log_handler import ZMQHandler
+
+RECORDS_PER_ROUND = 1000
+
+
+class CountingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+        self.expected = None
+        self.done = threading.Event()
+
+    def emit(self, record):
+        self.count += 1
+        if self.expected is not None and self.count >= self.expected:
+            self.done.set()
+
+
+@pytest.fixture
+def log_server():
+    server = LogServer(log_level=logging.DEBUG)
+    server.start()
+    try:
+        yield server
+    finally:
+        server.stop()
+
+
+@pytest.fixture
+def counting_handler():
+    handler = CountingHandler()
+    logger = logging.getLogger("saltfactories.benchmarks.ingest")
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    try:
+        yield handler
+    finally:
+        logger.removeHandler(handler)
+
+
+@pytest.fixture
+def zmq_handler(log_server):
+    handler = ZMQHandler(port=log_server.log_port, socket_hwm=RECORDS_PER_ROUND * 100)
+    try:
+        yield handler
+    finally:
+        handler.close()
+
+
+def _record(num):
+    return logging.LogRecord(
+        "saltfactories.benchmarks.ingest",
+        logging.INFO,
+        __file__,
+        num,
+        "Benchmark log message %s with some payload %s",
+        (num, "x" * 64),
+        None,
+    )
+
+
+def test_zmq_handler_emit(benchmark, zmq_handler):
+    records = [_record(num) for num in range(RECORDS_PER_ROUND)]
+
+    def _emit():
+        for record in records:
+            zmq_handler.emit(record)
+
+    benchmark(_emit)
+    assert zmq_handler.dropped_messages_count == 0
+    benchmark.extra_info["records_per_round"] = RECORDS_PER_ROUND
+
+
+def test_log_server_ingest(benchmark, zmq_handler, counting_handler):
+    records = [_record(num) for num in range(RECORDS_PER_ROUND)]
+
+    def _setup():
+        counting_handler.done.clear()
+        counting_handler.expected = counting_handler.count + RECORDS_PER_ROUND
+
+    def _ingest():
+        for record in records:
+            zmq_handler.emit(record)
+        assert counting_handler.done.wait(30)
+
+    benchmark.pedantic(_ingest, setup=_setup, rounds=10)
+    benchmark.extra_info["records_per_round"] = RECORDS_PER_ROUND
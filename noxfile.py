@@ -292,6 +292,32 @@ def tests(session):
             shutil.copyfile(str(COVERAGE_REPORT_DB), str(ARTIFACTS_DIR / ".coverage"))
 
 
+@nox.session(python="3")
+def benchmarks(session):
+    """
+    Run the benchmarks.
+
+    The results are written to ``artifacts/benchmarks/``. Pass ``--benchmark-compare=<path>`` to
+    compare against a previous run.
+    """
+    if SKIP_REQUIREMENTS_INSTALL is False:
+        session.install("wheel", silent=PIP_INSTALL_SILENT)
+        session.install("-e", ".", SALT_REQUIREMENT, silent=PIP_INSTALL_SILENT)
+        session.install(
+            "-r", os.path.join("requirements", "tests.txt"), silent=PIP_INSTALL_SILENT
+        )
+    args = [
+        "--rootdir",
+        str(REPO_ROOT),
+        "--show-capture=no",
+        "-ra",
+    ]
+    if session._runner.global_config.forcecolor:
+        args.append("--color=yes")
+    args.extend(session.posargs or ["benchmarks/"])
+    session.run("python", "-m", "pytest", *args)
+
+
 def _lint(session, rcfile, extra_args, paths):
     python_version_info = _get_session_python_version_info(session)
     if python_version_info < (3, 11):
@@ -4,11 +4,14 @@ CLI Entry Point.
 The ``salt-factories`` CLI script is meant to be used to get an absolute path to the directory containing
 ``sitecustomize.py`` so that it can be injected into ``PYTHONPATH`` when running tests to track subprocesses
 code coverage.
+
+The ``firehose`` sub-command runs the :py:mod:`event listener load generator <saltfactories.utils.firehose>`.
 """
 import argparse
 import sys
 
 import saltfactories
+from saltfactories.utils import firehose
 
 
 def main():
@@ -21,7 +24,13 @@ def main():
         action="store_true",
         help="Prints the path to where the sitecustomize.py is to trigger coverage tracking on sub-processes.",
     )
+    subparsers = parser.add_subparsers(dest="command")
+    firehose_parser = subparsers.add_parser("firehose", help="Event listener load generator")
+    firehose.add_arguments(firehose_parser)
     options = parser.parse_args()
+    if options.command == "firehose":
+        firehose.run_from_options(options)
+        parser.exit(status=0)
     if options.coverage:
         print(str(saltfactories.CODE_ROOT_DIR / "utils" / "coverage"), file=sys.stdout, flush=True)
         parser.exit(status=0)
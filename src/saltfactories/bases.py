@@ -14,6 +14,7 @@ import psutil
 import pytest
 import yaml
 from pytestshellutils.exceptions import FactoryNotStarted
+from pytestshellutils.exceptions import FactoryTimeout
 from pytestshellutils.shell import Daemon
 from pytestshellutils.shell import DaemonImpl
 from pytestshellutils.shell import ScriptSubprocess
@@ -23,7 +24,9 @@ from pytestshellutils.utils import time
 from pytestshellutils.utils.processes import ProcessResult
 from pytestshellutils.utils.processes import terminate_process
 
+from saltfactories.utils import jsonstream
 from saltfactories.utils import running_username
+from saltfactories.utils import tracing
 
 log = logging.getLogger(__name__)
 
@@ -119,6 +122,8 @@ class SaltCli(SaltMixin, ScriptSubprocess):
 
     :param bool hard_crash:
         Pass ``--hard-crash`` to Salt's CLI's
+    :param ~saltfactories.utils.zygote.CliZygote zygote:
+        When passed, the CLI is run in a child forked from this zygote instead of in a new subprocess
 
     Please look at :py:class:`~saltfactories.bases.Salt` and
     :py:class:`~pytestshellutils.shell.ScriptSubprocess` for the additional supported keyword
@@ -130,6 +135,7 @@ class SaltCli(SaltMixin, ScriptSubprocess):
     display_name = attr.ib(init=False, default=None)
     _minion_tgt = attr.ib(repr=False, init=False, default=None)
     merge_json_output = attr.ib(repr=False, default=True)
+    zygote = attr.ib(repr=False, default=None)
 
     __cli_timeout_supported__ = attr.ib(repr=False, init=False, default=False)
     __cli_log_level_supported__ = attr.ib(repr=False, init=False, default=True)
@@ -306,6 +312,61 @@ class SaltCli(SaltMixin, ScriptSubprocess):
         log.debug("Built cmdline: %s", cmdline)
         return cmdline
 
+    def run(self, *args, env=None, _timeout=None, **kwargs):
+        """
+        Run the given command synchronously.
+
+        When a zygote was passed, the command is run in a child forked from it, otherwise,
+        a new subprocess is started.
+
+        Please look at :py:meth:`~pytestshellutils.shell.Subprocess.run` for the supported arguments
+        documentation.
+        """
+        if self.zygote is None:
+            return super().run(*args, env=env, _timeout=_timeout, **kwargs)
+        start_time = time.time()
+        # Build the cmdline to pass to the zygote
+        # We set the _terminal_timeout attribute while calling cmdline in case it needs
+        # access to that information to build the command line
+        self.impl._terminal_timeout = _timeout or self.timeout
+        cmdline = self.impl.cmdline(*args, **kwargs)
+        environ = self.environ.copy()
+        if env is not None:
+            environ.update(env)
+        log.info("%s is running %r in CWD: %s through %s ...", self, cmdline, self.cwd, self.zygote)
+        try:
+            result = self.zygote.run(
+                cmdline,
+                env=environ,
+                cwd=self.cwd,
+                timeout=self.impl._terminal_timeout,
+                encoding=self.system_encoding,
+            )
+        except FactoryTimeout as exc:
+            msg = (
+                f"{self} Failed to run: {cmdline}; Error: Timed out after "
+                f"{time.time() - start_time:.2f} seconds!"
+            )
+            raise FactoryTimeout(msg, process_result=exc.process_result) from exc
+        log.info("%s %s", self.__class__.__name__, result)
+        stdout, stderr, json_out = self.process_output(
+            result.stdout, result.stderr, cmdline=cmdline
+        )
+        log.info(
+            "%s completed %r in CWD: %s after %.2f seconds",
+            self,
+            cmdline,
+            self.cwd,
+            time.time() - start_time,
+        )
+        return ProcessResult(
+            returncode=result.returncode,
+            stdout=stdout,
+            stderr=stderr,
+            data=json_out,
+            cmdline=cmdline,
+        )
+
     def process_output(self, stdout, stderr, cmdline=None):  # noqa: ARG002
         """
         Process the output. When possible JSON is loaded from the output.
@@ -317,11 +378,20 @@ class SaltCli(SaltMixin, ScriptSubprocess):
         json_out = None
         if stdout and self.__json_output__:
             try:
-                json_out = json.loads(stdout)
+                documents = jsonstream.decode_documents(stdout)
             except ValueError:
-                if self.__merge_json_output__:
-                    with contextlib.suppress(ValueError):
-                        json_out = json.loads(stdout.replace("}\n{", ", "))
+                documents = []
+            if len(documents) == 1:
+                json_out = documents[0]
+            elif (
+                documents
+                and self.__merge_json_output__
+                and all(isinstance(document, dict) for document in documents)
+            ):
+                # One JSON document per minion return, merge them into a single dictionary
+                json_out = {}
+                for document in documents:
+                    json_out.update(document)
 
             if json_out is None:
                 log.debug("%s failed to load JSON from the following output:\n%r", self, stdout)
@@ -349,6 +419,23 @@ class SaltCli(SaltMixin, ScriptSubprocess):
         return stdout, stderr, json_out
 
 
+@attr.s(kw_only=True)
+class SaltDaemonImpl(DaemonImpl):
+    """
+    Salt daemon subprocess interaction implementation.
+
+    Please look at :py:class:`~pytestshellutils.shell.DaemonImpl` for the additional supported keyword
+    arguments documentation.
+    """
+
+    def init_terminal(self, cmdline, **kwargs):  # pylint: disable=arguments-differ
+        """
+        Spawn the daemon subprocess, recording it as a lifecycle span.
+        """
+        with tracing.span("spawn", track=tracing.track_name(self.factory)):
+            return super().init_terminal(cmdline, **kwargs)
+
+
 @attr.s(kw_only=True)
 class SystemdSaltDaemonImpl(DaemonImpl):
     """
@@ -539,7 +626,8 @@ class SaltDaemon(SaltMixin, Daemon):
             else:
                 self.extra_cli_arguments_after_first_start_failure.append("--log-level=debug")
 
-        # Register before start function
+        # Register before start functions
+        self.before_start(self._resolve_port_conflicts)
         self.before_start(self._set_started_at)
         # Register start check function
         self.start_check(self._check_start_events)
@@ -547,7 +635,25 @@ class SaltDaemon(SaltMixin, Daemon):
     def _get_impl_class(self):
         if self.system_service:
             return SystemdSaltDaemonImpl
-        return super()._get_impl_class()
+        return SaltDaemonImpl
+
+    @tracing.traced("start")
+    def start(self, *extra_cli_arguments, max_start_attempts=None, start_timeout=None):
+        """
+        Start the daemon.
+        """
+        return super().start(
+            *extra_cli_arguments,
+            max_start_attempts=max_start_attempts,
+            start_timeout=start_timeout,
+        )
+
+    def terminate(self):
+        """
+        Terminate the daemon.
+        """
+        with tracing.span("terminate", track=tracing.track_name(self), slow_stop=self.slow_stop):
+            return super().terminate()
 
     @classmethod
     def configure(
@@ -562,14 +668,15 @@ class SaltDaemon(SaltMixin, Daemon):
         """
         Configure the salt daemon.
         """
-        return cls._configure(
-            factories_manager,
-            daemon_id,
-            root_dir=root_dir,
-            defaults=defaults,
-            overrides=overrides,
-            **configure_kwargs,
-        )
+        with tracing.span("configure", track=str(daemon_id)):
+            return cls._configure(
+                factories_manager,
+                daemon_id,
+                root_dir=root_dir,
+                defaults=defaults,
+                overrides=overrides,
+                **configure_kwargs,
+            )
 
     @classmethod
     def _configure(
@@ -603,9 +710,20 @@ class SaltDaemon(SaltMixin, Daemon):
         raise NotImplementedError
 
     @classmethod
-    def write_config(cls, config):
+    def _get_port_config_keys(cls, config):  # noqa: ARG003
+        """
+        Return the configuration keys of the ports the daemon binds to.
+        """
+        return []
+
+    @classmethod
+    def write_config(cls, config, config_templates=None):
         """
         Write the configuration to file.
+
+        :keyword ~saltfactories.utils.config_templates.ConfigTemplates config_templates:
+            When passed, and it holds a template for this configuration, the loaded configuration, and the
+            daemon's directories, are produced from it, instead of having salt load, and verify, them.
         """
         config_file = config.pop("conf_file")
         log.debug(
@@ -614,11 +732,32 @@ class SaltDaemon(SaltMixin, Daemon):
             pprint.pformat(config),
         )
 
+        template_key = template = None
+        if config_templates is not None:
+            template_key = config_templates.get_key(cls, config, config_file)
+            template = config_templates.get(template_key)
+
         # Write down the computed configuration into the config file
-        with open(config_file, "w", encoding="utf-8") as wfh:
-            yaml.safe_dump(config, wfh, default_flow_style=False)
-        loaded_config = cls.load_config(config_file, config)
-        cls.verify_config(loaded_config)
+        track = str(config.get("id") or tracing.DEFAULT_TRACK)
+        with tracing.span("write_config", track=track):
+            with open(config_file, "w", encoding="utf-8") as wfh:
+                yaml.safe_dump(config, wfh, default_flow_style=False)
+            if template is not None:
+                with tracing.span("render_config_template", track=track):
+                    template.create_directories(config["root_dir"])
+                    return template.render_config(config)
+            loaded_config = cls.load_config(config_file, config)
+        with tracing.span("verify_config", track=track):
+            cls.verify_config(loaded_config)
+        if config_templates is not None:
+            config_templates.add(
+                template_key,
+                cls,
+                config,
+                config_file,
+                loaded_config,
+                verify_entries=cls._get_verify_config_entries(loaded_config),
+            )
         return loaded_config
 
     @classmethod
@@ -675,6 +814,39 @@ class SaltDaemon(SaltMixin, Daemon):
             cmdline.insert(0, self.python_executable)
         return cmdline
 
+    def _resolve_port_conflicts(self):
+        """
+        Replace the allocated ports the daemon binds to, which something else is already bound to.
+        """
+        if self.system_service is True or self.factories_manager is None:
+            return
+        port_allocator = self.factories_manager.port_allocator
+        if port_allocator is None:
+            return
+        ports = {
+            key: self.config[key] for key in self._get_port_config_keys(self.config) if key in self.config
+        }
+        replacements = port_allocator.resolve_conflicts(
+            ports, host=self.config.get("interface") or "127.0.0.1"
+        )
+        if not replacements:
+            return
+        log.warning(
+            "%s replacing the ports something else is already bound to: %s",
+            self,
+            ", ".join(f"{key}: {ports[key]} -> {port}" for key, port in replacements.items()),
+        )
+        # Do not move these deferred imports. It allows running against a Salt
+        # onedir build in salt's repo checkout.
+        from salt.utils.immutabletypes import freeze  # pylint: disable=import-outside-toplevel
+
+        with open(self.config_file, encoding="utf-8") as rfh:
+            config = yaml.safe_load(rfh)
+        config.update(replacements)
+        with open(self.config_file, "w", encoding="utf-8") as wfh:
+            yaml.safe_dump(config, wfh, default_flow_style=False)
+        self.config = freeze(dict(self.config, **replacements))
+
     def _set_started_at(self):
         """
         Set the ``_started_at`` attribute on the daemon instance.
@@ -695,6 +867,10 @@ class SaltDaemon(SaltMixin, Daemon):
             return True
 
         log.debug("Events to check for %s: %s", self, set(self.get_check_events()))
+        with tracing.span("start events", track=tracing.track_name(self)):
+            return self._wait_for_start_events(check_events, timeout_at)
+
+    def _wait_for_start_events(self, check_events, timeout_at):
         checks_start_time = time.time()
         while time.time() <= timeout_at:
             if not self.is_running():
@@ -702,12 +878,16 @@ class SaltDaemon(SaltMixin, Daemon):
                 raise FactoryNotStarted(msg)
             if not check_events:
                 break
-            check_events -= {
-                (event.daemon_id, event.tag)
-                for event in self.event_listener.get_events(
-                    check_events, after_time=self._started_at
+            for event in self.event_listener.get_events(check_events, after_time=self._started_at):
+                if (event.daemon_id, event.tag) not in check_events:
+                    continue
+                check_events.discard((event.daemon_id, event.tag))
+                tracing.instant(
+                    "start event",
+                    track=tracing.track_name(self),
+                    wall_time=event.timestamp,
+                    tag=event.tag,
                 )
-            }
             if check_events:
                 time.sleep(1.5)
         else:
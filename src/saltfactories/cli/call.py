@@ -1,17 +1,33 @@
 """
 ``salt-call`` CLI factory.
 """
+import logging
+
 import attr
+from pytestshellutils.utils import time
+from pytestshellutils.utils.processes import ProcessResult
 
 from saltfactories.bases import SaltCli
 
+log = logging.getLogger(__name__)
+
 
 @attr.s(kw_only=True, slots=True)
 class SaltCall(SaltCli):
     """
     ``salt-call`` CLI factory.
+
+    :param ~saltfactories.utils.call_worker.SaltCallWorker worker:
+        When passed, plain function calls are run by this persistent worker instead of by a new
+        ``salt-call`` process. Calls passing CLI flags, other than ``--retcode-passthrough``, or a custom
+        environment, are still run by a new ``salt-call`` process.
+
+    Please look at :py:class:`~saltfactories.bases.SaltCli` for the additional supported keyword
+    arguments documentation.
     """
 
+    worker = attr.ib(repr=False, default=None)
+
     __cli_timeout_supported__ = attr.ib(repr=False, init=False, default=True)
 
     def get_minion_tgt(self, minion_tgt=None):  # noqa: ARG002
@@ -20,6 +36,63 @@ class SaltCall(SaltCli):
         """
         return
 
+    def run(self, *args, env=None, _timeout=None, **kwargs):
+        """
+        Run the given command synchronously.
+
+        When a persistent worker was passed, and the call allows it, the function is called by the worker.
+
+        Please look at :py:meth:`~saltfactories.bases.SaltCli.run` for the supported arguments
+        documentation.
+        """
+        if self.worker is None or env is not None:
+            return super().run(*args, env=env, _timeout=_timeout, **kwargs)
+        retcode_passthrough = False
+        for arg in args:
+            if arg == "--retcode-passthrough":
+                retcode_passthrough = True
+                continue
+            if str(arg).startswith("-"):
+                log.debug("%s is not running %r through %s", self, args, self.worker)
+                return super().run(*args, env=env, _timeout=_timeout, **kwargs)
+        start_time = time.time()
+        # We set the _terminal_timeout attribute while calling cmdline in case it needs
+        # access to that information to build the command line
+        self.impl._terminal_timeout = _timeout or self.timeout
+        cmdline = self.impl.cmdline(*args, **kwargs)
+        # Everything after the script path which is not a flag is the function and it's arguments
+        script_path = self.get_script_path()
+        fun_args = [
+            arg for arg in cmdline[cmdline.index(script_path) + 1 :] if not arg.startswith("-")
+        ]
+        if not fun_args:
+            return super().run(*args, env=env, _timeout=_timeout, **kwargs)
+        log.info("%s is running %r through %s ...", self, cmdline, self.worker)
+        result = self.worker.call(
+            *fun_args,
+            cmdline=cmdline,
+            retcode_passthrough=retcode_passthrough,
+            timeout=self.impl._terminal_timeout,
+        )
+        log.info("%s %s", self.__class__.__name__, result)
+        stdout, stderr, json_out = self.process_output(
+            result.stdout, result.stderr, cmdline=cmdline
+        )
+        log.info(
+            "%s completed %r through %s after %.2f seconds",
+            self,
+            cmdline,
+            self.worker,
+            time.time() - start_time,
+        )
+        return ProcessResult(
+            returncode=result.returncode,
+            stdout=stdout,
+            stderr=stderr,
+            data=json_out,
+            cmdline=cmdline,
+        )
+
     def process_output(self, stdout, stderr, cmdline=None):
         """
         Process the returned output.
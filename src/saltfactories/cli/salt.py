@@ -1,10 +1,25 @@
 """
 ``salt`` CLI factory.
 """
+import codecs
+import logging
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+
 import attr
 import pytest
+from pytestshellutils.exceptions import FactoryTimeout
+from pytestshellutils.utils import time
+from pytestshellutils.utils.processes import ProcessResult
+from pytestshellutils.utils.processes import terminate_process
 
 from saltfactories.bases import SaltCli
+from saltfactories.utils import jsonstream
+
+log = logging.getLogger(__name__)
 
 
 @attr.s(kw_only=True, slots=True)
@@ -28,6 +43,132 @@ class Salt(SaltCli):
             raise pytest.UsageError(msg)
         return super().cmdline(*args, minion_tgt=minion_tgt, **kwargs)
 
+    def iter_run(self, *args, env=None, _timeout=None, **kwargs):
+        """
+        Run the given command and yield each minion return as soon as salt prints it.
+
+        The salt CLI prints each minion return as a JSON document as soon as it gets it. Instead of
+        waiting for all of them, like :py:meth:`~saltfactories.bases.SaltCli.run` does, this generator
+        yields them as they arrive, so that a test can make assertions, and fail, early.
+
+        .. code-block:: python
+
+            def test_ping(salt_cli):
+                for minion_id, ret in salt_cli.iter_run("test.ping", minion_tgt="*"):
+                    assert ret is True, minion_id
+
+        Leaving the loop early terminates the salt CLI process.
+
+        The arguments are the same as for :py:meth:`~saltfactories.bases.SaltCli.run`, except that the
+        JSON outputter is always used and ``--static`` is not supported since it would defeat the
+        purpose.
+
+        :return: A generator of ``(minion_id, return)`` tuples
+        :raises ~pytestshellutils.exceptions.FactoryTimeout: When the command did not finish in time
+        """
+        for arg in args:
+            arg = str(arg)  # noqa: PLW2901
+            if arg == "--static":
+                msg = "The '--static' flag is not supported by iter_run()"
+                raise pytest.UsageError(msg)
+            if arg in ("--out", "--output") or arg.startswith(("--out=", "--output=")):
+                msg = "iter_run() always uses the JSON outputter, don't pass '--out'"
+                raise pytest.UsageError(msg)
+        start_time = time.time()
+        # We set the _terminal_timeout attribute while calling cmdline in case it needs
+        # access to that information to build the command line
+        self.impl._terminal_timeout = _timeout or self.timeout
+        cmdline = self.impl.cmdline(*args, **kwargs)
+        timeout = self.impl._terminal_timeout
+        environ = self.environ.copy()
+        if env is not None:
+            environ.update(env)
+        log.info("%s is iterating over %r in CWD: %s ...", self, cmdline, self.cwd)
+        with tempfile.TemporaryFile() as stderr:
+            proc = subprocess.Popen(  # noqa: S603
+                cmdline,
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                cwd=str(self.cwd),
+                env=environ,
+                bufsize=0,
+            )
+            try:
+                chunks = queue.Queue()
+                reader = threading.Thread(
+                    target=self._read_chunks, args=(proc.stdout, chunks), daemon=True
+                )
+                reader.start()
+                # Salt might print plain text messages, like "No minions matched the target."
+                decoder = jsonstream.JSONStreamDecoder(skip_invalid=True)
+                text_decoder = codecs.getincrementaldecoder(self.system_encoding)(errors="replace")
+                while True:
+                    if timeout is None:
+                        chunk = chunks.get()
+                    else:
+                        try:
+                            chunk = chunks.get(timeout=max(start_time + timeout - time.time(), 0))
+                        except queue.Empty:
+                            self._iter_run_timed_out(proc, stderr, cmdline, start_time)
+                    documents = decoder.feed(text_decoder.decode(chunk, final=not chunk))
+                    if not chunk:
+                        documents.extend(decoder.close())
+                    for document in documents:
+                        if not isinstance(document, dict):
+                            log.debug("%s ignoring non minion return output: %r", self, document)
+                            continue
+                        yield from document.items()
+                    if not chunk:
+                        break
+                try:
+                    proc.wait(None if timeout is None else max(start_time + timeout - time.time(), 0))
+                except subprocess.TimeoutExpired:
+                    self._iter_run_timed_out(proc, stderr, cmdline, start_time)
+                log.info(
+                    "%s completed %r in CWD: %s after %.2f seconds. Returncode: %s",
+                    self,
+                    cmdline,
+                    self.cwd,
+                    time.time() - start_time,
+                    proc.returncode,
+                )
+            finally:
+                if proc.poll() is None:
+                    terminate_process(pid=proc.pid, kill_children=True, slow_stop=False)
+                    proc.wait()
+                proc.stdout.close()
+
+    @staticmethod
+    def _read_chunks(stream, chunks):
+        """
+        Put what's read from the stream into the chunks queue, an empty chunk signals EOF.
+        """
+        try:
+            while True:
+                chunk = os.read(stream.fileno(), 65536)
+                chunks.put(chunk)
+                if not chunk:
+                    break
+        except (OSError, ValueError):
+            # The stream was closed
+            chunks.put(b"")
+
+    def _iter_run_timed_out(self, proc, stderr, cmdline, start_time):
+        terminate_process(pid=proc.pid, kill_children=True, slow_stop=False)
+        proc.wait()
+        stderr.seek(0)
+        result = ProcessResult(
+            returncode=proc.returncode,
+            stdout="",
+            stderr=stderr.read().decode(self.system_encoding, errors="replace"),
+            cmdline=cmdline,
+        )
+        msg = (
+            f"{self} Failed to run: {cmdline}; Error: Timed out after "
+            f"{time.time() - start_time:.2f} seconds!"
+        )
+        raise FactoryTimeout(msg, process_result=result)
+
     def process_output(self, stdout, stderr, cmdline=None):
         """
         Process the returned output.
@@ -1,15 +1,99 @@
 """
 Salt Client in-process implementation.
 """
+import asyncio
+import functools
 import logging
 import re
+import threading
 
 import attr
 import pytest
+from pytestshellutils.utils import time
 
 log = logging.getLogger(__name__)
 
 
+@attr.s(kw_only=True, slots=True, frozen=True)
+class Call:
+    """
+    A salt function call to run with :py:meth:`~saltfactories.client.LocalClient.run_many`.
+
+    :keyword str function:
+        The salt function to call
+    :keyword tuple args:
+        The function positional arguments
+    :keyword dict kwargs:
+        The function keyword arguments
+    :keyword str minion_tgt:
+        The minion target
+    :keyword str tgt_type:
+        The type of ``minion_tgt``, ``glob``, ``list``, ``grain``, etc.
+    """
+
+    function = attr.ib()
+    args = attr.ib(default=(), converter=tuple)
+    kwargs = attr.ib(factory=dict)
+    minion_tgt = attr.ib(default="minion")
+    tgt_type = attr.ib(default="glob")
+
+
+@attr.s(kw_only=True, slots=True)
+class JobResult:
+    """
+    The returns, and timings, of a :py:class:`~saltfactories.client.Call`.
+
+    :keyword ~saltfactories.client.Call call:
+        The call which was published
+    :keyword str jid:
+        The job ID
+    :keyword list minions:
+        The minions the master expected to return
+    :keyword dict returns:
+        The minion returns, keyed by minion ID
+    :keyword dict retcodes:
+        The minion return codes, keyed by minion ID
+    :keyword float publish_time:
+        How long, in seconds, publishing the job took
+    :keyword dict latencies:
+        How long, in seconds, after the job was published, each minion took to return, keyed by minion ID
+    """
+
+    call = attr.ib()
+    jid = attr.ib()
+    minions = attr.ib(factory=list)
+    returns = attr.ib(factory=dict)
+    retcodes = attr.ib(factory=dict)
+    publish_time = attr.ib(default=None)
+    latencies = attr.ib(factory=dict)
+    _published_at = attr.ib(repr=False, default=None)
+
+    @property
+    def missing(self):
+        """
+        The minions which were expected to return but did not.
+        """
+        return sorted(set(self.minions) - set(self.returns))
+
+    @property
+    def complete(self):
+        """
+        True when all of the expected minions returned.
+        """
+        return not self.missing
+
+    @property
+    def total_time(self):
+        """
+        How long, in seconds, from starting to publish the job until the last minion return.
+
+        ``None`` if no minion returned.
+        """
+        if not self.latencies:
+            return None
+        return self.publish_time + max(self.latencies.values())
+
+
 @attr.s(kw_only=True, slots=True)
 class LocalClient:
     """
@@ -24,6 +108,8 @@ class LocalClient:
     master_config = attr.ib(repr=False)
     functions_known_to_return_none = attr.ib(repr=False)
     __client = attr.ib(init=False, repr=False)
+    # Salt's local client is not thread safe
+    __lock = attr.ib(init=False, repr=False, factory=threading.RLock)
 
     @functions_known_to_return_none.default
     def _set_functions_known_to_return_none(self):
@@ -54,7 +140,8 @@ class LocalClient:
             kwargs["arg"] = kwargs.pop("f_arg")
         if "f_timeout" in kwargs:
             kwargs["timeout"] = kwargs.pop("f_timeout")
-        ret = self.__client.cmd(minion_tgt, function, args, timeout=timeout, kwarg=kwargs)
+        with self.__lock:
+            ret = self.__client.cmd(minion_tgt, function, args, timeout=timeout, kwarg=kwargs)
         if minion_tgt not in ret:
             pytest.fail(
                 "WARNING(SHOULD NOT HAPPEN #1935): Failed to get a reply "
@@ -67,11 +154,122 @@ class LocalClient:
             )
 
         # Try to match stalled state functions
-        ret[minion_tgt] = self._check_state_return(ret[minion_tgt])
+        ret[minion_tgt] = self._check_state_return(ret[minion_tgt], minion_tgt)
 
         return ret[minion_tgt]
 
-    def _check_state_return(self, ret):
+    def run_many(self, *calls, timeout=300):
+        """
+        Run several salt functions concurrently.
+
+        All of the calls are published, through the same client connection, before waiting for any
+        of the minion returns, which are then collected, from the master's event bus, as they arrive.
+
+        .. code-block:: python
+
+            results = salt_client.run_many(
+                Call(function="test.ping", minion_tgt="*"),
+                Call(function="test.echo", args=("foo",), minion_tgt="minion-1"),
+            )
+            for result in results:
+                assert result.complete, result.missing
+
+        :param ~saltfactories.client.Call calls:
+            The calls to run
+        :keyword int,float timeout:
+            How long, in seconds, to wait for all of the minion returns
+        :return:
+            A list of :py:class:`~saltfactories.client.JobResult`, in the same order as the calls.
+            Unlike :py:meth:`~saltfactories.client.LocalClient.run`, missing minion returns do not fail
+            the test, check :py:attr:`~saltfactories.client.JobResult.missing`.
+        """
+        with self.__lock:
+            results = [self._publish(call, timeout) for call in calls]
+            self._collect_returns(results, timeout)
+        return results
+
+    async def run_async(self, function, *args, minion_tgt="minion", timeout=300, **kwargs):
+        """
+        Asynchronous variant of :py:meth:`~saltfactories.client.LocalClient.run`.
+
+        Salt's local client is synchronous, the call runs in the event loop's default executor.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            functools.partial(
+                self.run, function, *args, minion_tgt=minion_tgt, timeout=timeout, **kwargs
+            ),
+        )
+
+    async def run_many_async(self, *calls, timeout=300):
+        """
+        Asynchronous variant of :py:meth:`~saltfactories.client.LocalClient.run_many`.
+
+        Salt's local client is synchronous, the calls run in the event loop's default executor.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.run_many, *calls, timeout=timeout)
+        )
+
+    def _publish(self, call, timeout):
+        start = time.time()
+        # listen=True connects to the master event bus before publishing so that no
+        # minion return is missed
+        pub_data = self.__client.run_job(
+            call.minion_tgt,
+            call.function,
+            arg=list(call.args),
+            tgt_type=call.tgt_type,
+            timeout=timeout,
+            kwarg=call.kwargs,
+            listen=True,
+        )
+        published_at = time.time()
+        if not pub_data:
+            pytest.fail(f"Failed to publish {call}")
+        log.debug("Published %s as JID %s to %s", call, pub_data["jid"], pub_data["minions"])
+        return JobResult(
+            call=call,
+            jid=pub_data["jid"],
+            minions=list(pub_data["minions"]),
+            publish_time=published_at - start,
+            published_at=published_at,
+        )
+
+    def _collect_returns(self, results, timeout):
+        pending = {result.jid: result for result in results if not result.complete}
+        timeout_at = time.time() + timeout
+        while pending and time.time() < timeout_at:
+            event = self.__client.event.get_event(
+                wait=min(0.5, max(timeout_at - time.time(), 0)),
+                tag="salt/job/",
+                match_type="startswith",
+                full=True,
+            )
+            if not event:
+                continue
+            tag_parts = event["tag"].split("/")
+            # salt/job/<jid>/ret/<minion_id>
+            if len(tag_parts) < 5 or tag_parts[3] != "ret":
+                continue
+            result = pending.get(tag_parts[2])
+            if result is None:
+                continue
+            data = event["data"]
+            minion_id = data.get("id", tag_parts[4])
+            result.latencies[minion_id] = time.time() - result._published_at
+            result.returns[minion_id] = self._check_state_return(data.get("return"), minion_id)
+            result.retcodes[minion_id] = data.get("retcode", 0)
+            if minion_id not in result.minions:
+                result.minions.append(minion_id)
+            if result.complete:
+                pending.pop(result.jid)
+        for result in pending.values():
+            log.warning("Timed out waiting for %s returns from %s", result.call, result.missing)
+
+    def _check_state_return(self, ret, minion_tgt):
         if isinstance(ret, dict):
             # This is the supposed return format for state calls
             return ret
@@ -92,8 +290,13 @@ class LocalClient:
                     continue
 
                 jids.append(jid)
-                job_data = self.run("saltutil.find_job", jid)
-                job_kill = self.run("saltutil.kill_job", jid)
+                with self.__lock:
+                    job_data = self.__client.cmd(minion_tgt, "saltutil.find_job", [jid]).get(
+                        minion_tgt
+                    )
+                    job_kill = self.__client.cmd(minion_tgt, "saltutil.kill_job", [jid]).get(
+                        minion_tgt
+                    )
 
                 msg = (
                     "A running state.single was found causing a state lock. "
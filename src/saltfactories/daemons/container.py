@@ -7,6 +7,7 @@ import logging
 import os
 
 import attr
+import psutil
 import pytest
 from pytestshellutils.customtypes import Callback
 from pytestshellutils.exceptions import FactoryNotStarted
@@ -20,6 +21,7 @@ from saltfactories import bases
 from saltfactories.daemons import master
 from saltfactories.daemons import minion
 from saltfactories.utils import random_string
+from saltfactories.utils import tracing
 
 try:
     import docker
@@ -140,6 +142,9 @@ class Container(BaseFactory):
         :keyword Docker docker_client:
             An instance of the python docker client to use.
             When nothing is passed, a default docker client is instantiated.
+        :keyword ~pytestsysstats.plugin.StatsProcesses stats_processes:
+            Where to add the container's main process to, once started, if the docker daemon runs on
+            this host.
     """
 
     image = attr.ib()
@@ -154,6 +159,7 @@ class Container(BaseFactory):
     skip_on_pull_failure = attr.ib(repr=False, default=False)
     skip_if_docker_client_not_connectable = attr.ib(repr=False, default=False)
     docker_client = attr.ib(repr=False)
+    stats_processes = attr.ib(repr=False, hash=False, default=None)
     _before_start_callbacks = attr.ib(repr=False, hash=False, default=attr.Factory(list))
     _before_terminate_callbacks = attr.ib(repr=False, hash=False, default=attr.Factory(list))
     _after_start_callbacks = attr.ib(repr=False, hash=False, default=attr.Factory(list))
@@ -173,6 +179,9 @@ class Container(BaseFactory):
         # Register start check function
         self.container_start_check(self._check_listening_ports)
 
+        self.after_start(self._add_container_to_stats_processes)
+        self.after_terminate(self._remove_container_from_stats_processes)
+
         if self.check_ports and not isinstance(self.check_ports, dict):
             check_ports = {}
             for port in self.check_ports:
@@ -309,6 +318,7 @@ class Container(BaseFactory):
             self.display_name = f"{self.__class__.__name__}(id={self.name!r})"
         return self.display_name
 
+    @tracing.traced("container start")
     def start(self, *command, max_start_attempts=None, start_timeout=None):  # noqa: PLR0915
         """
         Start the container.
@@ -342,14 +352,15 @@ class Container(BaseFactory):
             start_running_timeout = current_start_time + (start_timeout or self.start_timeout)
 
             # Start the container
-            self.container = self.docker_client.containers.run(
-                self.image,
-                name=self.name,
-                detach=True,
-                stdin_open=True,
-                command=list(command) or None,
-                **self.container_run_kwargs,
-            )
+            with tracing.span("container run", track=tracing.track_name(self), image=self.image):
+                self.container = self.docker_client.containers.run(
+                    self.image,
+                    name=self.name,
+                    detach=True,
+                    stdin_open=True,
+                    command=list(command) or None,
+                    **self.container_run_kwargs,
+                )
             while time.time() <= start_running_timeout:
                 # Don't know why, but if self.container wasn't previously in a running
                 # state, and now it is, we have to re-set the self.container attribute
@@ -436,11 +447,6 @@ class Container(BaseFactory):
                         exc,
                         exc_info=True,
                     )
-            # TODO(s0undt3dch): Add containers to the processes stats?!
-            # if self.factories_manager and self.factories_manager.stats_processes is not None:
-            #    self.factories_manager.stats_processes[self.get_display_name()] = psutil.Process(
-            #        self.pid
-            #    )
             return factory_started
         result = self.terminate()
         msg = (
@@ -464,6 +470,7 @@ class Container(BaseFactory):
         finally:
             self.terminate()
 
+    @tracing.traced("container terminate")
     def terminate(self):
         """
         Terminate the container.
@@ -624,6 +631,7 @@ class Container(BaseFactory):
         except (APIError, RequestsConnectionError, PyWinTypesError) as exc:
             return f"The docker client failed to ping the docker server: {exc}"
 
+    @tracing.traced("container start checks")
     def run_container_start_checks(
         self,
         started_at,  # pylint: disable=unused-argument
@@ -707,6 +715,27 @@ class Container(BaseFactory):
         log.debug("All listening ports checked for %s: %s", self, self.get_check_ports())
         return True
 
+    def _get_stats_processes_name(self):
+        return f"{self.get_display_name()} Container"
+
+    def _add_container_to_stats_processes(self):
+        if self.stats_processes is None or self.container is None:
+            return
+        pid = self.container.attrs["State"].get("Pid")
+        if not pid:
+            return
+        try:
+            process = psutil.Process(pid)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            # The docker daemon is not running on this host
+            log.debug("The %s container main process, PID %s, is not visible from here", self, pid)
+            return
+        self.stats_processes.add(self._get_stats_processes_name(), process)
+
+    def _remove_container_from_stats_processes(self):
+        if self.stats_processes is not None:
+            self.stats_processes.remove(self._get_stats_processes_name())
+
     def _check_for_connectable_docker_client(self):
         connectable = Container.client_connectable(self.docker_client)
         if connectable is not True:
@@ -720,7 +749,8 @@ class Container(BaseFactory):
             pytest.fail(connectable)
         log.info("Pulling docker image '%s' before starting it", self.image)
         try:
-            self.docker_client.images.pull(self.image)
+            with tracing.span("pull image", track=tracing.track_name(self), image=self.image):
+                self.docker_client.images.pull(self.image)
         except APIError as exc:
             if self.skip_on_pull_failure:
                 msg = f"Failed to pull docker image '{self.image}': {exc}"
@@ -794,6 +824,11 @@ class SaltDaemon(Container, bases.SaltDaemon):
         """
         return bases.SaltDaemon.get_display_name(self)
 
+    def _resolve_port_conflicts(self):
+        """
+        The ports are published when the container starts, before the daemon starts, nothing to resolve.
+        """
+
     def run(self, *cmd, **kwargs):
         """
         Run a command inside the container.
@@ -6,12 +6,13 @@ import pathlib
 from functools import partial
 
 import attr
-from pytestskipmarkers.utils import ports
 
 from saltfactories import cli
 from saltfactories import client
 from saltfactories.bases import SaltDaemon
+from saltfactories.utils import port_allocator as _port_allocator
 from saltfactories.utils import running_username
+from saltfactories.utils import tracing
 from saltfactories.utils.tempfiles import SaltPillarTree
 from saltfactories.utils.tempfiles import SaltStateTree
 
@@ -23,6 +24,7 @@ class SaltMaster(SaltDaemon):
     """
 
     on_auth_event_callback = attr.ib(repr=False, default=None)
+    event_listener_ipc = attr.ib(repr=False, default=False)
 
     state_tree = attr.ib(init=False, hash=False, repr=False)
     pillar_tree = attr.ib(init=False, hash=False, repr=False)
@@ -44,6 +46,9 @@ class SaltMaster(SaltDaemon):
                 self.event_listener.register_auth_event_handler, self.id, auth_event_callback
             )
             self.after_terminate(self.event_listener.unregister_auth_event_handler, self.id)
+        if self.event_listener_ipc:
+            self.before_start(self.event_listener.subscribe_to_master, self.id, self.config)
+            self.after_terminate(self.event_listener.unsubscribe_from_master, self.id)
 
     @state_tree.default
     def __setup_state_tree(self):  # pylint: disable=unused-private-member
@@ -67,9 +72,13 @@ class SaltMaster(SaltDaemon):
         order_masters=False,
         master_of_masters=None,
         system_service=False,
+        port_allocator=None,
     ):
         """
         Return the default configuration.
+
+        The ports are allocated by ``port_allocator``, a
+        :py:class:`~saltfactories.utils.port_allocator.PortAllocator`, which defaults to the session's.
         """
         # Do not move these deferred imports. It allows running against a Salt
         # onedir build in salt's repo checkout.
@@ -83,6 +92,8 @@ class SaltMaster(SaltDaemon):
             overrides = {}
         else:
             overrides = overrides.copy()
+        if port_allocator is None:
+            port_allocator = _port_allocator.allocator
         master_of_masters_id = None
         if master_of_masters:
             master_of_masters_id = master_of_masters.id
@@ -170,12 +181,12 @@ class SaltMaster(SaltDaemon):
                 "conf_file": conf_file,
                 "root_dir": str(root_dir),
                 "interface": "127.0.0.1",
-                "publish_port": ports.get_unused_localhost_port(),
-                "ret_port": ports.get_unused_localhost_port(),
-                "tcp_master_pub_port": ports.get_unused_localhost_port(),
-                "tcp_master_pull_port": ports.get_unused_localhost_port(),
-                "tcp_master_publish_pull": ports.get_unused_localhost_port(),
-                "tcp_master_workers": ports.get_unused_localhost_port(),
+                "publish_port": port_allocator.get_port(),
+                "ret_port": port_allocator.get_port(),
+                "tcp_master_pub_port": port_allocator.get_port(),
+                "tcp_master_pull_port": port_allocator.get_port(),
+                "tcp_master_publish_pull": port_allocator.get_port(),
+                "tcp_master_workers": port_allocator.get_port(),
                 "pidfile": "run/master.pid",
                 "api_pidfile": "run/api.pid",
                 "pki_dir": "pki",
@@ -244,8 +255,20 @@ class SaltMaster(SaltDaemon):
             overrides=overrides,
             order_masters=order_masters,
             system_service=factories_manager.system_service,
+            port_allocator=factories_manager.port_allocator,
         )
 
+    @classmethod
+    def _get_port_config_keys(cls, config):  # noqa: ARG003
+        return [
+            "publish_port",
+            "ret_port",
+            "tcp_master_pub_port",
+            "tcp_master_pull_port",
+            "tcp_master_publish_pull",
+            "tcp_master_workers",
+        ]
+
     @classmethod
     def _get_verify_config_entries(cls, config):
         # verify env to make sure all required directories are created and have the
@@ -290,7 +313,8 @@ class SaltMaster(SaltDaemon):
         keystate = payload["act"]
         salt_key_cli = self.salt_key_cli()
         if keystate == "pend":
-            ret = salt_key_cli.run("--yes", "--accept", minion_id)
+            with tracing.span("key accept", track=tracing.track_name(self), minion=minion_id):
+                ret = salt_key_cli.run("--yes", "--accept", minion_id)
             assert ret.returncode == 0  # noqa: S101
 
     def get_check_events(self):
@@ -385,6 +409,10 @@ class SaltMaster(SaltDaemon):
         Return a `salt` CLI process for this master instance.
         """
         script_path = self.factories_manager.get_salt_script_path("salt")
+        factory_class_kwargs.setdefault(
+            "zygote",
+            self.factories_manager.get_cli_zygote(self.python_executable, self.config_dir),
+        )
         return factory_class(
             script_name=script_path,
             config=self.config.copy(),
@@ -398,6 +426,10 @@ class SaltMaster(SaltDaemon):
         Return a `salt-cp` CLI process for this master instance.
         """
         script_path = self.factories_manager.get_salt_script_path("salt-cp")
+        factory_class_kwargs.setdefault(
+            "zygote",
+            self.factories_manager.get_cli_zygote(self.python_executable, self.config_dir),
+        )
         return factory_class(
             script_name=script_path,
             config=self.config.copy(),
@@ -411,6 +443,10 @@ class SaltMaster(SaltDaemon):
         Return a `salt-key` CLI process for this master instance.
         """
         script_path = self.factories_manager.get_salt_script_path("salt-key")
+        factory_class_kwargs.setdefault(
+            "zygote",
+            self.factories_manager.get_cli_zygote(self.python_executable, self.config_dir),
+        )
         return factory_class(
             script_name=script_path,
             config=self.config.copy(),
@@ -424,6 +460,10 @@ class SaltMaster(SaltDaemon):
         Return a `salt-run` CLI process for this master instance.
         """
         script_path = self.factories_manager.get_salt_script_path("salt-run")
+        factory_class_kwargs.setdefault(
+            "zygote",
+            self.factories_manager.get_cli_zygote(self.python_executable, self.config_dir),
+        )
         return factory_class(
             script_name=script_path,
             config=self.config.copy(),
@@ -500,7 +540,7 @@ class SaltMaster(SaltDaemon):
         """
         Return a local salt client object.
         """
-        return factory_class(
-            master_config=self.config.copy(),
-            functions_known_to_return_none=functions_known_to_return_none,
-        )
+        factory_class_kwargs = {}
+        if functions_known_to_return_none is not None:
+            factory_class_kwargs["functions_known_to_return_none"] = functions_known_to_return_none
+        return factory_class(master_config=self.config.copy(), **factory_class_kwargs)
@@ -7,10 +7,10 @@ import pathlib
 
 import attr
 from pytestskipmarkers.utils import platform
-from pytestskipmarkers.utils import ports
 
 from saltfactories import cli
 from saltfactories.bases import SaltDaemon
+from saltfactories.utils import port_allocator as _port_allocator
 from saltfactories.utils.tempfiles import SaltPillarTree
 from saltfactories.utils.tempfiles import SaltStateTree
 
@@ -47,9 +47,13 @@ class SaltMinion(SaltDaemon):
         overrides=None,
         master=None,
         system_service=False,
+        port_allocator=None,
     ):
         """
         Return the default configuration.
+
+        The ports are allocated by ``port_allocator``, a
+        :py:class:`~saltfactories.utils.port_allocator.PortAllocator`, which defaults to the session's.
         """
         # Do not move these deferred imports. It allows running against a Salt
         # onedir build in salt's repo checkout.
@@ -59,6 +63,9 @@ class SaltMinion(SaltDaemon):
         if defaults is None:
             defaults = {}
 
+        if port_allocator is None:
+            port_allocator = _port_allocator.allocator
+
         master_id = master_port = None
         if master is not None:
             master_id = master.id
@@ -135,9 +142,9 @@ class SaltMinion(SaltDaemon):
                 "root_dir": str(root_dir),
                 "interface": "127.0.0.1",
                 "master": "127.0.0.1",
-                "master_port": master_port or ports.get_unused_localhost_port(),
-                "tcp_pub_port": ports.get_unused_localhost_port(),
-                "tcp_pull_port": ports.get_unused_localhost_port(),
+                "master_port": master_port or port_allocator.get_port(),
+                "tcp_pub_port": port_allocator.get_port(),
+                "tcp_pull_port": port_allocator.get_port(),
                 "pidfile": "run/minion.pid",
                 "pki_dir": "pki",
                 "cachedir": "cache",
@@ -195,8 +202,13 @@ class SaltMinion(SaltDaemon):
             overrides=overrides,
             master=master,
             system_service=factories_manager.system_service,
+            port_allocator=factories_manager.port_allocator,
         )
 
+    @classmethod
+    def _get_port_config_keys(cls, config):  # noqa: ARG003
+        return ["tcp_pub_port", "tcp_pull_port"]
+
     @classmethod
     def _get_verify_config_entries(cls, config):
         # verify env to make sure all required directories are created and have the
@@ -261,11 +273,25 @@ class SaltMinion(SaltDaemon):
                 role=self.config["__role"], id=self.id
             )
 
-    def salt_call_cli(self, factory_class=cli.call.SaltCall, **factory_class_kwargs):
+    def salt_call_cli(self, factory_class=cli.call.SaltCall, persistent=False, **factory_class_kwargs):
         """
         Return a `salt-call` CLI process for this minion instance.
+
+        :keyword bool persistent:
+            When ``True``, plain function calls are run by a long running
+            :py:class:`~saltfactories.utils.call_worker.SaltCallWorker`, which keeps the minion's
+            loaded modules around between calls, instead of by a new ``salt-call`` process.
         """
         script_path = self.factories_manager.get_salt_script_path("salt-call")
+        if persistent:
+            factory_class_kwargs.setdefault(
+                "worker",
+                self.factories_manager.get_salt_call_worker(self.python_executable, self.config_dir),
+            )
+        factory_class_kwargs.setdefault(
+            "zygote",
+            self.factories_manager.get_cli_zygote(self.python_executable, self.config_dir),
+        )
         return factory_class(
             script_name=script_path,
             config=self.config.copy(),
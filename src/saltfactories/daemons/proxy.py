@@ -7,11 +7,11 @@ import pathlib
 
 import attr
 from pytestskipmarkers.utils import platform
-from pytestskipmarkers.utils import ports
 
 from saltfactories import cli
 from saltfactories.bases import SaltDaemon
 from saltfactories.bases import SystemdSaltDaemonImpl
+from saltfactories.utils import port_allocator as _port_allocator
 from saltfactories.utils.tempfiles import SaltPillarTree
 from saltfactories.utils.tempfiles import SaltStateTree
 
@@ -69,9 +69,13 @@ class SaltProxyMinion(SaltDaemon):
         overrides=None,
         master=None,
         system_service=False,
+        port_allocator=None,
     ):
         """
         Return the default configuration.
+
+        The ports are allocated by ``port_allocator``, a
+        :py:class:`~saltfactories.utils.port_allocator.PortAllocator`, which defaults to the session's.
         """
         # Do not move these deferred imports. It allows running against a Salt
         # onedir build in salt's repo checkout.
@@ -81,6 +85,9 @@ class SaltProxyMinion(SaltDaemon):
         if defaults is None:
             defaults = {}
 
+        if port_allocator is None:
+            port_allocator = _port_allocator.allocator
+
         master_id = master_port = None
         if master is not None:
             master_id = master.id
@@ -159,9 +166,9 @@ class SaltProxyMinion(SaltDaemon):
                 "root_dir": str(root_dir),
                 "interface": "127.0.0.1",
                 "master": "127.0.0.1",
-                "master_port": master_port or ports.get_unused_localhost_port(),
-                "tcp_pub_port": ports.get_unused_localhost_port(),
-                "tcp_pull_port": ports.get_unused_localhost_port(),
+                "master_port": master_port or port_allocator.get_port(),
+                "tcp_pub_port": port_allocator.get_port(),
+                "tcp_pull_port": port_allocator.get_port(),
                 "pidfile": "run/proxy.pid",
                 "pki_dir": "pki",
                 "cachedir": "cache",
@@ -220,8 +227,13 @@ class SaltProxyMinion(SaltDaemon):
             overrides=overrides,
             master=master,
             system_service=factories_manager.system_service,
+            port_allocator=factories_manager.port_allocator,
         )
 
+    @classmethod
+    def _get_port_config_keys(cls, config):  # noqa: ARG003
+        return ["tcp_pub_port", "tcp_pull_port"]
+
     @classmethod
     def _get_verify_config_entries(cls, config):
         # verify env to make sure all required directories are created and have the
@@ -301,6 +313,10 @@ class SaltProxyMinion(SaltDaemon):
         Return a `salt-call` CLI process for this minion instance.
         """
         script_path = self.factories_manager.get_salt_script_path("salt-call")
+        factory_class_kwargs.setdefault(
+            "zygote",
+            self.factories_manager.get_cli_zygote(self.python_executable, self.config_dir),
+        )
         return factory_class(
             script_name=script_path,
             config=self.config.copy(),
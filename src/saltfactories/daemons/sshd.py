@@ -11,11 +11,11 @@ from datetime import timezone
 import attr
 from pytestshellutils.exceptions import FactoryFailure
 from pytestshellutils.shell import Daemon
-from pytestshellutils.utils import ports
 from pytestshellutils.utils import socket
 from pytestshellutils.utils.processes import ProcessResult
 from pytestskipmarkers.utils import platform
 
+from saltfactories.utils import port_allocator as _port_allocator
 from saltfactories.utils import running_username
 
 log = logging.getLogger(__name__)
@@ -32,6 +32,7 @@ class Sshd(Daemon):
     listen_port = attr.ib(default=None)
     authorized_keys = attr.ib(default=None)
     sshd_config_dict = attr.ib(default=None, repr=False)
+    port_allocator = attr.ib(default=None, repr=False)
     display_name = attr.ib(default=None)
     client_key = attr.ib(default=None, init=False, repr=False)
     sshd_config = attr.ib(default=None, init=False)
@@ -49,8 +50,10 @@ class Sshd(Daemon):
             self.sshd_config_dict = {}
         if self.listen_address is None:
             self.listen_address = "127.0.0.1"
+        if self.port_allocator is None:
+            self.port_allocator = _port_allocator.allocator
         if self.listen_port is None:
-            self.listen_port = ports.get_unused_localhost_port()
+            self.listen_port = self.port_allocator.get_port()
         self.check_ports = [self.listen_port]
         if isinstance(self.config_dir, str):
             self.config_dir = pathlib.Path(self.config_dir)
@@ -126,6 +129,7 @@ class Sshd(Daemon):
         self.sshd_config = _default_config
         self._write_config()
         super().__attrs_post_init__()
+        self.before_start(self._resolve_port_conflicts)
 
     def get_display_name(self):
         """
@@ -137,6 +141,24 @@ class Sshd(Daemon):
             )
         return super().get_display_name()
 
+    def _resolve_port_conflicts(self):
+        """
+        Replace the allocated listen port if something else is already bound to it.
+        """
+        replacements = self.port_allocator.resolve_conflicts(
+            {"listen_port": self.listen_port}, host=self.listen_address
+        )
+        if not replacements:
+            return
+        log.warning(
+            "%s replacing the listen port %s, something else is already bound to it, by %s",
+            self,
+            self.listen_port,
+            replacements["listen_port"],
+        )
+        self.listen_port = replacements["listen_port"]
+        self.check_ports = [self.listen_port]
+
     def get_base_script_args(self):
         """
         Returns any additional arguments to pass to the CLI script.
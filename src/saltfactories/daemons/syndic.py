@@ -5,9 +5,9 @@ import logging
 import pathlib
 
 import attr
-from pytestshellutils.utils import ports
 
 from saltfactories.bases import SaltDaemon
+from saltfactories.utils import port_allocator as _port_allocator
 
 log = logging.getLogger(__name__)
 
@@ -30,9 +30,13 @@ class SaltSyndic(SaltDaemon):
         overrides=None,
         master_of_masters=None,
         system_service=False,
+        port_allocator=None,
     ):
         """
         Return the default configuration.
+
+        The ports are allocated by ``port_allocator``, a
+        :py:class:`~saltfactories.utils.port_allocator.PortAllocator`, which defaults to the session's.
         """
         # Do not move these deferred imports. It allows running against a Salt
         # onedir build in salt's repo checkout.
@@ -45,6 +49,9 @@ class SaltSyndic(SaltDaemon):
         if overrides is None:
             overrides = {}
 
+        if port_allocator is None:
+            port_allocator = _port_allocator.allocator
+
         master_of_masters_id = syndic_master_port = None
         if master_of_masters:
             master_of_masters_id = master_of_masters.id
@@ -93,7 +100,7 @@ class SaltSyndic(SaltDaemon):
                 "conf_file": conf_file,
                 "root_dir": str(root_dir),
                 "syndic_master": "127.0.0.1",
-                "syndic_master_port": syndic_master_port or ports.get_unused_localhost_port(),
+                "syndic_master_port": syndic_master_port or port_allocator.get_port(),
                 "syndic_pidfile": "run/syndic.pid",
                 "syndic_log_file": "logs/syndic.log",
                 "syndic_log_level_logfile": "debug",
@@ -129,6 +136,7 @@ class SaltSyndic(SaltDaemon):
             overrides=overrides,
             master_of_masters=master_of_masters,
             system_service=factories_manager.system_service,
+            port_allocator=factories_manager.port_allocator,
         )
 
     @classmethod
@@ -1,6 +1,7 @@
 """
 Salt Factories Manager.
 """
+import hashlib
 import logging
 import os
 import pathlib
@@ -15,7 +16,13 @@ from saltfactories import daemons
 from saltfactories.bases import SaltMixin
 from saltfactories.utils import cast_to_pathlib_path
 from saltfactories.utils import cli_scripts
+from saltfactories.utils import config_templates as _config_templates
+from saltfactories.utils import port_allocator as _port_allocator
 from saltfactories.utils import running_username
+from saltfactories.utils import tracing
+from saltfactories.utils.call_worker import SaltCallWorker
+from saltfactories.utils.pool import DaemonPool
+from saltfactories.utils.zygote import CliZygote
 
 log = logging.getLogger(__name__)
 
@@ -81,6 +88,32 @@ class FactoriesManager:
         system_service:
             If true, the daemons and CLI's are run against a system installed salt setup, ie, the default
             salt system paths apply and the daemon and CLI scripts will be searched for in ``$PATH``.
+        cli_zygote:
+            If true, the salt CLI's are run in children forked from a
+            :py:class:`~saltfactories.utils.zygote.CliZygote`, one per ``(python_executable, config_dir)``,
+            instead of in new subprocesses. Only supported when salt-factories generates the CLI scripts
+            and on platforms which fork processes.
+        resource_sampler:
+            A :py:class:`~saltfactories.utils.resource_sampler.ResourceSampler` instance, which, when passed,
+            samples the resource usage of the started daemons and containers, and forwards them to
+            ``stats_processes``, if set.
+        profile:
+            A glob which, when passed, makes the salt daemons whose ID, and the salt daemons and CLI's
+            whose script name, match it, run under :py:mod:`cProfile`, writing their profiles to
+            ``profiles_dir``. See :py:mod:`saltfactories.utils.profiling`.
+        event_listener_ipc:
+            If true, the :py:class:`~saltfactories.plugins.event_listener.EventListener` subscribes directly
+            to the event publisher of the local masters started by :py:meth:`salt_master_daemon`, instead of
+            having the ``pytest`` engine forward their events. Containers and system services keep using
+            the engine.
+        port_allocator:
+            The :py:class:`~saltfactories.utils.port_allocator.PortAllocator` to allocate the daemons ports
+            from. Defaults to the session's, which reserves blocks of ports per ``pytest-xdist`` worker.
+        config_templates:
+            The :py:class:`~saltfactories.utils.config_templates.ConfigTemplates` to produce the daemons
+            configured alike from, instead of having salt load, and verify, each of their configurations.
+            Defaults to the session's. Pass ``None`` to disable it. Always disabled when running against
+            system services.
     """
 
     root_dir = attr.ib(converter=cast_to_pathlib_path)
@@ -98,12 +131,21 @@ class FactoriesManager:
     slow_stop = attr.ib(default=True)
     start_timeout = attr.ib(default=None)
     stats_processes = attr.ib(repr=False, default=None)
+    resource_sampler = attr.ib(repr=False, default=None)
+    profile = attr.ib(repr=False, default=None)
     system_service = attr.ib(repr=False, default=False)
+    cli_zygote = attr.ib(repr=False, default=False)
+    event_listener_ipc = attr.ib(repr=False, default=False)
+    port_allocator = attr.ib(repr=False, default=_port_allocator.allocator)
+    config_templates = attr.ib(repr=False, default=_config_templates.templates)
     event_listener = attr.ib(repr=False)
 
     # Internal attributes
     tmp_root_dir = attr.ib(init=False)
     generate_scripts = attr.ib(init=False, repr=False, default=True)
+    profiles_dir = attr.ib(init=False, repr=False, default=None)
+    _cli_zygotes = attr.ib(init=False, repr=False, factory=dict)
+    _salt_call_workers = attr.ib(init=False, repr=False, factory=dict)
 
     def __attrs_post_init__(self):
         """
@@ -115,6 +157,8 @@ class FactoriesManager:
             self.root_dir = self.tmp_root_dir
         else:
             self.root_dir = pathlib.Path("/")
+            # The system paths aren't ours to recreate
+            self.config_templates = None
 
         if self.scripts_dir is not None:
             self.python_executable = None
@@ -139,6 +183,15 @@ class FactoriesManager:
         if self.python_executable is None and self.generate_scripts:
             self.python_executable = sys.executable
 
+        if self.profile is not None:
+            if not self.generate_scripts:
+                log.warning("Profiling is only supported when salt-factories generates the scripts")
+                self.profile = None
+            else:
+                self.profiles_dir = self.tmp_root_dir / "profiles"
+                self.profiles_dir.mkdir(exist_ok=True)
+                self.environ.update(self.get_profile_environ())
+
         log.warning(self)
 
     @staticmethod
@@ -296,9 +349,14 @@ class FactoriesManager:
             master_of_masters=master_of_masters,
         )
         self.final_master_config_tweaks(config)
-        loaded_config = factory_class.write_config(config)
-        if self.stats_processes is not None:
-            factory_class_kwargs.setdefault("stats_processes", self.stats_processes)
+        if self._subscribe_to_master_events(factory_class):
+            # The event listener subscribes to this master's events, no need to forward them
+            config["engines"].remove("pytest")
+            factory_class_kwargs.setdefault("event_listener_ipc", True)
+        loaded_config = factory_class.write_config(config, config_templates=self.config_templates)
+        stats_processes = self._get_stats_processes()
+        if stats_processes is not None:
+            factory_class_kwargs.setdefault("stats_processes", stats_processes)
         return self._get_factory_class_instance(
             "salt-master",
             loaded_config,
@@ -354,9 +412,10 @@ class FactoriesManager:
             master=master,
         )
         self.final_minion_config_tweaks(config)
-        loaded_config = factory_class.write_config(config)
-        if self.stats_processes is not None:
-            factory_class_kwargs.setdefault("stats_processes", self.stats_processes)
+        loaded_config = factory_class.write_config(config, config_templates=self.config_templates)
+        stats_processes = self._get_stats_processes()
+        if stats_processes is not None:
+            factory_class_kwargs.setdefault("stats_processes", stats_processes)
         return self._get_factory_class_instance(
             "salt-minion",
             loaded_config,
@@ -427,9 +486,10 @@ class FactoriesManager:
             if key.startswith("syndic_"):
                 master_config.pop(key)
         self.final_master_config_tweaks(master_config)
-        master_loaded_config = master_factory_class.write_config(master_config)
-        if self.stats_processes is not None:
-            factory_class_kwargs.setdefault("stats_processes", self.stats_processes)
+        master_loaded_config = master_factory_class.write_config(master_config, config_templates=self.config_templates)
+        stats_processes = self._get_stats_processes()
+        if stats_processes is not None:
+            factory_class_kwargs.setdefault("stats_processes", stats_processes)
         master_factory = self._get_factory_class_instance(
             "salt-master",
             master_loaded_config,
@@ -447,7 +507,7 @@ class FactoriesManager:
             master=master_factory,
         )
         self.final_minion_config_tweaks(minion_config)
-        minion_loaded_config = minion_factory_class.write_config(minion_config)
+        minion_loaded_config = minion_factory_class.write_config(minion_config, config_templates=self.config_templates)
         minion_factory = self._get_factory_class_instance(
             "salt-minion",
             minion_loaded_config,
@@ -463,9 +523,10 @@ class FactoriesManager:
             overrides=overrides,
             master_of_masters=master_of_masters,
             system_service=self.system_service,
+            port_allocator=self.port_allocator,
         )
         self.final_syndic_config_tweaks(syndic_config)
-        syndic_loaded_config = factory_class.write_config(syndic_config)
+        syndic_loaded_config = factory_class.write_config(syndic_config, config_templates=self.config_templates)
         factory = self._get_factory_class_instance(
             "salt-syndic",
             syndic_loaded_config,
@@ -529,9 +590,10 @@ class FactoriesManager:
             master=master,
         )
         self.final_proxy_minion_config_tweaks(config)
-        loaded_config = factory_class.write_config(config)
-        if self.stats_processes is not None:
-            factory_class_kwargs.setdefault("stats_processes", self.stats_processes)
+        loaded_config = factory_class.write_config(config, config_templates=self.config_templates)
+        stats_processes = self._get_stats_processes()
+        if stats_processes is not None:
+            factory_class_kwargs.setdefault("stats_processes", stats_processes)
         return self._get_factory_class_instance(
             "salt-proxy",
             loaded_config,
@@ -559,12 +621,68 @@ class FactoriesManager:
             :py:class:`~saltfactories.daemons.api.SaltApi`:
                 The salt-api process class instance
         """
+        stats_processes = self._get_stats_processes()
+        if stats_processes is not None:
+            factory_class_kwargs.setdefault("stats_processes", stats_processes)
         return self._get_factory_class_instance(
             "salt-api",
             master.config,
             factory_class,
             max_start_attempts=max_start_attempts,
             start_timeout=start_timeout,
+            profile_name=f"{master.id}-api",
+            **factory_class_kwargs,
+        )
+
+    def pool(
+        self,
+        name,
+        size=1,
+        minions=1,
+        master_defaults=None,
+        master_overrides=None,
+        minion_defaults=None,
+        minion_overrides=None,
+        factory_class=DaemonPool,
+        **factory_class_kwargs,
+    ):
+        """
+        Return a pool of salt masters, each with its minions, kept running, and leased to tests.
+
+        Args:
+            name(str):
+                The pool name, the daemons IDs are prefixed with it
+            size(int):
+                How many masters, each with its minions, to start when the pool starts
+            minions(int):
+                How many minions each master has
+            master_defaults(dict):
+                A dictionary of default configuration to use when configuring the masters
+            master_overrides(dict):
+                A dictionary of configuration overrides to use when configuring the masters
+            minion_defaults(dict):
+                A dictionary of default configuration to use when configuring the minions
+            minion_overrides(dict):
+                A dictionary of configuration overrides to use when configuring the minions
+            factory_class_kwargs(dict):
+                Extra keyword arguments to pass to :py:class:`~saltfactories.utils.pool.DaemonPool`
+
+        Returns:
+            :py:class:`~saltfactories.utils.pool.DaemonPool`:
+                The pool, not started yet
+        """
+        if self.system_service is True:
+            msg = "Daemon pools are not supported when testing against salt installed in the system"
+            raise RuntimeError(msg)
+        return factory_class(
+            factories_manager=self,
+            name=name,
+            size=size,
+            minions=minions,
+            master_defaults=master_defaults,
+            master_overrides=master_overrides,
+            minion_defaults=minion_defaults,
+            minion_overrides=minion_overrides,
             **factory_class_kwargs,
         )
 
@@ -611,8 +729,10 @@ class FactoriesManager:
             config_dir = pathlib.Path(config_dir.strpath).resolve()
         except AttributeError:
             config_dir = pathlib.Path(config_dir).resolve()
-        if self.stats_processes is not None:
-            factory_class_kwargs.setdefault("stats_processes", self.stats_processes)
+        stats_processes = self._get_stats_processes()
+        if stats_processes is not None:
+            factory_class_kwargs.setdefault("stats_processes", stats_processes)
+        factory_class_kwargs.setdefault("port_allocator", self.port_allocator)
         return factory_class(
             start_timeout=start_timeout or self.start_timeout,
             slow_stop=self.slow_stop,
@@ -662,6 +782,9 @@ class FactoriesManager:
             :py:class:`~saltfactories.daemons.container.Container`:
                 The factory instance
         """
+        stats_processes = self._get_stats_processes()
+        if stats_processes is not None:
+            factory_class_kwargs.setdefault("stats_processes", stats_processes)
         return factory_class(
             name=container_name,
             image=image_name,
@@ -678,14 +801,16 @@ class FactoriesManager:
         Return the path to the customized script path, generating one if needed.
         """
         if self.generate_scripts:
-            return cli_scripts.generate_script(
-                self.scripts_dir,
-                script_name,
-                code_dir=self.code_dir,
-                coverage_db_path=self.coverage_db_path,
-                coverage_rc_path=self.coverage_rc_path,
-                inject_sitecustomize=self.inject_sitecustomize,
-            )
+            with tracing.span("generate script", script=script_name):
+                return cli_scripts.generate_script(
+                    self.scripts_dir,
+                    script_name,
+                    code_dir=self.code_dir,
+                    coverage_db_path=self.coverage_db_path,
+                    coverage_rc_path=self.coverage_rc_path,
+                    inject_sitecustomize=self.inject_sitecustomize,
+                    profile=self.profile is not None,
+                )
         if self.system_service:
             script_path = shutil.which(script_name)
             if not script_path:
@@ -698,6 +823,92 @@ class FactoriesManager:
             raise FileNotFoundError(msg)
         return str(script_path)
 
+    def get_profile_environ(self):
+        """
+        Return the environment variables which make the generated scripts profile themselves.
+
+        Returns an empty dictionary when not profiling.
+        """
+        if self.profile is None:
+            return {}
+        return {
+            "SALT_FACTORIES_PROFILE": self.profile,
+            "SALT_FACTORIES_PROFILE_DIR": str(self.profiles_dir),
+        }
+
+    def get_cli_zygote(self, python_executable, config_dir):
+        """
+        Return the CLI zygote for the passed python executable and configuration directory.
+
+        Returns ``None`` if CLI zygotes are not enabled or not supported.
+        """
+        if self.cli_zygote is False:
+            return None
+        if not self.generate_scripts or python_executable is None:
+            log.debug("CLI zygotes are only supported when salt-factories generates the CLI scripts")
+            return None
+        if platform.is_windows() or platform.is_spawning_platform():
+            log.debug("CLI zygotes are not supported on this platform")
+            return None
+        key = (python_executable, str(config_dir))
+        if key not in self._cli_zygotes:
+            digest = hashlib.sha1("|".join(key).encode()).hexdigest()[:12]  # noqa: S324
+            self._cli_zygotes[key] = CliZygote(
+                python_executable=python_executable,
+                script_path=self.get_salt_script_path("zygote"),
+                config_dir=config_dir,
+                # Unix socket paths have a short maximum length, keep it close to the root
+                socket_path=self.tmp_root_dir / "zygotes" / f"{digest}.sock",
+                environ=self.environ,
+                start_timeout=self.start_timeout,
+            )
+        return self._cli_zygotes[key]
+
+    def get_salt_call_worker(self, python_executable, config_dir):
+        """
+        Return the persistent ``salt-call`` worker for the passed python executable and configuration directory.
+
+        Returns ``None`` if persistent ``salt-call`` workers are not supported.
+        """
+        if not self.generate_scripts or python_executable is None:
+            log.debug(
+                "Persistent salt-call workers are only supported when salt-factories generates the CLI scripts"
+            )
+            return None
+        if platform.is_windows():
+            log.debug("Persistent salt-call workers are not supported on this platform")
+            return None
+        key = (python_executable, str(config_dir))
+        if key not in self._salt_call_workers:
+            digest = hashlib.sha1("|".join(key).encode()).hexdigest()[:12]  # noqa: S324
+            self._salt_call_workers[key] = SaltCallWorker(
+                python_executable=python_executable,
+                script_path=self.get_salt_script_path("call-worker"),
+                config_dir=config_dir,
+                # Unix socket paths have a short maximum length, keep it close to the root
+                socket_path=self.tmp_root_dir / "workers" / f"{digest}.sock",
+                environ=self.environ,
+                start_timeout=self.start_timeout,
+            )
+        return self._salt_call_workers[key]
+
+    def _get_stats_processes(self):
+        """
+        Return where the started daemons and containers should be tracked, if anywhere.
+        """
+        if self.resource_sampler is not None:
+            return self.resource_sampler
+        return self.stats_processes
+
+    def _subscribe_to_master_events(self, factory_class):
+        """
+        Return true if the event listener should subscribe directly to the master's event publisher.
+        """
+        if self.event_listener_ipc is False or self.system_service is True:
+            return False
+        # The container's event publisher is not reachable from the test process
+        return not issubclass(factory_class, daemons.container.Container)
+
     def _get_factory_class_instance(
         self,
         script_name,
@@ -705,17 +916,24 @@ class FactoriesManager:
         factory_class,
         max_start_attempts,
         start_timeout,
+        profile_name=None,
         **factory_class_kwargs,
     ):
         """
         Helper method to instantiate daemon factories.
         """
         script_path = self.get_salt_script_path(script_name)
+        environ = self.environ
+        if self.profile is not None:
+            environ = environ.copy()
+            environ["SALT_FACTORIES_PROFILE_NAME"] = profile_name or daemon_config["id"]
+        if self.event_listener is not None:
+            self.event_listener.register_daemon(daemon_config["id"])
         return factory_class(
             config=daemon_config,
             start_timeout=start_timeout or self.start_timeout,
             slow_stop=self.slow_stop,
-            environ=self.environ,
+            environ=environ,
             cwd=self.cwd,
             max_start_attempts=max_start_attempts,
             event_listener=self.event_listener,
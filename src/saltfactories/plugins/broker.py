@@ -0,0 +1,478 @@
+"""
+Salt Factories shared event and log broker, for ``pytest-xdist`` sessions.
+
+By default, under ``pytest-xdist``, each worker runs its own
+:py:class:`~saltfactories.plugins.event_listener.EventListener` TCP server, and its own
+:py:class:`~saltfactories.plugins.log_server.LogServer` thread, each with its own sockets.
+
+Passing ``--salt-factories-shared-broker`` to pytest, makes the ``pytest-xdist`` controller run a single
+:py:class:`EventBroker`, which the salt daemons, and CLI's, started by all of the workers, forward their
+events and log records to. Each worker connects to it, with a :py:class:`BrokerSubscriber`, subscribes to
+the daemons it starts, and only receives their events and log records.
+
+The event listener, and log server, of the workers, don't listen on any socket, the
+``event_listener`` fixture API is unchanged.
+
+Log records of daemons no worker subscribed to are handled by the controller's logging machinery.
+"""
+import asyncio
+import contextlib
+import logging
+import socket
+import threading
+
+import attr
+import msgpack
+import pytest
+import zmq
+from pytestskipmarkers.utils import platform
+
+from saltfactories.plugins.event_listener import EventListenerServer
+
+log = logging.getLogger(__name__)
+
+
+def _handle_log_record(record_dict):
+    # Just log everything, filtering will happen on the logging handlers
+    record = logging.makeLogRecord(record_dict)
+    logger = logging.getLogger(record.name)
+    logger.handle(record)
+
+
+class BrokerSubscriberProtocol(asyncio.Protocol):
+    """
+    The broker's end of a worker's subscription connection.
+
+    The worker sends ``{"subscribe": <daemon id>}`` and ``{"unsubscribe": <daemon id>}`` messages, the
+    broker sends back ``("event", <payload>)`` and ``("log", <record>)`` messages.
+    """
+
+    def __init__(self, broker, *args, **kwargs) -> None:
+        self._broker = broker
+        self.transport = None
+        self.unpacker = msgpack.Unpacker(raw=False, strict_map_key=False)
+        super().__init__(*args, **kwargs)
+
+    def connection_made(self, transport):
+        """
+        Connection established.
+        """
+        log.debug("%s subscriber connected from %s", self._broker, transport.get_extra_info("peername"))
+        self.transport = transport
+
+    def connection_lost(self, exc):
+        """
+        Connection lost.
+        """
+        self._broker.remove_subscriber(self)
+
+    def data_received(self, data):
+        """
+        Received data.
+        """
+        self.unpacker.feed(data)
+        for message in self.unpacker:
+            if "subscribe" in message:
+                self._broker.subscribe(self, message["subscribe"])
+            elif "unsubscribe" in message:
+                self._broker.unsubscribe(self, message["unsubscribe"])
+
+    def send(self, kind, body):
+        """
+        Send an event, or log record, to the worker.
+        """
+        if self.transport is not None and not self.transport.is_closing():
+            self.transport.write(msgpack.packb((kind, body), use_bin_type=True))
+
+
+@attr.s(kw_only=True, slots=True, eq=False)
+class EventBroker:
+    """
+    Receive the events, and log records, of the salt daemons started by all ``pytest-xdist`` workers, and
+    route them to the workers which subscribed to those daemons.
+
+    It listens on three ports:
+
+    * ``events_port``, where the ``pytest`` engine of the salt daemons forwards their events to, like it
+      would to an :py:class:`~saltfactories.plugins.event_listener.EventListener`
+    * ``logs_port``, where the salt daemons, and CLI's, forward their log records to, like they would to
+      a :py:class:`~saltfactories.plugins.log_server.LogServer`
+    * ``subscribers_port``, where the workers connect to, with a :py:class:`BrokerSubscriber`
+
+    :keyword int max_buffer_size:
+        The maximum size, in bytes, of the buffer holding each daemon connection's received, and not yet
+        decoded, data. No single event can be bigger than this.
+    """
+
+    max_buffer_size = attr.ib(repr=False, default=100 * 1024 * 1024)
+    socket_hwm = attr.ib(repr=False, default=1000000)
+    host = attr.ib(init=False)
+    events_port = attr.ib(init=False, default=None)
+    logs_port = attr.ib(init=False, default=None)
+    subscribers_port = attr.ib(init=False, default=None)
+    routes = attr.ib(init=False, repr=False, factory=dict)
+    _loop = attr.ib(init=False, repr=False, default=None)
+    _servers = attr.ib(init=False, repr=False, factory=list)
+    _running_event = attr.ib(init=False, repr=False, factory=threading.Event)
+    _loop_thread = attr.ib(init=False, repr=False, default=None)
+    _logs_thread = attr.ib(init=False, repr=False, default=None)
+
+    @host.default
+    def _default_host(self):
+        if platform.is_windows():
+            # Windows cannot bind to 0.0.0.0
+            return "127.0.0.1"
+        return "0.0.0.0"  # noqa: S104
+
+    def start(self):
+        """
+        Start the broker.
+        """
+        if self._running_event.is_set():
+            return
+        log.info("%s is starting", self)
+        self._running_event.set()
+        started_event = threading.Event()
+        self._loop_thread = threading.Thread(
+            target=self._run_loop_in_thread, args=(started_event,), daemon=True
+        )
+        self._loop_thread.start()
+        logs_bound_event = threading.Event()
+        self._logs_thread = threading.Thread(
+            target=self._process_logs, args=(logs_bound_event,), daemon=True
+        )
+        self._logs_thread.start()
+        if started_event.wait(5) is not True or logs_bound_event.wait(5) is not True:
+            self.stop()
+            msg = "Failed to start the event broker"
+            raise RuntimeError(msg)
+        log.info("%s started", self)
+
+    def stop(self):
+        """
+        Stop the broker.
+        """
+        if self._running_event.is_set() is False:
+            return
+        log.info("%s is stopping", self)
+        self._running_event.clear()
+        for thread in (self._loop_thread, self._logs_thread):
+            if thread is not None:
+                thread.join(7)
+        self._loop_thread = self._logs_thread = None
+        log.info("%s stopped", self)
+
+    def get_worker_config(self):
+        """
+        Return what the workers need to know to use the broker, as a dictionary which can be passed to
+        them through ``workerinput``.
+        """
+        return {
+            "host": self.host,
+            "events_port": self.events_port,
+            "logs_port": self.logs_port,
+            "subscribers_port": self.subscribers_port,
+        }
+
+    def subscribe(self, subscriber, daemon_id):
+        """
+        Route the passed daemon's events, and log records, to the passed subscriber.
+        """
+        log.debug("%s routing %s to %s", self, daemon_id, subscriber)
+        self.routes.setdefault(daemon_id, set()).add(subscriber)
+
+    def unsubscribe(self, subscriber, daemon_id):
+        """
+        Stop routing the passed daemon's events, and log records, to the passed subscriber.
+        """
+        subscribers = self.routes.get(daemon_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            self.routes.pop(daemon_id)
+
+    def remove_subscriber(self, subscriber):
+        """
+        Stop routing anything to the passed subscriber.
+        """
+        for daemon_id in list(self.routes):
+            self.unsubscribe(subscriber, daemon_id)
+
+    def _process_event_payload(self, decoded):
+        # Called by the EventListenerServer, in the loop thread, for each event a daemon forwards
+        subscribers = self.routes.get(decoded.get("id"))
+        if not subscribers:
+            log.debug("%s no subscribers for event: %s", self, decoded)
+            return
+        for subscriber in subscribers:
+            subscriber.send("event", decoded)
+
+    def _route_log_record(self, record_dict):
+        subscribers = self.routes.get(record_dict.get("daemon_id"))
+        if not subscribers:
+            _handle_log_record(record_dict)
+            return
+        for subscriber in subscribers:
+            subscriber.send("log", record_dict)
+
+    def _run_loop_in_thread(self, started_event):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        try:
+            loop.run_until_complete(self._run_servers(started_event))
+        except Exception:  # pylint: disable=broad-except
+            log.exception("%s: Exception raised while running the servers", self)
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+            self._loop = None
+
+    async def _run_servers(self, started_event):
+        loop = asyncio.get_running_loop()
+        events_server = await loop.create_server(
+            lambda: EventListenerServer(self), self.host, 0
+        )
+        subscribers_server = await loop.create_server(
+            lambda: BrokerSubscriberProtocol(self), self.host, 0
+        )
+        self._servers = [events_server, subscribers_server]
+        self.events_port = events_server.sockets[0].getsockname()[1]
+        self.subscribers_port = subscribers_server.sockets[0].getsockname()[1]
+        started_event.set()
+        try:
+            while self._running_event.is_set():
+                await asyncio.sleep(0.5)
+        finally:
+            for server in self._servers:
+                server.close()
+                await server.wait_closed()
+            self._servers = []
+
+    def _process_logs(self, bound_event):
+        context = zmq.Context()
+        puller = context.socket(zmq.PULL)  # pylint: disable=no-member
+        puller.set_hwm(self.socket_hwm)
+        try:
+            self.logs_port = puller.bind_to_random_port(f"tcp://{self.host}")
+            bound_event.set()
+            poller = zmq.Poller()
+            poller.register(puller, zmq.POLLIN)
+            while self._running_event.is_set():
+                if not poller.poll(500):
+                    continue
+                try:
+                    record_dict = msgpack.loads(puller.recv(), raw=False)
+                except Exception as exc:  # pragma: no cover pylint: disable=broad-except
+                    log.warning("%s Failed to decode a log record: %s", self, exc)
+                    continue
+                loop = self._loop
+                if loop is None:
+                    _handle_log_record(record_dict)
+                    continue
+                with contextlib.suppress(RuntimeError):
+                    # The loop might have just been closed
+                    loop.call_soon_threadsafe(self._route_log_record, record_dict)
+        except zmq.ZMQError:  # pragma: no cover
+            log.exception("%s Unable to bind the log records puller", self)
+        finally:
+            puller.close(1)
+            context.term()
+
+
+@attr.s(kw_only=True, slots=True, eq=False)
+class BrokerSubscriber:
+    """
+    A ``pytest-xdist`` worker's connection to the controller's :py:class:`EventBroker`.
+
+    :keyword str host:
+        The host the broker listens on
+    :keyword int events_port:
+        The port the salt daemons forward their events to
+    :keyword int logs_port:
+        The port the salt daemons, and CLI's, forward their log records to
+    :keyword int subscribers_port:
+        The port to connect to
+    """
+
+    host = attr.ib()
+    events_port = attr.ib()
+    logs_port = attr.ib()
+    subscribers_port = attr.ib()
+    event_callback = attr.ib(repr=False, default=None)
+    daemon_ids = attr.ib(init=False, repr=False, factory=set)
+    _sock = attr.ib(init=False, repr=False, default=None)
+    _lock = attr.ib(init=False, repr=False, factory=threading.Lock)
+    _reader_thread = attr.ib(init=False, repr=False, default=None)
+
+    @property
+    def connect_host(self):
+        """
+        The address to connect to the broker at.
+        """
+        if self.host == "0.0.0.0":  # noqa: S104
+            return "127.0.0.1"
+        return self.host
+
+    def start(self):
+        """
+        Connect to the broker, subscribing to the daemons subscribed to so far.
+        """
+        if self._sock is not None:
+            return
+        log.debug("%s is connecting", self)
+        self._sock = socket.create_connection((self.connect_host, self.subscribers_port), timeout=5)
+        self._sock.settimeout(None)
+        with self._lock:
+            for daemon_id in self.daemon_ids:
+                self._send({"subscribe": daemon_id})
+        self._reader_thread = threading.Thread(target=self._read, daemon=True)
+        self._reader_thread.start()
+
+    def stop(self):
+        """
+        Disconnect from the broker.
+        """
+        if self._sock is None:
+            return
+        log.debug("%s is disconnecting", self)
+        sock, self._sock = self._sock, None
+        with contextlib.suppress(OSError):
+            sock.shutdown(socket.SHUT_RDWR)
+        sock.close()
+        self._reader_thread.join(5)
+        self._reader_thread = None
+
+    def subscribe(self, daemon_id):
+        """
+        Receive the passed daemon's events, and log records.
+        """
+        with self._lock:
+            if daemon_id in self.daemon_ids:
+                return
+            self.daemon_ids.add(daemon_id)
+            self._send({"subscribe": daemon_id})
+
+    def unsubscribe(self, daemon_id):
+        """
+        Stop receiving the passed daemon's events, and log records.
+        """
+        with self._lock:
+            if daemon_id not in self.daemon_ids:
+                return
+            self.daemon_ids.discard(daemon_id)
+            self._send({"unsubscribe": daemon_id})
+
+    def _send(self, message):
+        if self._sock is None:
+            # Sent once connected
+            return
+        try:
+            self._sock.sendall(msgpack.packb(message, use_bin_type=True))
+        except OSError as exc:
+            log.warning("%s Failed to send %s to the broker: %s", self, message, exc)
+
+    def _read(self):
+        # Arrays as tuples, like the event listener decodes the events it receives
+        unpacker = msgpack.Unpacker(raw=False, strict_map_key=False, use_list=False)
+        sock = self._sock
+        while True:
+            try:
+                data = sock.recv(65536)
+            except OSError:
+                break
+            if not data:
+                break
+            unpacker.feed(data)
+            for kind, body in unpacker:
+                try:
+                    if kind == "event":
+                        if self.event_callback is not None:
+                            self.event_callback(body)
+                    elif kind == "log":
+                        _handle_log_record(dict(body))
+                except Exception:  # pragma: no cover pylint: disable=broad-except
+                    log.exception("%s Failed to process the %s %s", self, kind, body)
+        if self._sock is not None:  # pragma: no cover
+            log.warning("%s The connection to the broker was lost", self)
+
+
+def _is_xdist_controller(config):
+    return not hasattr(config, "workerinput") and config.getoption("dist", "no") != "no"
+
+
+def pytest_addoption(parser):
+    """
+    Register argparse-style options and ini-style config values.
+    """
+    group = parser.getgroup("Salt Factories")
+    group.addoption(
+        "--salt-factories-shared-broker",
+        default=False,
+        action="store_true",
+        help=(
+            "When running under pytest-xdist, have the controller run a single broker which the salt "
+            "daemons started by all workers forward their events and log records to, and which routes "
+            "them to the worker which started each daemon, instead of each worker running its own "
+            "event listener and log server."
+        ),
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """
+    Start the broker on the ``pytest-xdist`` controller, or connect to it from the workers.
+    """
+    if not config.getoption("--salt-factories-shared-broker"):
+        return
+    if _is_xdist_controller(config):
+        broker = EventBroker()
+        broker.start()
+        config.pluginmanager.register(broker, "saltfactories-broker")
+        return
+    broker_config = getattr(config, "workerinput", {}).get("saltfactories_broker")
+    if broker_config is not None:
+        config.pluginmanager.register(
+            BrokerSubscriber(**broker_config), "saltfactories-broker-subscriber"
+        )
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """
+    Pass the broker addresses to each ``pytest-xdist`` worker.
+    """
+    broker = node.config.pluginmanager.get_plugin("saltfactories-broker")
+    if broker is not None:
+        node.workerinput["saltfactories_broker"] = broker.get_worker_config()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionstart(session):
+    """
+    Connect the worker to the broker.
+    """
+    subscriber = session.config.pluginmanager.get_plugin("saltfactories-broker-subscriber")
+    if subscriber is not None:
+        subscriber.start()
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_sessionfinish(session):
+    """
+    Disconnect the worker from the broker.
+    """
+    subscriber = session.config.pluginmanager.get_plugin("saltfactories-broker-subscriber")
+    if subscriber is not None:
+        subscriber.stop()
+
+
+def pytest_unconfigure(config):
+    """
+    Stop the broker.
+    """
+    broker = config.pluginmanager.get_plugin("saltfactories-broker")
+    if broker is not None:
+        broker.stop()
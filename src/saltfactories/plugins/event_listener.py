@@ -3,33 +3,55 @@ Salt Factories Event Listener.
 
 A salt events store for all daemons started by salt-factories
 """
+import array
 import asyncio
+import contextlib
 import copy
 import fnmatch
 import logging
+import os
+import pathlib
+import statistics
 import threading
 import weakref
 from collections import deque
 from datetime import datetime
-from datetime import timedelta
 from datetime import timezone
 
 import attr
 import msgpack.exceptions
 import pytest
-from pytestshellutils.utils import ports
 from pytestshellutils.utils import time
 from pytestskipmarkers.utils import platform
 
+from saltfactories.utils import port_allocator
+from saltfactories.utils import tracing
+from saltfactories.utils.event_recording import EventRecorder
+from saltfactories.utils.firehose import Firehose
+
 log = logging.getLogger(__name__)
 
 
 def _convert_stamp(stamp):
-    try:
-        return datetime.fromisoformat(stamp).replace(tzinfo=timezone.utc)
-    except AttributeError:  # pragma: no cover
-        # Python < 3.7
-        return datetime.strptime(stamp, "%Y-%m-%dT%H:%M:%S.%f").replace(tzinfo=timezone.utc)
+    """
+    Convert salt's ``_stamp``, an ISO 8601 UTC time string, to a float epoch timestamp.
+    """
+    if isinstance(stamp, (int, float)):
+        return float(stamp)
+    if isinstance(stamp, str):
+        stamp = datetime.fromisoformat(stamp)
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=timezone.utc)
+    return stamp.timestamp()
+
+
+def _convert_after_time(after_time):
+    """
+    Convert the ``after_time`` argument to a float epoch timestamp, defaulting to now.
+    """
+    if after_time is None:
+        return time.time()
+    return _convert_stamp(after_time)
 
 
 @attr.s(kw_only=True, slots=True, hash=True, frozen=True)
@@ -44,8 +66,8 @@ class Event:
         The daemon ID which received this event.
     :keyword str tag:
         The event tag of the event.
-    :keyword ~datetime.datetime stamp:
-        When the event occurred
+    :keyword ~datetime.datetime,str,float timestamp:
+        When the event occurred, stored as a float epoch timestamp
     :keyword dict data:
         The event payload, filtered of all of Salt's private keys like ``_stamp`` which prevents proper
         assertions against it.
@@ -57,7 +79,7 @@ class Event:
 
     daemon_id = attr.ib()
     tag = attr.ib()
-    stamp = attr.ib(converter=_convert_stamp)
+    timestamp = attr.ib(converter=_convert_stamp)
     data = attr.ib(hash=False)
     full_data = attr.ib(hash=False)
     expire_seconds = attr.ib(hash=False)
@@ -65,14 +87,21 @@ class Event:
 
     @_expire_at.default
     def _set_expire_at(self):
-        return self.stamp + timedelta(seconds=self.expire_seconds)
+        return self.timestamp + self.expire_seconds
+
+    @property
+    def stamp(self):
+        """
+        When the event occurred, as a timezone aware :py:class:`~datetime.datetime`.
+        """
+        return datetime.fromtimestamp(self.timestamp, tz=timezone.utc)
 
     @property
     def expired(self):
         """
         Property to identify if the event has expired, at which time it should be removed from the store.
         """
-        if datetime.now(tz=timezone.utc) < self._expire_at:
+        if time.time() < self._expire_at:
             return False
         return True
 
@@ -117,13 +146,505 @@ class MatchedEvents:
         return iter(self.matches)
 
 
+@attr.s(kw_only=True, slots=True, hash=False)
+class ColumnarEventStore:
+    """
+    Compact event store.
+
+    Instead of keeping an :py:class:`~saltfactories.plugins.event_listener.Event` instance per event, the
+    columnar store keeps the event timestamps in an array of floats, the daemon IDs and tags interned,
+    as arrays of indexes into a table of strings, and each event payload packed as msgpack bytes.
+    :py:class:`~saltfactories.plugins.event_listener.Event` instances are only created for the events
+    which are selected, or iterated over.
+
+    Like a :py:class:`~collections.deque` with ``maxlen``, once full, the oldest events are discarded to
+    make room for the new ones.
+
+    :keyword int maxlen:
+        The maximum number of events to keep.
+    :keyword int,float expire_seconds:
+        The time, in seconds, after which an event should be considered as expired.
+    """
+
+    maxlen = attr.ib(default=10000)
+    expire_seconds = attr.ib(default=120)
+    _timestamps = attr.ib(init=False, repr=False, factory=lambda: array.array("d"))
+    _daemon_ids = attr.ib(init=False, repr=False, factory=lambda: array.array("L"))
+    _tags = attr.ib(init=False, repr=False, factory=lambda: array.array("L"))
+    _payloads = attr.ib(init=False, repr=False, factory=list)
+    # Where the stored events start, the ones before were discarded but not yet compacted
+    _head = attr.ib(init=False, repr=False, default=0)
+    _strings = attr.ib(init=False, repr=False, factory=list)
+    _string_ids = attr.ib(init=False, repr=False, factory=dict)
+    _lock = attr.ib(init=False, repr=False, factory=threading.Lock)
+
+    def __len__(self):
+        """
+        The number of stored events.
+        """
+        return len(self._timestamps) - self._head
+
+    def __iter__(self):
+        """
+        Iterate through the stored events, as :py:class:`~saltfactories.plugins.event_listener.Event`
+        instances.
+        """
+        with self._lock:
+            rows = [self._row(idx) for idx in range(self._head, len(self._timestamps))]
+        return (self._materialize(*row) for row in rows)
+
+    def append(self, event):
+        """
+        Store an event.
+
+        :param ~saltfactories.plugins.event_listener.Event event:
+            The event to store
+        """
+        payload = msgpack.packb(event.full_data, use_bin_type=True, default=str)
+        with self._lock:
+            self._timestamps.append(event.timestamp)
+            self._daemon_ids.append(self._intern(event.daemon_id))
+            self._tags.append(self._intern(event.tag))
+            self._payloads.append(payload)
+            if len(self) > self.maxlen:
+                self._payloads[self._head] = None
+                self._head += 1
+                if self._head >= self.maxlen // 4:
+                    self._compact()
+
+    def clear(self):
+        """
+        Remove all events.
+        """
+        with self._lock:
+            self._clear()
+
+    def remove_expired(self):
+        """
+        Remove the expired events.
+
+        The table of strings is rebuilt, dropping the ones no longer used.
+        """
+        expired_before = time.time() - self.expire_seconds
+        with self._lock:
+            rows = [
+                self._row(idx)
+                for idx in range(self._head, len(self._timestamps))
+                if self._timestamps[idx] > expired_before
+            ]
+            self._clear()
+            for daemon_id, tag, timestamp, payload in rows:
+                self._timestamps.append(timestamp)
+                self._daemon_ids.append(self._intern(daemon_id))
+                self._tags.append(self._intern(tag))
+                self._payloads.append(payload)
+
+    def select(self, patterns, after_time):
+        """
+        Select the events matching any of the patterns.
+
+        :param ~collections.abc.Iterable patterns:
+            An iterable of tuples in the form of ``("<daemon-id>", "<event-tag-pattern>")``
+        :param float after_time:
+            The epoch timestamp after which events should have happened
+        :return list:
+            The list of matching, not expired, :py:class:`~saltfactories.plugins.event_listener.Event`
+            instances
+        """
+        patterns_by_daemon_id = {}
+        for daemon_id, pattern in patterns:
+            patterns_by_daemon_id.setdefault(daemon_id, []).append(pattern)
+        min_timestamp = max(after_time, time.time() - self.expire_seconds)
+        rows = []
+        with self._lock:
+            patterns_by_string_id = {
+                self._string_ids[daemon_id]: daemon_patterns
+                for daemon_id, daemon_patterns in patterns_by_daemon_id.items()
+                if daemon_id in self._string_ids
+            }
+            if not patterns_by_string_id:
+                return []
+            # Each (daemon-id, tag) combination is only matched once
+            matched = {}
+            timestamps = self._timestamps
+            daemon_ids = self._daemon_ids
+            tags = self._tags
+            for idx in range(self._head, len(timestamps)):
+                if timestamps[idx] < min_timestamp:
+                    continue
+                daemon_patterns = patterns_by_string_id.get(daemon_ids[idx])
+                if daemon_patterns is None:
+                    continue
+                key = (daemon_ids[idx], tags[idx])
+                is_match = matched.get(key)
+                if is_match is None:
+                    tag = self._strings[tags[idx]]
+                    is_match = matched[key] = any(
+                        fnmatch.fnmatch(tag, pattern) for pattern in daemon_patterns
+                    )
+                if is_match:
+                    rows.append(self._row(idx))
+        return [self._materialize(*row) for row in rows]
+
+    def _clear(self):
+        del self._timestamps[:]
+        del self._daemon_ids[:]
+        del self._tags[:]
+        self._payloads.clear()
+        self._head = 0
+        self._strings.clear()
+        self._string_ids.clear()
+
+    def _intern(self, value):
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = self._string_ids[value] = len(self._strings)
+            self._strings.append(value)
+        return string_id
+
+    def _compact(self):
+        del self._timestamps[: self._head]
+        del self._daemon_ids[: self._head]
+        del self._tags[: self._head]
+        del self._payloads[: self._head]
+        self._head = 0
+
+    def _row(self, idx):
+        return (
+            self._strings[self._daemon_ids[idx]],
+            self._strings[self._tags[idx]],
+            self._timestamps[idx],
+            self._payloads[idx],
+        )
+
+    def _materialize(self, daemon_id, tag, timestamp, payload):
+        full_data = msgpack.unpackb(payload, raw=False, strict_map_key=False, use_list=False)
+        return Event(
+            daemon_id=daemon_id,
+            tag=tag,
+            timestamp=timestamp,
+            data={key: value for key, value in full_data.items() if not key.startswith("_")},
+            full_data=full_data,
+            expire_seconds=self.expire_seconds,
+        )
+
+
+@attr.s(kw_only=True, slots=True, hash=False)
+class Job:
+    """
+    Job implementation.
+
+    The ``Job`` class holds what the :py:class:`~saltfactories.plugins.event_listener.JobTracker` knows
+    about a salt job, gathered from its ``salt/job/<jid>/new`` and ``salt/job/<jid>/ret/<minion-id>``
+    events. It's updated as the events arrive.
+
+    :keyword str jid:
+        The job ID.
+    """
+
+    jid = attr.ib()
+    new_event = attr.ib(default=None)
+    returns = attr.ib(factory=dict)
+    pending = attr.ib(init=False, factory=set)
+    last_seen = attr.ib(init=False, repr=False, default=None)
+
+    @property
+    def daemon_id(self):
+        """
+        The ID of the master which published the job, ``None`` if its ``new`` event was not received.
+        """
+        if self.new_event is None:
+            return None
+        return self.new_event.daemon_id
+
+    @property
+    def function(self):
+        """
+        The salt function the job runs, ``None`` if its ``new`` event was not received.
+        """
+        if self.new_event is None:
+            return None
+        return self.new_event.data.get("fun")
+
+    @property
+    def minions(self):
+        """
+        The minions the master expects to return, empty if the job's ``new`` event was not received.
+        """
+        if self.new_event is None:
+            return set()
+        return set(self.new_event.data.get("minions") or ())
+
+    @property
+    def latencies(self):
+        """
+        How long, in seconds, after the job was published, each minion took to return, keyed by minion ID.
+        """
+        if self.new_event is None:
+            return {}
+        return {
+            minion_id: event.timestamp - self.new_event.timestamp
+            for minion_id, event in self.returns.items()
+        }
+
+    @property
+    def latency_stats(self):
+        """
+        Minion return latency statistics, in seconds.
+
+        :return dict:
+            A dictionary with the ``count``, ``min``, ``max``, ``mean`` and ``median`` keys, or an empty
+            dictionary if no latency is known.
+        """
+        latencies = list(self.latencies.values())
+        if not latencies:
+            return {}
+        return {
+            "count": len(latencies),
+            "min": min(latencies),
+            "max": max(latencies),
+            "mean": statistics.mean(latencies),
+            "median": statistics.median(latencies),
+        }
+
+    def is_complete(self, minions=None):
+        """
+        Check if the job is complete.
+
+        :keyword ~collections.abc.Iterable minions:
+            The minion IDs which should have returned. Defaults to the minions the master expects to return.
+        :return bool: :py:class:`True` if all minions returned
+        """
+        if minions is not None:
+            return all(minion_id in self.returns for minion_id in minions)
+        return self.new_event is not None and not self.pending
+
+    def _add_new_event(self, event):
+        self.new_event = event
+        self.pending = self.minions.difference(self.returns)
+        self.last_seen = event.timestamp
+
+    def _add_return_event(self, minion_id, event):
+        self.returns[minion_id] = event
+        self.pending.discard(minion_id)
+        self.last_seen = event.timestamp
+
+
+@attr.s(kw_only=True, slots=True, hash=False)
+class JobTracker:
+    """
+    JobTracker implementation.
+
+    The ``JobTracker`` indexes, by job ID, the salt job events received by the
+    :py:class:`~saltfactories.plugins.event_listener.EventListener`, which is where it should be used from.
+
+    :keyword int,float timeout:
+        How long, in seconds, after its last event, should a job be kept around.
+    """
+
+    timeout = attr.ib(default=120)
+    jobs = attr.ib(init=False, repr=False, factory=dict)
+    _condition = attr.ib(init=False, repr=False, factory=threading.Condition)
+
+    def process_event(self, event):
+        """
+        Index the passed event if it's a salt job event.
+
+        :param ~saltfactories.plugins.event_listener.Event event:
+            The received event
+        """
+        # salt/job/<jid>/new or salt/job/<jid>/ret/<minion-id>
+        parts = event.tag.split("/", 4)
+        if len(parts) < 4 or parts[0] != "salt" or parts[1] != "job":
+            return
+        if parts[3] != "new" and (parts[3] != "ret" or len(parts) != 5):
+            return
+        jid = parts[2]
+        with self._condition:
+            job = self.jobs.get(jid)
+            if job is None:
+                job = self.jobs[jid] = Job(jid=jid)
+            if parts[3] == "new":
+                job._add_new_event(event)  # noqa: SLF001
+            else:
+                job._add_return_event(parts[4], event)  # noqa: SLF001
+            self._condition.notify_all()
+
+    def get_job(self, jid):
+        """
+        Get what is known about a job.
+
+        :param str jid:
+            The job ID
+        :return:
+            A :py:class:`~saltfactories.plugins.event_listener.Job` instance, or ``None`` if no event for
+            this job was received.
+        """
+        return self.jobs.get(jid)
+
+    def wait_for_job(self, jid, minions=None, timeout=30):
+        """
+        Wait for all minions to return for a job, or until timeout is reached.
+
+        :param str jid:
+            The job ID
+        :keyword ~collections.abc.Iterable minions:
+            The minion IDs to wait for. Defaults to the minions the master expects to return.
+        :keyword int,float timeout:
+            The amount of time to wait, in seconds.
+        :return:
+            A :py:class:`~saltfactories.plugins.event_listener.Job` instance. Check
+            :py:meth:`~saltfactories.plugins.event_listener.Job.is_complete` to know if the wait timed out.
+        """
+        if minions is not None:
+            minions = set(minions)
+        timeout_at = time.time() + timeout
+        with self._condition:
+            while True:
+                job = self.jobs.get(jid)
+                if job is not None and job.is_complete(minions=minions):
+                    return job
+                remaining = timeout_at - time.time()
+                if remaining <= 0:
+                    if job is None:
+                        return Job(jid=jid)
+                    return job
+                self._condition.wait(remaining)
+
+    def cleanup(self):
+        """
+        Remove the jobs for which no event was received during the last ``timeout`` seconds.
+        """
+        expire_before = time.time() - self.timeout
+        with self._condition:
+            for jid in [jid for jid, job in self.jobs.items() if job.last_seen < expire_before]:
+                log.debug("%s Removing job: %s", self, jid)
+                self.jobs.pop(jid)
+
+    def clear(self):
+        """
+        Remove all jobs.
+        """
+        with self._condition:
+            self.jobs.clear()
+
+
+
+@attr.s(kw_only=True, slots=True, hash=False)
+class MasterEventSubscriber:
+    """
+    Subscribe directly to a local salt master's event publisher.
+
+    Instead of having the ``pytest`` engine, running inside the master, forward each event over TCP, the
+    subscriber connects to the master's event publisher, under its ``sock_dir``, from a thread running in
+    the test process, and passes each event to ``callback`` in the same format the engine would forward it.
+
+    Like the engine, once connected, the subscriber fires the ``salt/master/<master-id>/start`` event
+    which salt-factories uses to confirm the master is running.
+
+    :keyword str master_id:
+        The master ID
+    :keyword dict opts:
+        The master configuration
+    :keyword ~collections.abc.Callable callback:
+        The function called with each event, as a ``{"id": ..., "tag": ..., "data": ...}`` dictionary
+    """
+
+    master_id = attr.ib()
+    opts = attr.ib(repr=False)
+    callback = attr.ib(repr=False)
+    running_event = attr.ib(init=False, repr=False, factory=threading.Event)
+    running_thread = attr.ib(init=False, repr=False, default=None)
+
+    def start(self):
+        """
+        Start the subscriber thread.
+        """
+        if self.running_event.is_set():
+            return
+        log.debug("%s is starting", self)
+        self.running_event.set()
+        self.running_thread = threading.Thread(target=self._run, daemon=True)
+        self.running_thread.start()
+
+    def stop(self):
+        """
+        Stop the subscriber thread.
+        """
+        if self.running_event.is_set() is False:
+            return
+        log.debug("%s is stopping", self)
+        self.running_event.clear()
+        self.running_thread.join(5)
+        self.running_thread = None
+        log.debug("%s stopped", self)
+
+    def _wait_for_publisher(self):
+        if self.opts.get("ipc_mode") == "tcp":
+            return True
+        # Connecting before the master creates the socket just logs errors, wait for it instead
+        pub_path = os.path.join(self.opts["sock_dir"], "master_event_pub.ipc")
+        while self.running_event.is_set():
+            if os.path.exists(pub_path):
+                return True
+            time.sleep(0.1)
+        return False
+
+    def _run(self):
+        # Do not move these deferred imports. It allows running against a Salt
+        # onedir build in salt's repo checkout.
+        import salt.utils.event  # pylint: disable=import-outside-toplevel
+
+        if not self._wait_for_publisher():
+            return
+        opts = self.opts.copy()
+        opts["file_client"] = "local"
+        try:
+            with salt.utils.event.get_event(
+                "master",
+                sock_dir=opts["sock_dir"],
+                opts=opts,
+                listen=False,
+            ) as eventbus:
+                while self.running_event.is_set():
+                    if eventbus.connect_pub(timeout=1):
+                        tracing.instant("event publisher connected", track=str(self.master_id))
+                        break
+                    time.sleep(0.1)
+                start_event_fired = False
+                while self.running_event.is_set():
+                    if start_event_fired is False:
+                        event_tag = f"salt/master/{self.master_id}/start"
+                        log.debug("%s firing event on subscriber start. Tag: %s", self, event_tag)
+                        load = {"id": self.master_id, "tag": event_tag, "data": {}}
+                        start_event_fired = eventbus.fire_event(load, event_tag)
+                    event = eventbus.get_event(wait=1, full=True, auto_reconnect=True)
+                    if not event:
+                        continue
+                    self.callback({"id": self.master_id, "tag": event["tag"], "data": event["data"]})
+        except Exception:  # pragma: no cover pylint: disable=broad-except
+            log.exception("%s Something funky happened", self)
+        finally:
+            self.running_event.clear()
+
+
 class EventListenerServer(asyncio.Protocol):
     """
     TCP Server to receive events forwarded.
+
+    The received data is decoded by a :py:class:`msgpack.Unpacker` whose buffer is bounded by the event
+    listener's ``max_buffer_size``. When a burst of data doesn't fit in it, the connection stops being
+    read from, the data is fed in smaller chunks as the buffered events get decoded, and only then is the
+    connection read from again, so no data is lost.
     """
 
     def __init__(self, _event_listener, *args, **kwargs) -> None:
         self._event_listener = _event_listener
+        self._backlog = deque()
+        self._paused = False
+        self._connected_at = None
+        self.transport = None
+        self.unpacker = None
         super().__init__(*args, **kwargs)
 
     def connection_made(self, transport):
@@ -132,28 +653,79 @@ class EventListenerServer(asyncio.Protocol):
         """
         peername = transport.get_extra_info("peername")
         log.debug("Connection from %s", peername)
-        # pylint: disable=attribute-defined-outside-init
+        self._connected_at = time.monotonic()
         self.transport = transport
-        self.unpacker = msgpack.Unpacker(raw=False, strict_map_key=False)
-        # pylint: enable=attribute-defined-outside-init
+        self.unpacker = msgpack.Unpacker(
+            raw=False,
+            strict_map_key=False,
+            use_list=False,
+            max_buffer_size=self._event_listener.max_buffer_size,
+        )
+
+    def connection_lost(self, exc):
+        """
+        Connection lost.
+        """
+        self._backlog.clear()
 
     def data_received(self, data):
         """
         Received data.
         """
-        try:
-            self.unpacker.feed(data)
-        except msgpack.exceptions.BufferFull:
-            # Start over loosing some data?!
-            self.unpacker = msgpack.Unpacker(  # pylint: disable=attribute-defined-outside-init
-                raw=False,
-                strict_map_key=False,
-            )
-            self.unpacker.feed(data)
+        self._backlog.append(data)
+        if not self._paused:
+            self._feed()
+
+    def _feed(self):
+        while self._backlog:
+            if self.transport.is_closing():
+                self._backlog.clear()
+                return
+            data = self._backlog[0]
+            try:
+                self.unpacker.feed(data)
+            except msgpack.exceptions.BufferFull:
+                if len(data) == 1:
+                    # Not even a byte fits, the event being received is bigger than the buffer
+                    log.error(
+                        "%s Received an event bigger than the max buffer size of %d bytes. "
+                        "Closing the connection.",
+                        self._event_listener,
+                        self._event_listener.max_buffer_size,
+                    )
+                    self._backlog.clear()
+                    self.transport.close()
+                    return
+                # Feed what fits, in smaller chunks, and let the loop run meanwhile
+                half = len(data) // 2
+                self._backlog[0] = data[half:]
+                self._backlog.appendleft(data[:half])
+                if not self._paused:
+                    self._paused = True
+                    self.transport.pause_reading()
+                asyncio.get_running_loop().call_soon(self._feed)
+                return
+            self._backlog.popleft()
+            self._process_payloads()
+        if self._paused:
+            self._paused = False
+            if not self.transport.is_closing():
+                self.transport.resume_reading()
+
+    def _process_payloads(self):
         for payload in self.unpacker:
             if payload is None:
+                self._backlog.clear()
                 self.transport.close()
                 break
+            if self._connected_at is not None:
+                # The daemon is only known once it sends its first event
+                tracing.instant(
+                    "engine connected",
+                    track=str(payload.get("id")),
+                    timestamp=self._connected_at,
+                )
+                self._connected_at = None
             self._event_listener._process_event_payload(payload)  # noqa: SLF001
 
 
@@ -167,22 +739,54 @@ class EventListener:
 
     :keyword int timeout:
         How long, in seconds, should a forwarded event stay in the store, after which, it will be deleted.
+    :keyword int max_buffer_size:
+        The maximum size, in bytes, of the buffer holding each connection's received, and not yet decoded,
+        data. No single event can be bigger than this.
+
+    :keyword bool columnar_store:
+        Keep the events in a :py:class:`~saltfactories.plugins.event_listener.ColumnarEventStore`, which
+        uses several times less memory, instead of a :py:class:`~collections.deque` of
+        :py:class:`~saltfactories.plugins.event_listener.Event` instances.
+    :keyword ~saltfactories.plugins.broker.BrokerSubscriber broker_subscriber:
+        Receive the events through the ``pytest-xdist`` controller's shared
+        :py:class:`~saltfactories.plugins.broker.EventBroker`, instead of running a TCP server. Only the
+        events of the daemons registered with
+        :py:meth:`~saltfactories.plugins.event_listener.EventListener.register_daemon` are received.
+
+    Forwarded events are decoded with arrays as tuples, and their time is kept as a float epoch
+    timestamp, see :py:attr:`~saltfactories.plugins.event_listener.Event.timestamp`.
+
+    The salt job events are additionally indexed by a
+    :py:class:`~saltfactories.plugins.event_listener.JobTracker`, see
+    :py:meth:`~saltfactories.plugins.event_listener.EventListener.wait_for_job`.
+
+    Local masters can, alternatively, be subscribed to directly, see
+    :py:meth:`~saltfactories.plugins.event_listener.EventListener.subscribe_to_master`.
     """
 
     timeout = attr.ib(default=120)
+    max_buffer_size = attr.ib(repr=False, default=100 * 1024 * 1024)
+    columnar_store = attr.ib(repr=False, default=False)
+    broker_subscriber = attr.ib(repr=False, default=None, hash=False)
     host = attr.ib(init=False, repr=False)
     port = attr.ib(init=False, repr=False)
     address = attr.ib(init=False)
     store = attr.ib(init=False, repr=False, hash=False)
+    job_tracker = attr.ib(init=False, repr=False, hash=False)
     running_event = attr.ib(init=False, repr=False, hash=False)
     running_thread = attr.ib(init=False, repr=False, hash=False)
     cleanup_thread = attr.ib(init=False, repr=False, hash=False)
     auth_event_handlers = attr.ib(init=False, repr=False, hash=False)
+    master_subscribers = attr.ib(init=False, repr=False, hash=False)
+    recorders = attr.ib(init=False, repr=False, hash=False)
+    event_callbacks = attr.ib(init=False, repr=False, hash=False)
     server = attr.ib(init=False, repr=False, hash=False)
     server_running_event = attr.ib(init=False, repr=False, hash=False)
 
     @host.default
     def _default_host(self):
+        if self.broker_subscriber is not None:
+            return self.broker_subscriber.host
         if platform.is_windows():
             # Windows cannot bind to 0.0.0.0
             return "127.0.0.1"
@@ -190,7 +794,9 @@ class EventListener:
 
     @port.default
     def _default_port(self):
-        return ports.get_unused_localhost_port()
+        if self.broker_subscriber is not None:
+            return self.broker_subscriber.events_port
+        return port_allocator.allocator.get_bindable_port(host=self.host)
 
     @address.default
     def _default_address(self):
@@ -200,10 +806,17 @@ class EventListener:
         """
         Post attrs initialization routines.
         """
-        self.store = deque(maxlen=10000)
+        if self.columnar_store:
+            self.store = ColumnarEventStore(maxlen=10000, expire_seconds=self.timeout)
+        else:
+            self.store = deque(maxlen=10000)
+        self.job_tracker = JobTracker(timeout=self.timeout)
         self.running_event = threading.Event()
         self.cleanup_thread = threading.Thread(target=self._cleanup)
         self.auth_event_handlers = weakref.WeakValueDictionary()
+        self.master_subscribers = {}
+        self.recorders = []
+        self.event_callbacks = []
         self.server_running_event = threading.Event()
         self.server = None
         self.running_thread = None
@@ -212,7 +825,7 @@ class EventListener:
         """
         Start the TCP server.
         """
-        if self.server_running_event.is_set():
+        if self.server_running_event.is_set() or self.broker_subscriber is not None:
             return
         if self.running_thread:
             # If this attribute is set it means something happened to make
@@ -267,27 +880,34 @@ class EventListener:
                 self.server = None
 
     def _process_event_payload(self, decoded):
+        for recorder in self.recorders:
+            recorder.record(decoded)
         try:
             daemon_id = decoded["id"]
             tag = decoded["tag"]
             data = decoded["data"]
             # Salt's event data has some "private" keys, for example, "_stamp" which
             # get in the way of direct assertions.
-            # We'll just store a full_data attribute and clean up the regular data of these keys
-            full_data = copy.deepcopy(data)
-            for key in list(data):
-                if key.startswith("_"):
-                    data.pop(key)
+            # We'll just store a full_data attribute and clean up the regular data of these keys.
+            # Both share the nested values, which are never modified, instead of copying them.
+            full_data = data
+            data = {key: value for key, value in full_data.items() if not key.startswith("_")}
             event = Event(
                 daemon_id=daemon_id,
                 tag=tag,
-                stamp=full_data["_stamp"],
+                timestamp=full_data["_stamp"],
                 data=data,
                 full_data=full_data,
                 expire_seconds=self.timeout,
             )
             log.info("%s received event: %s", self, event)
             self.store.append(event)
+            self.job_tracker.process_event(event)
+            for event_callback in self.event_callbacks:
+                try:
+                    event_callback(event)
+                except Exception:  # pragma: no cover pylint: disable=broad-except
+                    log.exception("%s Error calling %r", self, event_callback)
             if tag == "salt/auth":
                 auth_event_callback = self.auth_event_handlers.get(daemon_id)
                 if auth_event_callback:
@@ -319,15 +939,19 @@ class EventListener:
             cleanup_at = time.time() + 30
 
             # Cleanup expired events
-            to_remove = []
-            for event in self.store:
-                if event.expired:
-                    to_remove.append(event)
-
-            for event in to_remove:
-                log.debug("%s Removing from event store: %s", self, event)
-                self.store.remove(event)
+            if self.columnar_store:
+                self.store.remove_expired()
+            else:
+                to_remove = []
+                for event in self.store:
+                    if event.expired:
+                        to_remove.append(event)
+
+                for event in to_remove:
+                    log.debug("%s Removing from event store: %s", self, event)
+                    self.store.remove(event)
             log.debug("%s store size after cleanup: %s", self, len(self.store))
+            self.job_tracker.cleanup()
 
     def __enter__(self):
         """
@@ -350,12 +974,16 @@ class EventListener:
             return
         log.debug("%s is starting", self)
         self.running_event.set()
-        self.start_server()
-        # Wait for the thread to start
-        if self.server_running_event.wait(5) is not True:
-            self.server_running_event.clear()
-            msg = "Failed to start the event listener"
-            raise RuntimeError(msg)
+        if self.broker_subscriber is not None:
+            # The daemons forward their events to the broker, which routes them here
+            self.broker_subscriber.event_callback = self._process_event_payload
+        else:
+            self.start_server()
+            # Wait for the thread to start
+            if self.server_running_event.wait(5) is not True:
+                self.server_running_event.clear()
+                msg = "Failed to start the event listener"
+                raise RuntimeError(msg)
         log.debug("%s is started", self)
         self.cleanup_thread.start()
 
@@ -366,20 +994,26 @@ class EventListener:
         if self.running_event.is_set() is False:  # pragma: no cover
             return
         log.debug("%s is stopping", self)
+        for master_id in list(self.master_subscribers):
+            self.unsubscribe_from_master(master_id)
         self.store.clear()
+        self.job_tracker.clear()
         self.auth_event_handlers.clear()
         self.running_event.clear()
         self.server_running_event.clear()
-        log.debug("%s Joining running thread...", self)
-        self.running_thread.join(7)
-        if self.running_thread.is_alive():  # pragma: no cover
-            log.debug("%s The running thread is still alive. Waiting a little longer...", self)
-            self.running_thread.join(5)
-            if self.running_thread.is_alive():
-                log.debug(
-                    "%s The running thread is still alive. Exiting anyway and let GC take care of it",
-                    self,
-                )
+        if self.broker_subscriber is not None:
+            self.broker_subscriber.event_callback = None
+        else:
+            log.debug("%s Joining running thread...", self)
+            self.running_thread.join(7)
+            if self.running_thread.is_alive():  # pragma: no cover
+                log.debug("%s The running thread is still alive. Waiting a little longer...", self)
+                self.running_thread.join(5)
+                if self.running_thread.is_alive():
+                    log.debug(
+                        "%s The running thread is still alive. Exiting anyway and let GC take care of it",
+                        self,
+                    )
         log.debug("%s Joining cleanup thread...", self)
         self.cleanup_thread.join(7)
         if self.cleanup_thread.is_alive():  # pragma: no cover
@@ -392,6 +1026,15 @@ class EventListener:
                 )
         log.debug("%s stopped", self)
 
+    def _candidate_events(self, patterns, after_time):
+        """
+        Return the stored events which might match the patterns.
+        """
+        if self.columnar_store:
+            # Only the matching events get materialized
+            return self.store.select(patterns, after_time)
+        return copy.copy(self.store)
+
     def get_events(self, patterns, after_time=None):
         """
         Get events from the internal store.
@@ -400,15 +1043,12 @@ class EventListener:
             An iterable of tuples in the form of ``("<daemon-id>", "<event-tag-pattern>")``, ie, which daemon ID
             we're targeting and the event tag pattern which will be passed to :py:func:`~fnmatch.fnmatch` to
             assert a match.
-        :keyword ~datetime.datetime,float after_time:
-            After which time to start matching events.
+        :keyword ~datetime.datetime,int,float after_time:
+            After which time to start matching events. Defaults to now.
         :return set: A set of matched events
         """
-        if after_time is None:
-            after_time = datetime.now(tz=timezone.utc)
-        elif isinstance(after_time, float):
-            after_time = datetime.fromtimestamp(after_time, tz=timezone.utc)
-        after_time_iso = after_time.isoformat()
+        after_time = _convert_after_time(after_time)
+        after_time_iso = datetime.fromtimestamp(after_time, tz=timezone.utc).isoformat()
         log.debug(
             "%s is checking for event patterns happening after %s: %s",
             self,
@@ -417,11 +1057,11 @@ class EventListener:
         )
         found_events = set()
         patterns = set(patterns)
-        for event in copy.copy(self.store):
+        for event in self._candidate_events(patterns, after_time):
             if event.expired:
                 # Too old, carry on
                 continue
-            if event.stamp < after_time:
+            if event.timestamp < after_time:
                 continue
             for pattern in set(patterns):
                 _daemon_id, _pattern = pattern
@@ -455,18 +1095,15 @@ class EventListener:
             assert a match.
         :keyword int,float timeout:
             The amount of time to wait for the events, in seconds.
-        :keyword ~datetime.datetime,float after_time:
-            After which time to start matching events.
+        :keyword ~datetime.datetime,int,float after_time:
+            After which time to start matching events. Defaults to now.
 
         :return:
             An instance of :py:class:`~saltfactories.plugins.event_listener.MatchedEvents`.
         :rtype ~saltfactories.plugins.event_listener.MatchedEvents:
         """
-        if after_time is None:
-            after_time = datetime.now(tz=timezone.utc)
-        elif isinstance(after_time, float):
-            after_time = datetime.fromtimestamp(after_time, tz=timezone.utc)
-        after_time_iso = after_time.isoformat()
+        after_time = _convert_after_time(after_time)
+        after_time_iso = datetime.fromtimestamp(after_time, tz=timezone.utc).isoformat()
         log.debug(
             "%s is waiting for event patterns happening after %s: %s",
             self,
@@ -479,11 +1116,11 @@ class EventListener:
         while True:
             if not patterns:
                 return True
-            for event in copy.copy(self.store):
+            for event in self._candidate_events(patterns, after_time):
                 if event.expired:
                     # Too old, carry on
                     continue
-                if event.stamp < after_time:
+                if event.timestamp < after_time:
                     continue
                 for pattern in set(patterns):
                     _daemon_id, _pattern = pattern
@@ -500,6 +1137,135 @@ class EventListener:
             time.sleep(0.5)
         return MatchedEvents(matches=found_events, missed=patterns)
 
+    def get_job(self, jid):
+        """
+        Get what is known about a job.
+
+        Please look at :py:meth:`~saltfactories.plugins.event_listener.JobTracker.get_job` for the
+        supported arguments documentation.
+        """
+        return self.job_tracker.get_job(jid)
+
+    def wait_for_job(self, jid, minions=None, timeout=30):
+        """
+        Wait for all minions to return for a job, or until timeout is reached.
+
+        Unlike :py:meth:`~saltfactories.plugins.event_listener.EventListener.wait_for_events`, this does
+        not scan the event store, it's woken up as the job's events arrive.
+
+        .. code-block:: python
+
+            def test_ping(event_listener, salt_master, salt_minion):
+                (result,) = salt_master.salt_client().run_many(
+                    Call(function="test.ping", minion_tgt=salt_minion.id)
+                )
+                job = event_listener.wait_for_job(result.jid, timeout=30)
+                assert job.is_complete(), job.pending
+                assert job.returns[salt_minion.id].data["return"] is True
+
+        Please look at :py:meth:`~saltfactories.plugins.event_listener.JobTracker.wait_for_job` for the
+        supported arguments documentation.
+        """
+        return self.job_tracker.wait_for_job(jid, minions=minions, timeout=timeout)
+
+    @contextlib.contextmanager
+    def recording(self, path):
+        """
+        Record the received events to a file while the context is active.
+
+        .. code-block:: python
+
+            def test_highstate(event_listener, salt_call_cli, tmp_path):
+                with event_listener.recording(tmp_path / "highstate.events") as recorder:
+                    ret = salt_call_cli.run("state.highstate")
+                    assert ret.returncode == 0
+                assert recorder.count
+
+        The recording can be replayed with :py:func:`~saltfactories.utils.event_recording.replay_events`.
+
+        :param ~pathlib.Path path:
+            The path to the recording file
+        :return:
+            A :py:class:`~saltfactories.utils.event_recording.EventRecorder` instance
+        """
+        with EventRecorder(path=path) as recorder:
+            self.recorders.append(recorder)
+            try:
+                yield recorder
+            finally:
+                self.recorders.remove(recorder)
+
+    def subscribe_to_master(self, master_id, opts):
+        """
+        Subscribe directly to a local master's event publisher.
+
+        The master's events are stored just like the ones forwarded by the ``pytest`` engine, so the
+        master should not also have the engine enabled. Only masters running on the same host, and whose
+        ``sock_dir`` is reachable from the test process, can be subscribed to.
+
+        :param str master_id:
+            The master ID
+        :param dict opts:
+            The master configuration
+        """
+        self.unsubscribe_from_master(master_id)
+        subscriber = MasterEventSubscriber(
+            master_id=master_id,
+            opts=opts,
+            callback=self._process_event_payload,
+        )
+        self.master_subscribers[master_id] = subscriber
+        subscriber.start()
+
+    def unsubscribe_from_master(self, master_id):
+        """
+        Stop the subscription, if any, to the provided master ID's event publisher.
+
+        :param str master_id:
+            The master ID
+        """
+        subscriber = self.master_subscribers.pop(master_id, None)
+        if subscriber is not None:
+            subscriber.stop()
+
+    def register_daemon(self, daemon_id):
+        """
+        Register a daemon whose events should be received.
+
+        Only needed when receiving the events through the ``pytest-xdist`` controller's shared
+        :py:class:`~saltfactories.plugins.broker.EventBroker`, which only routes the events of the
+        registered daemons, otherwise, the events of all daemons are received.
+
+        :param str daemon_id:
+            The daemon ID
+        """
+        if self.broker_subscriber is not None:
+            self.broker_subscriber.subscribe(daemon_id)
+
+    def register_event_callback(self, callback):
+        """
+        Register a callback to run for every event, once it's stored.
+
+        :type callback: ~collections.abc.Callable
+        :param callback:
+            The function which should be called with each
+            :py:class:`~saltfactories.plugins.event_listener.Event`. It runs on the thread which received
+            the event, so it should be quick.
+        """
+        self.event_callbacks.append(callback)
+
+    def unregister_event_callback(self, callback):
+        """
+        Un-register an event callback.
+
+        :type callback: ~collections.abc.Callable
+        :param callback:
+            The function passed to
+            :py:meth:`~saltfactories.plugins.event_listener.EventListener.register_event_callback`
+        """
+        with contextlib.suppress(ValueError):
+            self.event_callbacks.remove(callback)
+
     def register_auth_event_handler(self, master_id, callback):
         """
         Register a callback to run for every authentication event, to accept or reject the minion authenticating.
@@ -523,7 +1289,7 @@ class EventListener:
 
 
 @pytest.fixture(scope="session")
-def event_listener():
+def event_listener(request):
     """
     Event listener session scoped fixture.
 
@@ -564,8 +1330,37 @@ def event_listener():
                 assert event.data["cmd"] == "_minion_event"
                 assert "event.fire" in event.data["data"]
     """
+    columnar_store = request.config.getoption("--columnar-event-store")
+    record_events = request.config.getoption("--record-events")
+    broker_subscriber = request.config.pluginmanager.get_plugin("saltfactories-broker-subscriber")
+    with EventListener(
+        columnar_store=columnar_store, broker_subscriber=broker_subscriber
+    ) as _event_listener:
+        if record_events is None:
+            yield _event_listener
+        else:
+            with _event_listener.recording(record_events):
+                yield _event_listener
+
+
+@pytest.fixture
+def event_firehose():
+    """
+    Event listener load generator fixture.
+
+    Returns a :py:class:`~saltfactories.utils.firehose.Firehose` targeting a dedicated
+    :py:class:`~saltfactories.plugins.event_listener.EventListener`, not the session's one, so that
+    its store isn't flooded with the generated events.
+
+    .. code-block:: python
+
+        def test_event_listener_throughput(event_firehose):
+            result = event_firehose.run(connections=4, rate=500, duration=5)
+            assert result.dropped == 0
+            assert result.p99 < 0.1
+    """
     with EventListener() as _event_listener:
-        yield _event_listener
+        yield Firehose(event_listener=_event_listener)
 
 
 @pytest.fixture(autouse=True)
@@ -578,3 +1373,28 @@ def _restart_event_listener(event_listener):  # pylint: disable=redefined-outer-
     finally:
         # No-op is the server hasn't stopped running
         event_listener.start_server()
+
+
+def pytest_addoption(parser):
+    """
+    Register argparse-style options and ini-style config values.
+    """
+    group = parser.getgroup("Salt Factories")
+    group.addoption(
+        "--columnar-event-store",
+        default=False,
+        action="store_true",
+        help=(
+            "Tell salt-factories to keep the received salt events in a compact, columnar, store. "
+            "Useful on long test runs, with lots of events."
+        ),
+    )
+    group.addoption(
+        "--record-events",
+        default=None,
+        type=pathlib.Path,
+        help=(
+            "Record all of the salt events received during the test session to the passed path. "
+            "The recording can be replayed with `saltfactories.utils.event_recording.replay_events`."
+        ),
+    )
@@ -9,11 +9,21 @@ import tempfile
 
 import pytest
 import pytestskipmarkers.utils.platform
+from pytestshellutils.utils import time
 
 import saltfactories
+from saltfactories.utils import profiling
+from saltfactories.utils import topology
+from saltfactories.utils import tracing
+from saltfactories.utils.resource_sampler import ResourceSampler
 
 log = logging.getLogger(__name__)
 
+PROFILES_DIR_KEY = pytest.StashKey()
+TOPOLOGIES_KEY = pytest.StashKey()
+STARTUP_COSTS_KEY = pytest.StashKey()
+PREVIOUS_TOPOLOGY_KEY = pytest.StashKey()
+
 
 @pytest.fixture(scope="session")
 def _salt_factories_config(request):  # noqa: PT005
@@ -74,6 +84,7 @@ def salt_factories_default_root_dir():
 
 @pytest.fixture(scope="session")
 def salt_factories(
+    request,
     event_listener,
     stats_processes,
     salt_factories_default_root_dir,  # pylint: disable=redefined-outer-name
@@ -102,9 +113,23 @@ def salt_factories(
         "Instantiating the Salt Factories Manager with the following keyword arguments:\n%s",
         pprint.pformat(factories_config),
     )
-    return FactoriesManager(
+    resource_sampler = request.config.pluginmanager.get_plugin("saltfactories-resource-sampler")
+    if resource_sampler is not None:
+        resource_sampler.stats_processes = stats_processes
+        factories_config.setdefault("resource_sampler", resource_sampler)
+    profile = request.config.getoption("--salt-factories-profile")
+    if profile is not None:
+        factories_config.setdefault("profile", profile)
+    factories_manager = FactoriesManager(
         stats_processes=stats_processes, event_listener=event_listener, **factories_config
     )
+    if factories_manager.profiles_dir is not None:
+        request.config.stash[PROFILES_DIR_KEY] = factories_manager.profiles_dir
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        # The salt CLI's copy the environment when instantiated, not the factories manager's
+        for key, value in factories_manager.get_profile_environ().items():
+            monkeypatch.setenv(key, value)
+        yield factories_manager
 
 
 def pytest_addoption(parser):
@@ -141,3 +166,229 @@ def pytest_addoption(parser):
             "said scripts and set `python_executable` to `None`."
         ),
     )
+    group.addoption(
+        "--salt-factories-trace",
+        default=None,
+        type=pathlib.Path,
+        help=(
+            "Record the salt daemons and containers lifecycle phases and write them, at the end "
+            "of the session, to the passed path, as a Chrome trace JSON file, which can be loaded "
+            "in Perfetto or chrome://tracing. When running under pytest-xdist, each worker writes "
+            "its own file, suffixed with the worker id."
+        ),
+    )
+    group.addoption(
+        "--salt-factories-resources",
+        default=None,
+        type=pathlib.Path,
+        help=(
+            "Sample the CPU, memory, open file descriptors, threads and child processes of the "
+            "started salt daemons and containers, and write the samples, as CSV, to the passed "
+            "path, and a per-test summary, as JSON, next to it. When running under pytest-xdist, "
+            "each worker writes its own files, suffixed with the worker id."
+        ),
+    )
+    group.addoption(
+        "--salt-factories-profile",
+        default=None,
+        metavar="GLOB",
+        help=(
+            "Run the salt daemons whose ID, and the salt daemons and CLI's whose script name, for "
+            "example, salt-master or salt-call, match the passed glob, under cProfile. The profiles "
+            "are written to the 'profiles' directory under the salt-factories root directory, and "
+            "the hottest functions of each profiled daemon, or CLI, are reported at the end of the "
+            "session."
+        ),
+    )
+    group.addoption(
+        "--salt-factories-resources-interval",
+        default=1.0,
+        type=float,
+        help="The interval, in seconds, between resource samples. Defaults to 1 second.",
+    )
+
+
+def _get_session_path(config, option):
+    """
+    Return the path passed to the option, suffixed with the pytest-xdist worker id, if any.
+    """
+    path = config.getoption(option)
+    if path is None:
+        return None
+    worker_id = getattr(config, "workerinput", {}).get("workerid")
+    if worker_id is not None:
+        path = path.with_name(f"{path.stem}-{worker_id}{path.suffix}")
+    return path.resolve()
+
+
+def pytest_configure(config):
+    """
+    Enable the lifecycle tracing and the resource sampling if asked to.
+    """
+    config.addinivalue_line(
+        "markers",
+        f"{topology.MARKER_NAME}(*names): The salt daemons topology the test needs, usually the names of "
+        "the fixtures providing the daemons. Tests needing the same topology are run one after the other.",
+    )
+    if _get_session_path(config, "--salt-factories-trace") is not None:
+        tracing.tracer.enabled = True
+    resources_path = _get_session_path(config, "--salt-factories-resources")
+    if resources_path is not None:
+        resource_sampler = ResourceSampler(
+            path=resources_path,
+            interval=config.getoption("--salt-factories-resources-interval"),
+        )
+        config.pluginmanager.register(resource_sampler, "saltfactories-resource-sampler")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config, items):
+    """
+    Run the tests needing the same salt daemons topology one after the other.
+
+    When running under ``pytest-xdist`` with ``--dist loadgroup``, they're also grouped on the same worker.
+    """
+    topologies = {item.nodeid: topology.get_topology(item) for item in items}
+    if not any(topologies.values()):
+        return
+    starts_before = topology.count_starts([topologies[item.nodeid] for item in items])
+    items[:] = topology.reorder(items, get_topology_func=lambda item: topologies[item.nodeid])
+    starts_after = topology.count_starts([topologies[item.nodeid] for item in items])
+    cache = getattr(config, "cache", None)
+    costs = cache.get(topology.CACHE_KEY, {}) if cache is not None else {}
+    config.stash[TOPOLOGIES_KEY] = (
+        len(starts_after),
+        *topology.estimate_savings(starts_before, starts_after, costs),
+    )
+    config.stash[STARTUP_COSTS_KEY] = {}
+    if not config.getoption("loadgroup", False):
+        # Set, on the pytest-xdist workers, when running with ``--dist loadgroup``
+        return
+    for item in items:
+        name = topologies[item.nodeid]
+        if name is not None and item.get_closest_marker("xdist_group") is None:
+            # Must happen before pytest-xdist appends the group to the node ID
+            item.add_marker(pytest.mark.xdist_group(name=f"salt-topology:{name}"))
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_setup(item):
+    """
+    Record how long the first test of each salt daemons topology took to set up, which is when the
+    topology's daemons start.
+    """
+    costs = item.config.stash.get(STARTUP_COSTS_KEY, None)
+    if costs is None:
+        yield
+        return
+    name = topology.get_topology(item)
+    previous = item.config.stash.get(PREVIOUS_TOPOLOGY_KEY, None)
+    item.config.stash[PREVIOUS_TOPOLOGY_KEY] = name
+    if name is None or name == previous:
+        yield
+        return
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        costs[name] = round(time.monotonic() - start, 3)
+
+
+def pytest_sessionstart(session):
+    """
+    Start the resource sampling, if sampling.
+    """
+    resource_sampler = session.config.pluginmanager.get_plugin("saltfactories-resource-sampler")
+    if resource_sampler is not None:
+        resource_sampler.start()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item):
+    """
+    Attribute the resource samples taken while the test runs, including its setup and teardown, to it.
+    """
+    resource_sampler = item.config.pluginmanager.get_plugin("saltfactories-resource-sampler")
+    if resource_sampler is None:
+        yield
+        return
+    resource_sampler.start_test(item.nodeid)
+    try:
+        yield
+    finally:
+        resource_sampler.finish_test(item.nodeid)
+
+
+def pytest_sessionfinish(session):
+    """
+    Write the lifecycle trace, stop the resource sampling, and record the salt daemons topologies start up
+    costs.
+    """
+    costs = session.config.stash.get(STARTUP_COSTS_KEY, None)
+    cache = getattr(session.config, "cache", None)
+    if costs and cache is not None:
+        cache.set(topology.CACHE_KEY, dict(cache.get(topology.CACHE_KEY, {}), **costs))
+    path = _get_session_path(session.config, "--salt-factories-trace")
+    if path is not None:
+        tracing.tracer.write(path)
+        log.info("Salt factories lifecycle trace written to %s", path)
+    resource_sampler = session.config.pluginmanager.get_plugin("saltfactories-resource-sampler")
+    if resource_sampler is not None:
+        resource_sampler.stop()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """
+    Report the profiled salt daemons and CLI's hottest functions, the time saved by running the tests
+    needing the same salt daemons topology one after the other, and the tests during which the salt
+    daemons and containers grew the most, and used the most CPU.
+    """
+    _report_profiles(terminalreporter, config)
+    _report_topologies(terminalreporter, config)
+    resource_sampler = config.pluginmanager.get_plugin("saltfactories-resource-sampler")
+    if resource_sampler is None or not resource_sampler.summaries:
+        return
+    terminalreporter.section("Salt Factories Resources")
+    terminalreporter.write_line("Highest memory growth:")
+    for test, name, summary in resource_sampler.top("rss_growth"):
+        terminalreporter.write_line(
+            f"  {summary.rss_growth / 1024 / 1024:+.1f} MiB {name} during {test}"
+        )
+    terminalreporter.write_line("Highest mean CPU usage:")
+    for test, name, summary in resource_sampler.top("cpu_mean"):
+        terminalreporter.write_line(f"  {summary.cpu_mean:.1f}% {name} during {test}")
+    terminalreporter.write_line(f"Resource samples written to {resource_sampler.path}")
+    terminalreporter.write_line(f"Per-test summary written to {resource_sampler.summary_path}")
+
+
+def _report_topologies(terminalreporter, config):
+    topologies = config.stash.get(TOPOLOGIES_KEY, None)
+    if topologies is None:
+        return
+    count, saved_starts, saved_seconds, unknown = topologies
+    terminalreporter.section("Salt Factories Topologies")
+    line = f"Ran the tests of {count} topologies one after the other, saving {saved_starts} topology starts"
+    if saved_seconds is not None:
+        line += f", an estimated {saved_seconds:.1f}s based on the recorded start up costs"
+    terminalreporter.write_line(line)
+    if unknown:
+        terminalreporter.write_line(f"No start up cost recorded yet for: {', '.join(unknown)}")
+
+
+def _report_profiles(terminalreporter, config):
+    profiles_dir = config.stash.get(PROFILES_DIR_KEY, None)
+    if profiles_dir is None:
+        return
+    terminalreporter.section("Salt Factories Profiles")
+    profiles = profiling.get_profiles(profiles_dir)
+    if not profiles:
+        terminalreporter.write_line(f"No profiles were written to {profiles_dir}")
+        return
+    for name, paths in profiles.items():
+        terminalreporter.write_line(f"{name}, {len(paths)} process(es):")
+        terminalreporter.write_line(f"  {'own time':>10} {'cumulative':>10} {'calls':>10}  function")
+        for function, calls, own_time, cumulative_time in profiling.hottest_functions(paths):
+            terminalreporter.write_line(
+                f"  {own_time:>9.3f}s {cumulative_time:>9.3f}s {calls:>10}  {function}"
+            )
+    terminalreporter.write_line(f"Profiles written to {profiles_dir}")
@@ -30,10 +30,11 @@ import attr
 import msgpack
 import pytest
 import zmq
-from pytestshellutils.utils import ports
 from pytestshellutils.utils import time
 from pytestskipmarkers.utils import platform
 
+from saltfactories.utils import port_allocator
+
 log = logging.getLogger(__name__)
 
 
@@ -41,12 +42,18 @@ log = logging.getLogger(__name__)
 class LogServer:
     """
     Log server plugin.
+
+    :keyword bool remote:
+        The log records are received by someone else, for example, the ``pytest-xdist`` controller's
+        shared :py:class:`~saltfactories.plugins.broker.EventBroker`, at ``log_host`` and ``log_port``,
+        this log server doesn't start.
     """
 
     log_host = attr.ib()
     log_port = attr.ib()
     log_level = attr.ib()
     socket_hwm = attr.ib()
+    remote = attr.ib(default=False)
     running_event = attr.ib(init=False, repr=False, hash=False)
     sentinel_event = attr.ib(init=False, repr=False, hash=False)
     process_queue_thread = attr.ib(init=False, repr=False, hash=False)
@@ -60,7 +67,7 @@ class LogServer:
 
     @log_port.default
     def _default_log_port(self):
-        return ports.get_unused_localhost_port()
+        return port_allocator.allocator.get_bindable_port(host=self.log_host)
 
     @socket_hwm.default
     def _default_socket_hwm(self):
@@ -71,6 +78,8 @@ class LogServer:
         """
         Start the log server.
         """
+        if self.remote:
+            return
         log.info("%s starting...", self)
         self.sentinel_event = threading.Event()
         self.running_event = threading.Event()
@@ -87,6 +96,8 @@ class LogServer:
         """
         Stop the log server.
         """
+        if self.remote:
+            return
         log.info("%s stopping...", self)
         address = f"tcp://{self.log_host}:{self.log_port}"
         context = zmq.Context()
@@ -233,7 +244,17 @@ def pytest_configure(config):
 
     log_level = logging.getLevelName(min(levels))
 
-    log_server = LogServer(log_level=log_level)
+    broker_subscriber = config.pluginmanager.get_plugin("saltfactories-broker-subscriber")
+    if broker_subscriber is not None:
+        # The daemons forward their log records to the broker, which routes them to this worker
+        log_server = LogServer(
+            log_level=log_level,
+            log_host=broker_subscriber.host,
+            log_port=broker_subscriber.logs_port,
+            remote=True,
+        )
+    else:
+        log_server = LogServer(log_level=log_level)
     config.pluginmanager.register(log_server, "saltfactories-log-server")
 
 
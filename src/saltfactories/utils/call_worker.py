@@ -0,0 +1,106 @@
+"""
+Persistent ``salt-call`` worker.
+
+Every ``salt-call`` run starts a new python interpreter which then loads the minion's grains, execution
+modules and pillar before calling the requested function. A persistent worker does that once, it keeps a
+warm :py:class:`salt.cli.caller.Caller` around, one per ``(python_executable, config_dir)`` pair, and
+calls the requested functions on it.
+
+The loaded caller is discarded, and loaded again on the next call, when the minion configuration changes
+on disk or after calling any of the ``saltutil.sync_*``, ``saltutil.refresh_*`` or ``saltutil.clear_cache``
+functions.
+
+The worker is opt-in, per CLI instance:
+
+.. code-block:: python
+
+    def test_ping(salt_minion):
+        salt_call_cli = salt_minion.salt_call_cli(persistent=True)
+        ret = salt_call_cli.run("test.ping")
+        assert ret.returncode == 0
+        assert ret.data is True
+"""
+import json
+import logging
+import socket
+
+import attr
+from pytestshellutils.exceptions import FactoryTimeout
+from pytestshellutils.utils import time
+from pytestshellutils.utils.processes import ProcessResult
+
+from saltfactories.utils.zygote import ScriptServer
+
+log = logging.getLogger(__name__)
+
+
+@attr.s(kw_only=True, slots=True, hash=True)
+class SaltCallWorker(ScriptServer):
+    """
+    Persistent ``salt-call`` worker process.
+
+    Please look at :py:class:`~saltfactories.utils.zygote.ScriptServer` for the supported keyword
+    arguments documentation.
+    """
+
+    def call(self, fun, *args, cmdline=None, retcode_passthrough=False, timeout=None):
+        """
+        Call the passed function on the worker's warm caller.
+
+        :param str fun:
+            The salt function to call.
+        :param str args:
+            The function arguments, as they would be passed to ``salt-call``.
+        :keyword list cmdline:
+            The equivalent ``salt-call`` command line, only used to populate the returned result.
+        :keyword bool retcode_passthrough:
+            Behave like ``salt-call --retcode-passthrough``.
+        :keyword int,float timeout:
+            How long, in seconds, to wait for the call to finish. When reached, the worker is stopped,
+            it will be started again on the next call, and
+            :py:class:`~pytestshellutils.exceptions.FactoryTimeout` is raised.
+
+        :return: A :py:class:`~pytestshellutils.utils.processes.ProcessResult` instance.
+        """
+        self.start()
+        request = {
+            "fun": fun,
+            "arg": [str(arg) for arg in args],
+            "retcode_passthrough": retcode_passthrough,
+        }
+        start_time = time.time()
+        with self._connect(timeout=10) as conn:
+            conn.sendall(json.dumps(request).encode() + b"\n")
+            conn.settimeout(timeout)
+            try:
+                line = conn.makefile("rb").readline()
+            except socket.timeout:
+                line = None
+        if line is None:
+            # There's no way to interrupt the function call, stop the worker
+            process = self._process
+            self.stop()
+            msg = (
+                f"{self} Failed to run: {cmdline}; Error: Timed out after "
+                f"{time.time() - start_time:.2f} seconds!"
+            )
+            result = ProcessResult(
+                returncode=process.returncode, stdout="", stderr="", cmdline=cmdline
+            )
+            raise FactoryTimeout(msg, process_result=result)
+        if not line:
+            # The worker died while running the function
+            self.stop()
+            return ProcessResult(
+                returncode=1,
+                stdout="",
+                stderr=f"{self} exited while calling {fun!r}",
+                cmdline=cmdline,
+            )
+        response = json.loads(line)
+        return ProcessResult(
+            returncode=response["returncode"],
+            stdout=response["stdout"],
+            stderr=response["stderr"],
+            cmdline=cmdline,
+        )
@@ -117,6 +117,276 @@ SCRIPT_TEMPLATES = {
             os._exit(exitcode)
         """
     ),
+    "zygote": textwrap.dedent(
+        """
+        import json
+        import random
+        import runpy
+        import signal
+        import socket
+        import traceback
+
+        # Pre-import what the salt CLI's need, forked children will not pay this price again
+        import salt.cli.call
+        import salt.cli.run
+        import salt.cli.salt
+        import salt.client
+        import salt.config
+        import salt.key
+        import salt.scripts
+        import salt.utils.parsers
+
+
+        def warm_config(config_dir):
+            # Load the configuration once so that any lazily imported modules needed to
+            # parse it are already loaded when a CLI is forked
+            loaders = (
+                ("master", salt.config.master_config),
+                ("minion", salt.config.minion_config),
+            )
+            for name, loader in loaders:
+                path = os.path.join(config_dir, name)
+                if not os.path.isfile(path):
+                    continue
+                try:
+                    loader(path)
+                except Exception:
+                    traceback.print_exc()
+
+
+        def send(conn, **payload):
+            conn.sendall(json.dumps(payload).encode() + b"\\n")
+
+
+        def exitcode_from_status(status):
+            if os.WIFSIGNALED(status):
+                return -os.WTERMSIG(status)
+            return os.WEXITSTATUS(status)
+
+
+        def run_cli(request):
+            os.chdir(request["cwd"])
+            os.environ.clear()
+            os.environ.update(request["env"])
+            stdin = os.open(os.devnull, os.O_RDONLY)
+            stdout = os.open(request["stdout"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            stderr = os.open(request["stderr"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            os.dup2(stdin, 0)
+            os.dup2(stdout, 1)
+            os.dup2(stderr, 2)
+            for fd in (stdin, stdout, stderr):
+                os.close(fd)
+            # Don't share the random state with every other forked child
+            random.seed()
+            sys.argv = list(request["argv"])
+            # The generated CLI scripts call os._exit() themselves
+            runpy.run_path(sys.argv[0], run_name="__main__")
+
+
+        def handle_connection(conn):
+            request = json.loads(conn.makefile("rb").readline())
+            pid = os.fork()
+            if pid == 0:
+                conn.close()
+                exitcode = 1
+                try:
+                    run_cli(request)
+                    exitcode = 0
+                except BaseException:
+                    traceback.print_exc()
+                finally:
+                    sys.stdout.flush()
+                    sys.stderr.flush()
+                    os._exit(exitcode)
+            send(conn, pid=pid)
+            _, status = os.waitpid(pid, 0)
+            send(conn, returncode=exitcode_from_status(status))
+
+
+        def main():
+            socket_path, config_dir = sys.argv[1:3]
+            warm_config(config_dir)
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            server.bind(socket_path)
+            server.listen(128)
+            # Let the kernel reap the connection handlers
+            signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+            while True:
+                conn, _ = server.accept()
+                if os.fork() != 0:
+                    conn.close()
+                    continue
+                server.close()
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                try:
+                    handle_connection(conn)
+                except BaseException:
+                    traceback.print_exc()
+                finally:
+                    os._exit(0)
+
+        if __name__ == '__main__':
+            try:
+                main()
+            except KeyboardInterrupt:
+                pass
+        """
+    ),
+    "call-worker": textwrap.dedent(
+        """
+        import contextlib
+        import copy
+        import io
+        import json
+        import socket
+        import traceback
+
+        import salt.cli.caller
+        import salt.config
+        import salt.output
+        import salt.utils.parsers
+
+        # Calling any of these functions changes what the loader would load, or the data the
+        # minion functions rely on, the next call gets a freshly loaded caller
+        INVALIDATING_FUNCTIONS = (
+            "saltutil.sync_",
+            "saltutil.refresh_",
+            "saltutil.clear_cache",
+        )
+
+
+        def config_mtimes(config_dir):
+            paths = [os.path.join(config_dir, "minion")]
+            minion_d = os.path.join(config_dir, "minion.d")
+            if os.path.isdir(minion_d):
+                paths.extend(os.path.join(minion_d, name) for name in sorted(os.listdir(minion_d)))
+            mtimes = []
+            for path in paths:
+                with contextlib.suppress(OSError):
+                    mtimes.append((path, os.stat(path).st_mtime_ns))
+            return mtimes
+
+
+        class Worker:
+            def __init__(self, config_dir):
+                self.config_dir = config_dir
+                self.overrides = None
+                self.caller = None
+                self.mtimes = None
+
+            def load_opts(self):
+                config_file = os.path.join(self.config_dir, "minion")
+                if self.overrides is None:
+                    # The command line can only be parsed once, the logging options get frozen.
+                    # Keep what parsing it changes in the configuration to apply it on reloads.
+                    parser = salt.utils.parsers.SaltCallOptionParser()
+                    parser.parse_args(
+                        [
+                            "--config-dir=" + self.config_dir,
+                            "--out=json",
+                            "--out-indent=0",
+                            "--log-level=quiet",
+                            "test.ping",
+                        ]
+                    )
+                    file_opts = salt.config.minion_config(config_file, cache_minion_id=True)
+                    self.overrides = copy.deepcopy(
+                        dict(
+                            (key, value)
+                            for (key, value) in parser.config.items()
+                            if key not in file_opts or file_opts[key] != value
+                        )
+                    )
+                    return parser.config
+                opts = salt.config.minion_config(config_file, cache_minion_id=True)
+                opts.update(copy.deepcopy(self.overrides))
+                return opts
+
+            def get_caller(self):
+                mtimes = config_mtimes(self.config_dir)
+                if self.caller is not None and mtimes != self.mtimes:
+                    # The configuration changed on disk
+                    self.caller = None
+                if self.caller is None:
+                    self.caller = salt.cli.caller.Caller.factory(self.load_opts())
+                    self.mtimes = mtimes
+                return self.caller
+
+            def call(self, request):
+                caller = self.get_caller()
+                caller.opts["fun"] = request["fun"]
+                caller.opts["arg"] = request["arg"]
+                # A salt-call process would start with an empty __context__
+                for loader in (caller.minion.functions, caller.minion.executors):
+                    with contextlib.suppress(AttributeError, KeyError):
+                        loader.pack["__context__"].pop("retcode", None)
+                ret = caller.call()
+                print(salt.output.out_format(dict(local=ret.get("return")), "json", caller.opts))
+                if request["fun"].startswith(INVALIDATING_FUNCTIONS):
+                    self.caller = None
+                retcode = ret.get("retcode", 0)
+                if request["retcode_passthrough"]:
+                    return retcode
+                if retcode != 0:
+                    return 1
+                return 0
+
+            def handle(self, request):
+                stdout = io.StringIO()
+                stderr = io.StringIO()
+                returncode = 1
+                with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                    try:
+                        returncode = self.call(request)
+                    except SystemExit as exc:
+                        returncode = exc.code
+                        # https://docs.python.org/3/library/exceptions.html#SystemExit
+                        if returncode is None:
+                            returncode = 0
+                        if not isinstance(returncode, int):
+                            # A string?!
+                            sys.stderr.write(str(returncode))
+                            returncode = 1
+                        # The caller might have been left in an unknown state
+                        self.caller = None
+                    except Exception as exc:
+                        sys.stderr.write(
+                            "An un-handled exception was caught: " + str(exc) + "\\n" + traceback.format_exc()
+                        )
+                        self.caller = None
+                return dict(returncode=returncode, stdout=stdout.getvalue(), stderr=stderr.getvalue())
+
+
+        def main():
+            socket_path, config_dir = sys.argv[1:3]
+            worker = Worker(config_dir)
+            # Load the caller right away, that's the slow part
+            worker.get_caller()
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            server.bind(socket_path)
+            server.listen(128)
+            while True:
+                conn, _ = server.accept()
+                with conn:
+                    line = conn.makefile("rb").readline()
+                    if not line:
+                        # Just checking if we're accepting connections
+                        continue
+                    response = worker.handle(json.loads(line))
+                    with contextlib.suppress(OSError):
+                        conn.sendall(json.dumps(response).encode() + b"\\n")
+
+        if __name__ == '__main__':
+            try:
+                main()
+            except KeyboardInterrupt:
+                pass
+        """
+    ),
     "coverage": textwrap.dedent(
         """
         # Setup coverage environment variables
@@ -126,6 +396,75 @@ SCRIPT_TEMPLATES = {
         os.environ[str('COVERAGE_PROCESS_START')] = str(COVERAGE_PROCESS_START)
         """
     ),
+    "profile": textwrap.dedent(
+        """
+        # Profile this process, and the processes it forks, if it matches the profile glob
+        SALT_FACTORIES_PROFILE = os.environ.get('SALT_FACTORIES_PROFILE')
+        SALT_FACTORIES_PROFILE_NAME = os.environ.get('SALT_FACTORIES_PROFILE_NAME') or '{script_name}'
+        if SALT_FACTORIES_PROFILE:
+            import fnmatch
+            SALT_FACTORIES_PROFILE = fnmatch.fnmatch(
+                SALT_FACTORIES_PROFILE_NAME, SALT_FACTORIES_PROFILE
+            ) or fnmatch.fnmatch('{script_name}', SALT_FACTORIES_PROFILE)
+        if SALT_FACTORIES_PROFILE:
+            import atexit
+            import cProfile
+            import multiprocessing.util
+
+            class SaltFactoriesProfiler:
+                def __init__(self, directory, name):
+                    self.directory = directory
+                    self.name = name
+                    self.profiler = None
+                    self.pid = None
+
+                def start(self):
+                    self.pid = os.getpid()
+                    self.profiler = cProfile.Profile()
+                    self.profiler.enable()
+                    atexit.register(self.stop)
+
+                def stop(self):
+                    if self.profiler is None or self.pid != os.getpid():
+                        return
+                    self.profiler.disable()
+                    path = os.path.join(self.directory, '%s.%d.prof' % (self.name, self.pid))
+                    try:
+                        self.profiler.dump_stats(path)
+                    except OSError:
+                        pass
+                    self.profiler = None
+
+                def after_fork(self):
+                    # The parent's profiler is still enabled in the forked child
+                    if self.profiler is not None:
+                        self.profiler.disable()
+                    self.start()
+
+                def register_finalizer(self):
+                    # Multiprocessing children exit without running the atexit functions
+                    multiprocessing.util.Finalize(None, self.stop, exitpriority=-100)
+
+            SALT_FACTORIES_PROFILER = SaltFactoriesProfiler(
+                os.environ['SALT_FACTORIES_PROFILE_DIR'], SALT_FACTORIES_PROFILE_NAME
+            )
+            SALT_FACTORIES_PROFILER.start()
+
+            # Salt's processes exit through os._exit when terminated, skipping both the atexit
+            # functions and the multiprocessing finalizers
+            SALT_FACTORIES_OS_EXIT = os._exit
+
+            def _salt_factories_os_exit(*args, **kwargs):
+                SALT_FACTORIES_PROFILER.stop()
+                SALT_FACTORIES_OS_EXIT(*args, **kwargs)
+
+            os._exit = _salt_factories_os_exit
+            os.register_at_fork(after_in_child=SALT_FACTORIES_PROFILER.after_fork)
+            multiprocessing.util.register_after_fork(
+                SALT_FACTORIES_PROFILER, SaltFactoriesProfiler.register_finalizer
+            )
+        """
+    ),
     "sitecustomize": textwrap.dedent(
         """
         # Allow sitecustomize.py to be importable for test coverage purposes
@@ -155,6 +494,7 @@ def generate_script(
     inject_sitecustomize=False,
     coverage_db_path=None,
     coverage_rc_path=None,
+    profile=False,
 ):
     """
     Generate a CLI script.
@@ -165,12 +505,20 @@ def generate_script(
     :param bool inject_sitecustomize: Inject code to support code coverage in subprocesses
     :param ~pathlib.Path coverage_db_path: The path to the `.coverage` DB file
     :param ~pathlib.Path coverage_rc_path: The path to the `.coveragerc` file
+    :param bool profile:
+        Inject code to run the script under :py:mod:`cProfile` when the ``SALT_FACTORIES_PROFILE``
+        environment variable glob matches the ``SALT_FACTORIES_PROFILE_NAME`` environment variable,
+        or the script name. The profiles are written to the ``SALT_FACTORIES_PROFILE_DIR``
+        environment variable directory. The script is named differently, so that it doesn't replace
+        a previously generated script without this code.
     """
     if isinstance(bin_dir, str):
         bin_dir = pathlib.Path(bin_dir)
     bin_dir.mkdir(exist_ok=True)
 
-    cli_script_name = "cli_{}.py".format(script_name.replace("-", "_"))
+    cli_script_name = "cli_{}{}.py".format(
+        script_name.replace("-", "_"), "_profile" if profile else ""
+    )
     script_path = bin_dir / cli_script_name
 
     if not script_path.is_file():
@@ -232,6 +580,11 @@ def generate_script(
                     + "\n\n"
                 )
 
+            if profile:
+                script_contents += (
+                    SCRIPT_TEMPLATES["profile"].format(script_name=script_name).strip() + "\n\n"
+                )
+
             script_contents += (
                 script_template.format(script_name.replace("salt-", "").replace("-", "_")).strip()
                 + "\n"
@@ -0,0 +1,251 @@
+"""
+Salt daemons configuration templates.
+
+Configuring a salt daemon writes its configuration file, has salt load it back, applying salt's defaults,
+and has salt verify, creating them with the right permissions, the daemon's directories, for example,
+its ``pki``, cache and log directories.
+
+The daemons of a test suite are mostly configured alike, only their ID, root directory and ports differ.
+So, the first daemon configured for each role, configuration and salt version, is kept as a template, its
+loaded configuration and its root directory layout, and the daemons configured alike after it are
+produced from it, recreating the directories of the template root directory, and patching its loaded
+configuration with their ID, root directory and ports, without having salt load, nor verify, anything.
+
+A daemon is only produced from a template when:
+
+* its configuration, once its ID, root directory and ports replaced by placeholders, is exactly the
+  same as the template's
+* the template root directory only holds directories, and the configuration file, and salt verified no
+  directories outside of it
+* the second daemon configured alike, which salt still loads and verifies, ends up with exactly the
+  configuration, and directories, the template produces for it. Otherwise, the template is discarded.
+"""
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import stat
+
+import attr
+
+from saltfactories.utils import cast_to_pathlib_path
+
+log = logging.getLogger(__name__)
+
+ROOT_DIR_PLACEHOLDER = "\x00salt-factories-root-dir\x00"
+ID_PLACEHOLDER = "\x00salt-factories-id\x00"
+MASTER_ID_PLACEHOLDER = "\x00salt-factories-master-id\x00"
+PORT_PLACEHOLDER = "\x00salt-factories-port\x00"
+
+
+def get_port_keys(factory_class, config):
+    """
+    Return the top level configuration keys holding ports.
+
+    Besides the ports the daemon binds to, it also includes the ports it connects to, for example, the
+    minion's ``master_port``, so that the minions of different masters are produced from the same template.
+    """
+    port_keys = {
+        key
+        for key, value in config.items()
+        if key.endswith("_port") and isinstance(value, int) and not isinstance(value, bool)
+    }
+    port_keys.update(
+        key
+        for key in factory_class._get_port_config_keys(config)  # pylint: disable=protected-access
+        if key in config
+    )
+    return sorted(port_keys)
+
+
+def get_replacements(config):
+    """
+    Return the ``(value, placeholder)`` pairs of the strings specific to the passed daemon configuration.
+    """
+    replacements = [
+        (str(config["root_dir"]), ROOT_DIR_PLACEHOLDER),
+        (str(config["id"]), ID_PLACEHOLDER),
+    ]
+    for section in ("pytest-minion", "pytest-master"):
+        master_id = (config.get(section) or {}).get("master-id")
+        if master_id:
+            replacements.append((str(master_id), MASTER_ID_PLACEHOLDER))
+    return replacements
+
+
+def _replace_strings(value, replacements):
+    if isinstance(value, str):
+        for old, new in replacements:
+            value = value.replace(old, new)
+        return value
+    if isinstance(value, dict):
+        return {
+            _replace_strings(key, replacements): _replace_strings(item, replacements)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_replace_strings(item, replacements) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_replace_strings(item, replacements) for item in value)
+    return value
+
+
+def _get_directories(root_dir, config_file):
+    """
+    Return the ``(path, mode)`` of each directory within the root directory, ``None`` if it holds anything
+    else than directories, and the configuration file.
+    """
+    directories = []
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        dirpath = pathlib.Path(dirpath)  # noqa: PLW2901
+        if any(dirpath / filename != config_file for filename in filenames):
+            return None
+        for dirname in sorted(dirnames):
+            path = dirpath / dirname
+            if path.is_symlink():
+                return None
+            directories.append((str(path.relative_to(root_dir)), stat.S_IMODE(path.stat().st_mode)))
+    return directories
+
+
+@attr.s(kw_only=True, slots=True, eq=False)
+class ConfigTemplate:
+    """
+    A salt daemon configuration template.
+
+    :keyword dict config:
+        The loaded configuration of the daemon the template was taken from, with its ID and root directory
+        replaced by placeholders
+    :keyword list port_keys:
+        The configuration keys holding ports
+    :keyword list directories:
+        The ``(path, mode)`` of each directory within the root directory, the paths relative to it, parents
+        first
+    """
+
+    config = attr.ib(repr=False)
+    port_keys = attr.ib(repr=False)
+    directories = attr.ib(repr=False)
+    verified = attr.ib(init=False, default=False)
+
+    def render_config(self, config):
+        """
+        Return the loaded configuration of the passed daemon configuration.
+
+        :param dict config:
+            The daemon's configuration, as written to its configuration file
+        """
+        loaded_config = _replace_strings(
+            self.config, [(placeholder, value) for value, placeholder in get_replacements(config)]
+        )
+        for key in self.port_keys:
+            loaded_config[key] = config[key]
+        return loaded_config
+
+    def create_directories(self, root_dir):
+        """
+        Create the template directories within the passed root directory.
+        """
+        root_dir = pathlib.Path(root_dir)
+        for path, mode in self.directories:
+            directory = root_dir / path
+            directory.mkdir(exist_ok=True)
+            os.chmod(directory, mode)
+
+
+@attr.s(kw_only=True, slots=True, eq=False)
+class ConfigTemplates:
+    """
+    Keep a configuration template per salt daemon role, configuration and salt version.
+    """
+
+    templates = attr.ib(init=False, repr=False, factory=dict)
+    hits = attr.ib(init=False, default=0)
+    misses = attr.ib(init=False, default=0)
+
+    @staticmethod
+    def get_key(factory_class, config, config_file):
+        """
+        Return the template key of the passed daemon configuration.
+        """
+        # Do not move these deferred imports. It allows running against a Salt
+        # onedir build in salt's repo checkout.
+        import salt.version  # pylint: disable=import-outside-toplevel
+
+        replacements = get_replacements(config)
+        normalized = _replace_strings(config, replacements)
+        for key in get_port_keys(factory_class, config):
+            normalized[key] = PORT_PLACEHOLDER
+        contents = json.dumps(
+            [
+                f"{factory_class.__module__}.{factory_class.__qualname__}",
+                str(salt.version.__saltstack_version__),
+                _replace_strings(str(config_file), replacements),
+                normalized,
+            ],
+            sort_keys=True,
+            default=repr,
+        )
+        return hashlib.sha256(contents.encode()).hexdigest()
+
+    def get(self, key):
+        """
+        Return the verified template with the passed key, ``None`` if there's none.
+        """
+        template = self.templates.get(key)
+        if template is None or template.verified is False:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return template
+
+    def add(self, key, factory_class, config, config_file, loaded_config, verify_entries=()):
+        """
+        Keep the daemon just configured, by salt, as the template for the daemons configured alike.
+
+        If there's already a template for it, which wasn't verified yet, verify it against it instead.
+
+        :param str key:
+            The template key
+        :param type factory_class:
+            The daemon's factory class
+        :param dict config:
+            The daemon's configuration, as written to its configuration file
+        :param str config_file:
+            The daemon's configuration file
+        :param dict loaded_config:
+            The daemon's configuration, as loaded by salt
+        :keyword list verify_entries:
+            The directories salt verified, the template doesn't qualify when any is outside the root directory
+        """
+        if key in self.templates and self.templates[key] is None:
+            # Discarded
+            return
+        root_dir = cast_to_pathlib_path(config["root_dir"])
+        for entry in verify_entries:
+            entry = pathlib.Path(entry)  # noqa: PLW2901
+            if entry != root_dir and root_dir not in entry.parents:
+                log.debug("%s not keeping %s as a template, %s is outside it", self, root_dir, entry)
+                return
+        directories = _get_directories(root_dir, cast_to_pathlib_path(config_file))
+        if directories is None:
+            log.debug("%s not keeping %s as a template, it holds files", self, root_dir)
+            return
+        template = self.templates.get(key)
+        if template is not None:
+            if template.directories == directories and template.render_config(config) == loaded_config:
+                template.verified = True
+            else:
+                log.debug("%s discarding the template %s did not verify", self, root_dir)
+                self.templates[key] = None
+            return
+        self.templates[key] = ConfigTemplate(
+            config=_replace_strings(loaded_config, get_replacements(config)),
+            port_keys=get_port_keys(factory_class, config),
+            directories=directories,
+        )
+
+
+# The session's configuration templates
+templates = ConfigTemplates()
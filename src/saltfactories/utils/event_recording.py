@@ -0,0 +1,217 @@
+"""
+Record and replay the salt event stream.
+
+The events received by the :py:class:`~saltfactories.plugins.event_listener.EventListener` can be recorded
+to a compact msgpack file, along with when, relative to the start of the recording, each of them was
+received:
+
+.. code-block:: python
+
+    def test_highstate(event_listener, salt_call_cli, tmp_path):
+        with event_listener.recording(tmp_path / "highstate.events"):
+            ret = salt_call_cli.run("state.highstate")
+            assert ret.returncode == 0
+
+The whole session's event stream can be recorded by passing ``--record-events=<path>`` to pytest.
+
+The recording can later be replayed into an event listener, which doesn't need to be started, at the
+recorded pace, faster, or as fast as possible, without starting any salt daemon:
+
+.. code-block:: python
+
+    listener = EventListener()
+    result = replay_events("highstate.events", listener, speed=None)
+    print(result.events_per_second)
+
+The recording file starts with a header, a map with the ``version`` and the ``started_at`` epoch timestamp
+keys, followed by an ``[offset, daemon_id, tag, data]`` array per event, ``offset`` being the seconds
+since the recording started.
+"""
+import logging
+import threading
+
+import attr
+import msgpack
+from pytestshellutils.utils import time
+
+from saltfactories.utils import cast_to_pathlib_path
+
+log = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+
+@attr.s(kw_only=True, slots=True, hash=False)
+class EventRecorder:
+    """
+    Record forwarded salt events to a file.
+
+    :keyword ~pathlib.Path path:
+        The path to the recording file. It's overwritten if it exists.
+    """
+
+    path = attr.ib(converter=cast_to_pathlib_path)
+    count = attr.ib(init=False, default=0)
+    _fh = attr.ib(init=False, repr=False, default=None)
+    _packer = attr.ib(init=False, repr=False, default=None)
+    _started_at = attr.ib(init=False, repr=False, default=None)
+    _lock = attr.ib(init=False, repr=False, factory=threading.Lock)
+
+    def __enter__(self):
+        """
+        Context manager support to start the recording.
+        """
+        self.start()
+        return self
+
+    def __exit__(self, *_):
+        """
+        Context manager support to stop the recording.
+        """
+        self.stop()
+
+    def start(self):
+        """
+        Start recording.
+        """
+        with self._lock:
+            if self._fh is not None:
+                return
+            log.debug("%s is starting", self)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Non serializable values, if any, are recorded as strings
+            self._packer = msgpack.Packer(use_bin_type=True, default=str)
+            self._fh = self.path.open("wb")
+            self._started_at = time.monotonic()
+            self._fh.write(self._packer.pack({"version": FORMAT_VERSION, "started_at": time.time()}))
+
+    def stop(self):
+        """
+        Stop recording.
+        """
+        with self._lock:
+            if self._fh is None:
+                return
+            self._fh.close()
+            self._fh = None
+            log.debug("%s stopped after recording %d events", self, self.count)
+
+    def record(self, payload):
+        """
+        Record a forwarded event.
+
+        :param dict payload:
+            The event, as forwarded by the ``pytest`` engine, a dictionary with the ``id``, ``tag`` and
+            ``data`` keys
+        """
+        with self._lock:
+            if self._fh is None:
+                return
+            offset = time.monotonic() - self._started_at
+            self._fh.write(
+                self._packer.pack((offset, payload["id"], payload["tag"], payload["data"]))
+            )
+            self.count += 1
+
+
+@attr.s(kw_only=True, slots=True, frozen=True)
+class ReplayResult:
+    """
+    The result of replaying a recording.
+
+    :keyword int events:
+        The number of replayed events
+    :keyword float duration:
+        How long, in seconds, the replay took
+    :keyword float lag:
+        The maximum delay, in seconds, between when an event should have been replayed, at the requested
+        speed, and when it was. Always ``0`` when replaying as fast as possible.
+    """
+
+    events = attr.ib()
+    duration = attr.ib()
+    lag = attr.ib(default=0.0)
+
+    @property
+    def events_per_second(self):
+        """
+        The replay throughput.
+        """
+        if not self.duration:
+            return 0.0
+        return self.events / self.duration
+
+
+def read_recording(path):
+    """
+    Read a recording.
+
+    :param ~pathlib.Path path:
+        The path to the recording file
+    :return:
+        A ``(header, events)`` tuple, ``events`` being a generator of ``(offset, payload)`` tuples, where
+        the payload is a dictionary with the ``id``, ``tag`` and ``data`` keys.
+    :raises ValueError: When the file is not a supported recording
+    """
+    path = cast_to_pathlib_path(path)
+    fh = path.open("rb")
+    unpacker = msgpack.Unpacker(fh, raw=False, strict_map_key=False, use_list=False)
+    try:
+        header = unpacker.unpack()
+    except msgpack.OutOfData:
+        header = None
+    if not isinstance(header, dict) or header.get("version") != FORMAT_VERSION:
+        fh.close()
+        msg = f"{path} is not a supported salt events recording"
+        raise ValueError(msg)
+
+    def _events():
+        with fh:
+            for offset, daemon_id, tag, data in unpacker:
+                yield offset, {"id": daemon_id, "tag": tag, "data": data}
+
+    return header, _events()
+
+
+def replay_events(path, event_listener, speed=1.0, rebase_stamps=True):
+    """
+    Replay a recording into an event listener.
+
+    The events are passed to the event listener just like the ones it receives from the salt daemons.
+
+    :param ~pathlib.Path path:
+        The path to the recording file
+    :param ~saltfactories.plugins.event_listener.EventListener event_listener:
+        The event listener to replay the events into. It doesn't need to be started.
+    :keyword float speed:
+        The replay speed, ``1.0`` replays at the recorded pace, ``2.0`` twice as fast. Pass ``None``
+        to replay as fast as possible.
+    :keyword bool rebase_stamps:
+        Replace the events ``_stamp`` with when they're replayed, otherwise, they'd be considered as
+        already expired by the event listener.
+    :return:
+        A :py:class:`~saltfactories.utils.event_recording.ReplayResult` instance
+    """
+    _, events = read_recording(path)
+    count = 0
+    lag = 0.0
+    started_at = time.monotonic()
+    stamp_base = time.time()
+    for offset, payload in events:
+        if speed:
+            due_at = started_at + offset / speed
+            delay = due_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                lag = max(lag, -delay)
+        if rebase_stamps:
+            data = dict(payload["data"])
+            if speed:
+                data["_stamp"] = stamp_base + offset / speed
+            else:
+                data["_stamp"] = time.time()
+            payload["data"] = data
+        event_listener._process_event_payload(payload)  # noqa: SLF001
+        count += 1
+    return ReplayResult(events=count, duration=time.monotonic() - started_at, lag=lag)
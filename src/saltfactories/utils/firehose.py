@@ -0,0 +1,316 @@
+"""
+Event listener load generator.
+
+The firehose opens several connections to an
+:py:class:`~saltfactories.plugins.event_listener.EventListener`, each simulating a salt daemon running the
+``pytest`` engine, ie, speaking the same msgpack framing, and sends events through them at a configurable
+rate and payload size.
+
+When the event listener runs in the same process, the firehose also measures how long each event took,
+from being sent, to being visible in the event listener's store, and how many were never seen:
+
+.. code-block:: python
+
+    def test_event_listener_throughput(event_firehose):
+        result = event_firehose.run(connections=4, rate=500, duration=5, payload_size=1024)
+        assert result.dropped == 0
+        print(result.summary())
+
+It can also be run from the command line, against an event listener started for the run, or, with
+``--host`` and ``--port``, against an already running one, in which case only the send throughput is
+known:
+
+.. code-block:: console
+
+    python -m saltfactories firehose --connections 4 --rate 500 --duration 5 --payload-size 1024
+"""
+import asyncio
+import logging
+import statistics
+import threading
+
+import attr
+import msgpack
+from pytestshellutils.utils import time
+
+log = logging.getLogger(__name__)
+
+TAG_PREFIX = "salt/firehose/"
+
+
+def _percentile(values, percent):
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+@attr.s(kw_only=True, slots=True, frozen=True)
+class FirehoseResult:
+    """
+    The result of a firehose run.
+
+    :keyword int sent:
+        How many events were sent
+    :keyword float duration:
+        How long, in seconds, sending the events took
+    :keyword int received:
+        How many of the sent events became visible in the event listener's store. ``None`` if not measured.
+    :keyword list latencies:
+        The time, in seconds, each received event took, from being sent, to being visible in the event
+        listener's store
+    """
+
+    sent = attr.ib()
+    duration = attr.ib()
+    received = attr.ib(default=None)
+    latencies = attr.ib(repr=False, factory=list)
+
+    @property
+    def dropped(self):
+        """
+        How many sent events were not received, ``None`` if not measured.
+        """
+        if self.received is None:
+            return None
+        return self.sent - self.received
+
+    @property
+    def throughput(self):
+        """
+        The events sent per second.
+        """
+        if not self.duration:
+            return 0.0
+        return self.sent / self.duration
+
+    @property
+    def p50(self):
+        """
+        The median ingest to visible latency, in seconds.
+        """
+        return _percentile(self.latencies, 50)
+
+    @property
+    def p99(self):
+        """
+        The 99th percentile ingest to visible latency, in seconds.
+        """
+        return _percentile(self.latencies, 99)
+
+    def summary(self):
+        """
+        Return a human readable summary of the run.
+        """
+        lines = [
+            f"Sent:       {self.sent} events in {self.duration:.2f} seconds",
+            f"Throughput: {self.throughput:.1f} events/second",
+        ]
+        if self.received is not None:
+            lines.append(f"Received:   {self.received}")
+            lines.append(f"Dropped:    {self.dropped}")
+        if self.latencies:
+            lines.append(f"Latency:    p50={self.p50 * 1000:.2f}ms p99={self.p99 * 1000:.2f}ms")
+        return "\n".join(lines)
+
+
+@attr.s(kw_only=True, slots=True, hash=False)
+class Firehose:
+    """
+    Event listener load generator.
+
+    :keyword ~saltfactories.plugins.event_listener.EventListener event_listener:
+        The event listener, running in this process, to send the events to. Its address is used when
+        ``host`` and ``port`` are not passed, and the received events are accounted for.
+    :keyword str host:
+        The event listener host
+    :keyword int port:
+        The event listener port
+    """
+
+    event_listener = attr.ib(default=None)
+    host = attr.ib(default=None)
+    port = attr.ib(default=None)
+
+    def __attrs_post_init__(self):
+        """
+        Post attrs initialization routines.
+        """
+        if self.event_listener is not None:
+            if self.host is None:
+                self.host = self.event_listener.host
+                if self.host == "0.0.0.0":  # noqa: S104
+                    self.host = "127.0.0.1"
+            if self.port is None:
+                self.port = self.event_listener.port
+        if self.host is None or self.port is None:
+            msg = "Either pass 'event_listener' or both 'host' and 'port'"
+            raise ValueError(msg)
+
+    def run(self, connections=1, rate=None, duration=None, count=None, payload_size=256, drain_timeout=10):
+        """
+        Send events to the event listener.
+
+        :keyword int connections:
+            How many simulated daemon connections to open.
+        :keyword int,float rate:
+            How many events per second to send on each connection. ``None`` sends as fast as possible.
+        :keyword int,float duration:
+            For how long, in seconds, to send events.
+        :keyword int count:
+            How many events to send on each connection. When neither ``count`` nor ``duration`` are passed,
+            defaults to ``1000``.
+        :keyword int payload_size:
+            The size, in bytes, of the payload of each event.
+        :keyword int,float drain_timeout:
+            How long, in seconds, to wait for the sent events to be received, after sending them.
+
+        :return:
+            A :py:class:`~saltfactories.utils.firehose.FirehoseResult` instance
+        """
+        if count is None and duration is None:
+            count = 1000
+        blob = "x" * payload_size
+        latencies = []
+        pending = {}
+        lock = threading.Lock()
+        all_received = threading.Event()
+        done_sending = threading.Event()
+
+        def _on_event(event):
+            if not event.tag.startswith(TAG_PREFIX):
+                return
+            visible_at = time.time()
+            with lock:
+                sent_at = pending.pop(event.tag, None)
+                if sent_at is None:
+                    return
+                latencies.append(visible_at - sent_at)
+                if done_sending.is_set() and not pending:
+                    all_received.set()
+
+        def _record_sent(tag, sent_at):
+            with lock:
+                pending[tag] = sent_at
+
+        record_sent = _record_sent if self.event_listener is not None else None
+        if self.event_listener is not None:
+            self.event_listener.register_event_callback(_on_event)
+        try:
+            start = time.monotonic()
+            sent = asyncio.run(
+                self._send(connections, rate, duration, count, blob, record_sent),
+            )
+            send_duration = time.monotonic() - start
+            if self.event_listener is None:
+                return FirehoseResult(sent=sent, duration=send_duration)
+            with lock:
+                done_sending.set()
+                if not pending:
+                    all_received.set()
+            all_received.wait(drain_timeout)
+        finally:
+            if self.event_listener is not None:
+                self.event_listener.unregister_event_callback(_on_event)
+        with lock:
+            return FirehoseResult(
+                sent=sent,
+                duration=send_duration,
+                received=len(latencies),
+                latencies=sorted(latencies),
+            )
+
+    async def _send(self, connections, rate, duration, count, blob, record_sent):
+        results = await asyncio.gather(
+            *[
+                self._send_on_connection(num, rate, duration, count, blob, record_sent)
+                for num in range(connections)
+            ]
+        )
+        return sum(results)
+
+    async def _send_on_connection(self, num, rate, duration, count, blob, record_sent):
+        daemon_id = f"firehose-{num}"
+        _, writer = await asyncio.open_connection(self.host, self.port)
+        start = time.monotonic()
+        seq = 0
+        try:
+            while True:
+                if count is not None and seq >= count:
+                    break
+                if duration is not None and time.monotonic() - start >= duration:
+                    break
+                if rate:
+                    delay = start + seq / rate - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                tag = f"{TAG_PREFIX}{num}/{seq}"
+                sent_at = time.time()
+                if record_sent is not None:
+                    record_sent(tag, sent_at)
+                payload = {
+                    "id": daemon_id,
+                    "tag": tag,
+                    "data": {"seq": seq, "blob": blob, "_stamp": sent_at},
+                }
+                writer.write(msgpack.packb(payload, use_bin_type=True))
+                seq += 1
+                if seq % 100 == 0 or rate:
+                    await writer.drain()
+            await writer.drain()
+        finally:
+            writer.close()
+            await writer.wait_closed()
+        log.debug("%s sent %d events", daemon_id, seq)
+        return seq
+
+
+def add_arguments(parser):
+    """
+    Add the firehose command line arguments to the passed parser.
+    """
+    parser.add_argument("--host", default=None, help="The event listener host")
+    parser.add_argument("--port", type=int, default=None, help="The event listener port")
+    parser.add_argument("--connections", type=int, default=1, help="Simulated daemon connections")
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=None,
+        help="Events per second per connection. Defaults to as fast as possible",
+    )
+    parser.add_argument("--duration", type=float, default=None, help="Seconds to send events for")
+    parser.add_argument("--count", type=int, default=None, help="Events to send per connection")
+    parser.add_argument("--payload-size", type=int, default=256, help="Event payload size, in bytes")
+
+
+def run_from_options(options):
+    """
+    Run the firehose with the parsed command line options and print the result summary.
+    """
+    # Do not move this deferred import, the event listener plugin imports pytest
+    from saltfactories.plugins.event_listener import (  # pylint: disable=import-outside-toplevel
+        EventListener,
+    )
+
+    if options.host or options.port:
+        if not (options.host and options.port):
+            msg = "Both --host and --port must be passed"
+            raise SystemExit(msg)
+        firehose = Firehose(host=options.host, port=options.port)
+        result = _run(firehose, options)
+    else:
+        with EventListener() as event_listener:
+            firehose = Firehose(event_listener=event_listener)
+            result = _run(firehose, options)
+    print(result.summary(), flush=True)  # noqa: T201
+
+
+def _run(firehose, options):
+    return firehose.run(
+        connections=options.connections,
+        rate=options.rate,
+        duration=options.duration,
+        count=options.count,
+        payload_size=options.payload_size,
+    )
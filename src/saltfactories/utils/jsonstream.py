@@ -0,0 +1,215 @@
+"""
+Incremental JSON decoding of the salt CLI's output.
+
+When targeting several minions, salt's JSON outputter prints one JSON document per minion return. These
+documents are not separated by anything other than white space and, with ``--out-indent=0``, each of them
+spans several lines.
+
+:py:class:`~saltfactories.utils.jsonstream.JSONStreamDecoder` finds where each document ends, without
+decoding it, as the output arrives, and only then decodes it. When `orjson`_ is installed, it's used to
+decode the documents.
+
+.. _orjson: https://pypi.org/project/orjson
+"""
+import json
+import logging
+import re
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:  # pragma: no cover
+    HAS_ORJSON = False
+
+log = logging.getLogger(__name__)
+
+# What changes the nesting depth outside of strings
+_STRUCTURE_TOKENS = re.compile(r'[\[\]{}"]')
+# What matters inside strings
+_STRING_TOKENS = re.compile(r'["\\]')
+_NON_WHITESPACE = re.compile(r"\S")
+_WHITESPACE = re.compile(r"\s")
+
+
+def loads(data):
+    """
+    Decode a single JSON document.
+
+    Uses `orjson`_ when it's installed, falling back to :py:func:`json.loads` for what it refuses to
+    decode, like ``NaN`` or integers larger than 64 bits.
+
+    :param str data: The JSON document
+    :raises ValueError: When the data is not valid JSON
+    """
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+class JSONStreamDecoder:
+    """
+    Incrementally decode a stream of concatenated JSON documents.
+
+    .. code-block:: python
+
+        decoder = JSONStreamDecoder()
+        for chunk in chunks:
+            for document in decoder.feed(chunk):
+                ...
+        for document in decoder.close():
+            ...
+
+    :keyword callable loads:
+        The function used to decode each JSON document. Defaults to
+        :py:func:`~saltfactories.utils.jsonstream.loads`.
+    :keyword bool skip_invalid:
+        Skip, instead of raising :py:exc:`ValueError`, what can't be decoded. Useful when the stream
+        mixes JSON documents with plain text messages.
+    """
+
+    __slots__ = ("_loads", "_skip_invalid", "_buffer", "_start", "_pos", "_depth", "_in_string")
+
+    def __init__(self, loads=loads, skip_invalid=False):
+        self._loads = loads
+        self._skip_invalid = skip_invalid
+        self._buffer = ""
+        # Where the document being scanned starts, None if between documents
+        self._start = None
+        # Where to continue scanning from
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+
+    def feed(self, data):
+        """
+        Feed more data to the decoder.
+
+        :param str data: The data to decode
+        :return: The list of documents which were completed by this data
+        :raises ValueError: When the data is not valid JSON
+        """
+        self._buffer += data
+        documents = []
+        while True:
+            if self._start is None:
+                match = _NON_WHITESPACE.search(self._buffer, self._pos)
+                if match is None:
+                    self._pos = len(self._buffer)
+                    break
+                self._start = self._pos = match.start()
+            if self._buffer[self._start] in '{["':
+                end = self._scan()
+            else:
+                # A bare number, boolean or null, it ends at the next white space
+                match = _WHITESPACE.search(self._buffer, self._start)
+                end = match.start() if match else None
+            if end is None:
+                break
+            self._complete(end, documents)
+        # Don't keep around what was already decoded
+        consumed = self._pos if self._start is None else self._start
+        if consumed:
+            self._buffer = self._buffer[consumed:]
+            self._pos -= consumed
+            if self._start is not None:
+                self._start = 0
+        return documents
+
+    def close(self):
+        """
+        Signal the end of the stream.
+
+        :return: The list of remaining documents
+        :raises ValueError: When the stream ends in the middle of a document
+        """
+        documents = []
+        if self._start is not None:
+            if self._depth or self._in_string:
+                if not self._skip_invalid:
+                    msg = "The JSON stream ended in the middle of a document"
+                    raise ValueError(msg)
+                log.debug("Skipping incomplete JSON document: %r", self._buffer[self._start :])
+            else:
+                self._complete(len(self._buffer), documents)
+        self._depth = 0
+        self._in_string = False
+        self._buffer = ""
+        self._start = None
+        self._pos = 0
+        return documents
+
+    def _scan(self):
+        """
+        Scan the buffer for the end of the current document.
+
+        Returns the position where the document ends, or None if more data is needed.
+        """
+        buffer = self._buffer
+        pos = self._pos
+        while True:
+            if self._in_string:
+                match = _STRING_TOKENS.search(buffer, pos)
+                if match is None:
+                    pos = len(buffer)
+                    break
+                if match.group() == "\\":
+                    if match.end() == len(buffer):
+                        # The escaped character is not here yet
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+                pos = match.end()
+                self._in_string = False
+                if self._depth == 0:
+                    # The document is a string
+                    self._pos = pos
+                    return pos
+                continue
+            match = _STRUCTURE_TOKENS.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+            pos = match.end()
+            token = match.group()
+            if token == '"':
+                self._in_string = True
+            elif token in "[{":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth <= 0:
+                    self._pos = pos
+                    return pos
+        self._pos = pos
+        return None
+
+    def _complete(self, end, documents):
+        document = self._buffer[self._start : end]
+        self._start = None
+        self._pos = end
+        self._depth = 0
+        try:
+            documents.append(self._loads(document))
+        except ValueError:
+            if not self._skip_invalid:
+                raise
+            log.debug("Skipping invalid JSON document: %r", document)
+
+
+def decode_documents(data):
+    """
+    Decode all of the concatenated JSON documents in the passed data.
+
+    :param str data: The data to decode
+    :return: The list of decoded documents
+    :raises ValueError: When the data is not valid JSON
+    """
+    decoder = JSONStreamDecoder()
+    documents = decoder.feed(data)
+    documents.extend(decoder.close())
+    return documents
@@ -0,0 +1,324 @@
+"""
+Warm salt daemons pools.
+
+Starting a salt master, and its minions, takes several seconds, and module scoped fixtures pay that cost
+once per test module. A :py:class:`DaemonPool` keeps masters, each with its minions, all configured
+alike, running for the whole session, and leases them to tests, or modules, resetting them when they're
+given back:
+
+.. code-block:: python
+
+    @pytest.fixture(scope="session")
+    def daemons_pool(salt_factories):
+        with salt_factories.pool("pooled", minions=2) as pool:
+            yield pool
+
+
+    @pytest.fixture(scope="module")
+    def pooled_daemons(daemons_pool):
+        with daemons_pool.lease() as daemons:
+            yield daemons
+
+
+    def test_ping(pooled_daemons):
+        salt_cli = pooled_daemons.master.salt_cli()
+        ret = salt_cli.run("test.ping", minion_tgt=pooled_daemons.minion.id)
+        assert ret.data is True
+
+Resetting the daemons:
+
+* restores the state and pillar trees to what they were when the daemons were first started
+* clears the master's job cache and file lists cache
+* clears the minions caches, and re-syncs their modules and refreshes their pillar
+
+The daemons are only restarted when any of them stopped running, its configuration file changed, or
+resetting them failed.
+
+.. admonition:: Attention
+
+    Only the state and pillar tree directories within the master's root directory are restored,
+    whatever else a test changes, like the master keys, persists across leases.
+"""
+import contextlib
+import logging
+import pathlib
+import shutil
+
+import attr
+
+from saltfactories.utils import tracing
+
+log = logging.getLogger(__name__)
+
+
+@attr.s(kw_only=True, slots=True, eq=False)
+class PooledDaemons:
+    """
+    A salt master, and its minions, kept running by a :py:class:`DaemonPool`.
+
+    :keyword ~saltfactories.daemons.master.SaltMaster master:
+        The salt master
+    :keyword list minions:
+        The salt minions connected to the master
+    """
+
+    master = attr.ib()
+    minions = attr.ib(factory=list)
+    leased = attr.ib(init=False, repr=False, default=False)
+    leases = attr.ib(init=False, default=0)
+    restarts = attr.ib(init=False, default=0)
+    snapshots = attr.ib(init=False, repr=False, factory=list)
+    config_contents = attr.ib(init=False, repr=False, factory=dict)
+
+    @property
+    def minion(self):
+        """
+        The first minion, ``None`` if there are no minions.
+        """
+        if not self.minions:
+            return None
+        return self.minions[0]
+
+    @property
+    def daemons(self):
+        """
+        The master followed by its minions.
+        """
+        return [self.master, *self.minions]
+
+
+@attr.s(kw_only=True, slots=True, eq=False)
+class DaemonPool:
+    """
+    Keep salt masters, each with its minions, running, and lease them.
+
+    Use :py:meth:`~saltfactories.manager.FactoriesManager.pool` to create one.
+
+    :keyword ~saltfactories.manager.FactoriesManager factories_manager:
+        The factories manager creating the daemons
+    :keyword str name:
+        The pool name, the daemons IDs are prefixed with it
+    :keyword int size:
+        How many masters, each with its minions, to start when the pool starts. When all of them are
+        leased, another one is started.
+    :keyword int minions:
+        How many minions each master has
+    :keyword dict master_defaults:
+        The masters default configuration
+    :keyword dict master_overrides:
+        The masters configuration overrides
+    :keyword dict minion_defaults:
+        The minions default configuration
+    :keyword dict minion_overrides:
+        The minions configuration overrides
+    :keyword int reset_timeout:
+        How long, in seconds, to wait for each minion to clear its caches, re-sync its modules and refresh
+        its pillar, when resetting the daemons
+    """
+
+    factories_manager = attr.ib(repr=False)
+    name = attr.ib()
+    size = attr.ib(default=1)
+    minions = attr.ib(default=1)
+    master_defaults = attr.ib(repr=False, default=None)
+    master_overrides = attr.ib(repr=False, default=None)
+    minion_defaults = attr.ib(repr=False, default=None)
+    minion_overrides = attr.ib(repr=False, default=None)
+    reset_timeout = attr.ib(repr=False, default=120)
+    members = attr.ib(init=False, repr=False, factory=list)
+    _next_index = attr.ib(init=False, repr=False, default=0)
+
+    def __enter__(self):
+        """
+        Context manager support to start the pool.
+        """
+        self.start()
+        return self
+
+    def __exit__(self, *_):
+        """
+        Context manager support to stop the pool.
+        """
+        self.stop()
+
+    def start(self):
+        """
+        Start the pool's daemons.
+        """
+        while len(self.members) < self.size:
+            self.members.append(self._start_member())
+
+    def stop(self):
+        """
+        Stop the pool's daemons.
+        """
+        while self.members:
+            self._terminate(self.members.pop())
+
+    @contextlib.contextmanager
+    def lease(self):
+        """
+        Lease running daemons, and reset them once given back.
+
+        :return:
+            A :py:class:`PooledDaemons` instance
+        """
+        member = next((member for member in self.members if not member.leased), None)
+        if member is None:
+            log.info("%s has no daemons left to lease, starting more", self)
+            member = self._start_member()
+            self.members.append(member)
+        member.leased = True
+        member.leases += 1
+        try:
+            yield member
+        finally:
+            try:
+                self.reset(member)
+            except Exception:  # pylint: disable=broad-except
+                log.exception("%s failed to reset %s, dropping it", self, member)
+                self.members.remove(member)
+                self._terminate(member)
+            member.leased = False
+
+    def reset(self, member):
+        """
+        Reset the passed daemons, restarting them if resetting them isn't enough, or fails.
+
+        :param PooledDaemons member:
+            The daemons to reset
+        """
+        with tracing.tracer.span("pool-reset", track=tracing.track_name(member.master)):
+            restart = [daemon for daemon in member.daemons if not daemon.is_running()]
+            if restart:
+                log.info("%s: %s stopped running", self, ", ".join(daemon.id for daemon in restart))
+            for daemon in member.daemons:
+                contents = member.config_contents[daemon.id]
+                config_file = pathlib.Path(daemon.config_file)
+                if config_file.read_bytes() != contents:
+                    log.info("%s: %s configuration changed, restoring it", self, daemon.id)
+                    config_file.write_bytes(contents)
+                    if daemon not in restart:
+                        restart.append(daemon)
+            self._restore_trees(member)
+            if restart:
+                self._restart(member)
+            else:
+                try:
+                    self._resync_minions(member)
+                except RuntimeError as exc:
+                    log.info("%s: %s", self, exc)
+                    self._restart(member)
+            # Last, the re-syncing jobs are also cached
+            self._clear_master_caches(member.master)
+
+    def _start_member(self):
+        index = self._next_index
+        self._next_index += 1
+        master = self.factories_manager.salt_master_daemon(
+            f"{self.name}-master-{index}",
+            defaults=self.master_defaults,
+            overrides=self.master_overrides,
+        )
+        minions = [
+            master.salt_minion_daemon(
+                f"{self.name}-minion-{index}-{minion_index}",
+                defaults=self.minion_defaults,
+                overrides=self.minion_overrides,
+            )
+            for minion_index in range(self.minions)
+        ]
+        member = PooledDaemons(master=master, minions=minions)
+        self._snapshot_trees(member)
+        try:
+            self._start(member)
+        except Exception:
+            self._terminate(member)
+            raise
+        return member
+
+    def _start(self, member):
+        for daemon in member.daemons:
+            daemon.start()
+        # Read once started, since the daemons might have rewritten them, for example, to replace ports
+        member.config_contents = {
+            daemon.id: pathlib.Path(daemon.config_file).read_bytes() for daemon in member.daemons
+        }
+
+    def _restart(self, member):
+        log.info("%s restarting %s", self, member)
+        member.restarts += 1
+        self._terminate(member)
+        for minion in member.minions:
+            # Stopped, it's now safe to clear the minion caches
+            self._clear_directory(minion.config["cachedir"])
+        self._start(member)
+
+    def _terminate(self, member):
+        for daemon in reversed(member.daemons):
+            if daemon.is_running():
+                daemon.terminate()
+
+    def _snapshot_trees(self, member):
+        root_dir = pathlib.Path(member.master.config["root_dir"]).resolve()
+        snapshot_dir = root_dir / "pool-snapshot"
+        for kind, tree in (("state", member.master.state_tree), ("pillar", member.master.pillar_tree)):
+            if tree is None:
+                continue
+            for env in tree.envs.values():
+                for idx, path in enumerate(env.paths):
+                    path = pathlib.Path(path).resolve()  # noqa: PLW2901
+                    if root_dir not in path.parents:
+                        # Never touch directories salt-factories doesn't own
+                        log.debug("%s not restoring %s, it's not within %s", self, path, root_dir)
+                        continue
+                    snapshot = snapshot_dir / kind / env.name / str(idx)
+                    snapshot.mkdir(parents=True, exist_ok=True)
+                    self._copy_directory(path, snapshot)
+                    member.snapshots.append((path, snapshot))
+
+    def _restore_trees(self, member):
+        for path, snapshot in member.snapshots:
+            self._clear_directory(path)
+            self._copy_directory(snapshot, path)
+
+    def _clear_master_caches(self, master):
+        cachedir = pathlib.Path(master.config["cachedir"])
+        for name in ("jobs", "file_lists"):
+            self._clear_directory(cachedir / name)
+
+    def _resync_minions(self, member):
+        if not member.minions:
+            return
+        salt_cli = member.master.salt_cli(timeout=self.reset_timeout)
+        for minion in member.minions:
+            for args in (
+                ("saltutil.clear_cache",),
+                ("saltutil.sync_all",),
+                ("saltutil.refresh_pillar", "wait=True"),
+            ):
+                ret = salt_cli.run(*args, minion_tgt=minion.id)
+                if ret.returncode != 0 or ret.data is None:
+                    msg = f"{minion.id} failed to run {args[0]}: {ret}"
+                    raise RuntimeError(msg)
+
+    @staticmethod
+    def _copy_directory(source, destination):
+        # Like shutil.copytree(..., dirs_exist_ok=True), which needs Python >= 3.8
+        for child in source.iterdir():
+            if child.is_dir() and not child.is_symlink():
+                shutil.copytree(child, destination / child.name, symlinks=True)
+            else:
+                shutil.copy2(child, destination / child.name, follow_symlinks=False)
+
+    @staticmethod
+    def _clear_directory(path):
+        path = pathlib.Path(path)
+        if not path.is_dir():
+            return
+        for child in path.iterdir():
+            if child.is_dir() and not child.is_symlink():
+                shutil.rmtree(child, ignore_errors=True)
+            else:
+                with contextlib.suppress(FileNotFoundError):
+                    child.unlink()
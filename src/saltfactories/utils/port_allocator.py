@@ -0,0 +1,238 @@
+"""
+Salt daemons ports allocation.
+
+Probing for an unused port, by binding to port ``0`` and closing the socket, for each port a daemon
+needs, is slow, and racy, the kernel hands out those ports from its ephemeral range, the same range
+it picks from for every outgoing connection, so, by the time the daemon binds to them, another
+process, for example, another ``pytest-xdist`` worker, might have been given the same port.
+
+Instead, the :py:class:`PortAllocator` splits a port range, outside of the kernel's ephemeral range,
+in one stripe per ``pytest-xdist`` worker, reserves contiguous blocks of ports within its stripe,
+starting at a random block so that concurrent test sessions are unlikely to overlap, and hands them
+out, in order, without any system call.
+
+Since something else might still be bound to an allocated port, the salt daemons check, right
+before each start attempt, that nothing is bound to the allocated ports they bind to, replacing
+those which are taken by newly allocated ones.
+
+.. admonition:: Attention
+
+    Daemons configured against a daemon whose ports were replaced, for example, a minion configured
+    against a master, before that master started, keep connecting to the replaced ports.
+"""
+import contextlib
+import logging
+import os
+import random
+import socket
+import threading
+
+import attr
+from pytestskipmarkers.utils import platform
+
+log = logging.getLogger(__name__)
+
+# Where linux exposes its ephemeral port range
+EPHEMERAL_PORT_RANGE_PATH = "/proc/sys/net/ipv4/ip_local_port_range"
+# The IANA suggested ephemeral port range, used by Windows and macOS
+DEFAULT_EPHEMERAL_PORT_RANGE = (49152, 65535)
+# Stay clear of the ports the most common services listen on
+MIN_PORT = 20000
+MAX_PORT = 65535
+
+
+def get_ephemeral_port_range():
+    """
+    Return the ``(low, high)`` inclusive range the kernel picks ephemeral ports from.
+    """
+    try:
+        with open(EPHEMERAL_PORT_RANGE_PATH, encoding="utf-8") as rfh:
+            low, high = (int(part) for part in rfh.read().split())
+    except (OSError, ValueError):
+        return DEFAULT_EPHEMERAL_PORT_RANGE
+    return low, high
+
+
+def get_port_range():
+    """
+    Return the ``(start, end)``, ``end`` excluded, range to allocate ports from.
+
+    It's the largest range, either below, or above, the kernel's ephemeral port range.
+    """
+    low, high = get_ephemeral_port_range()
+    below = (MIN_PORT, max(MIN_PORT, low))
+    above = (min(high + 1, MAX_PORT + 1), MAX_PORT + 1)
+    return max(below, above, key=lambda port_range: port_range[1] - port_range[0])
+
+
+def is_port_in_use(port, host="127.0.0.1"):
+    """
+    Return ``True`` if something is already bound to the passed port.
+
+    :param int port:
+        The port to check
+    :keyword str host:
+        The address to check the port on
+    """
+    with contextlib.closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as sock:
+        if not platform.is_windows():
+            # Like the daemons do, don't let connections lingering in TIME_WAIT get in the way
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind((host, port))
+        except OSError:
+            return True
+    return False
+
+
+def _default_worker_index():
+    worker = os.environ.get("PYTEST_XDIST_WORKER") or ""
+    if worker.startswith("gw") and worker[2:].isdigit():
+        return int(worker[2:])
+    return 0
+
+
+def _default_worker_count():
+    try:
+        return max(1, int(os.environ.get("PYTEST_XDIST_WORKER_COUNT") or 1))
+    except ValueError:
+        return 1
+
+
+@attr.s(kw_only=True, slots=True, eq=False)
+class PortAllocator:
+    """
+    Allocate ports from contiguous blocks, reserved from this session's, or ``pytest-xdist`` worker's,
+    stripe of a port range.
+
+    :keyword int block_size:
+        How many contiguous ports to reserve at a time
+    :keyword tuple port_range:
+        The ``(start, end)``, ``end`` excluded, range to allocate ports from. Defaults to
+        :py:func:`get_port_range`.
+    :keyword int worker_index:
+        The index of the stripe of the port range to allocate ports from. Defaults to the
+        ``pytest-xdist`` worker number, or ``0``.
+    :keyword int worker_count:
+        How many stripes to split the port range in. Defaults to the ``pytest-xdist`` worker count,
+        or ``1``.
+    """
+
+    block_size = attr.ib(default=50)
+    port_range = attr.ib(default=None)
+    worker_index = attr.ib(default=None)
+    worker_count = attr.ib(default=None)
+    blocks = attr.ib(init=False, repr=False, factory=list)
+    _stripe = attr.ib(init=False, repr=False, default=None)
+    _next_block = attr.ib(init=False, repr=False, default=None)
+    _next_port = attr.ib(init=False, repr=False, default=None)
+    _block_end = attr.ib(init=False, repr=False, default=None)
+    _allocated = attr.ib(init=False, repr=False, factory=set)
+    _lock = attr.ib(init=False, repr=False, factory=threading.Lock)
+
+    @property
+    def stripe(self):
+        """
+        The ``(start, end)``, ``end`` excluded, range this allocator reserves blocks from.
+        """
+        if self._stripe is None:
+            # Resolved when first needed, pytest-xdist sets its environment variables after startup
+            if self.worker_index is None:
+                self.worker_index = _default_worker_index()
+            if self.worker_count is None:
+                self.worker_count = _default_worker_count()
+            start, end = self.port_range or get_port_range()
+            stripe_size = max(1, (end - start) // self.worker_count)
+            stripe_start = start + (self.worker_index % self.worker_count) * stripe_size
+            self._stripe = (stripe_start, stripe_start + stripe_size)
+            if self.block_size > stripe_size:
+                self.block_size = stripe_size
+            log.debug("%s is allocating ports from %d to %d", self, *self._stripe)
+        return self._stripe
+
+    def _reserve_block(self):
+        start, end = self.stripe
+        blocks_count = (end - start) // self.block_size
+        if self._next_block is None:
+            # Start at a random block so that concurrent test sessions are unlikely to overlap
+            self._next_block = random.randrange(blocks_count)  # noqa: S311
+        elif len(self.blocks) % blocks_count == 0:
+            log.warning(
+                "%s reserved every block of ports from %d to %d, reusing them", self, start, end
+            )
+        block_start = start + (self._next_block % blocks_count) * self.block_size
+        self._next_block += 1
+        self._next_port = block_start
+        self._block_end = block_start + self.block_size
+        self.blocks.append((self._next_port, self._block_end))
+
+    def get_port(self):
+        """
+        Return the next allocated port.
+
+        This doesn't check whether something is bound to the port, see :py:meth:`get_bindable_port`.
+        """
+        with self._lock:
+            if self._next_port is None or self._next_port >= self._block_end:
+                self._reserve_block()
+            port = self._next_port
+            self._next_port += 1
+            self._allocated.add(port)
+            return port
+
+    def get_ports(self, count):
+        """
+        Return the next ``count`` allocated ports.
+        """
+        return [self.get_port() for _ in range(count)]
+
+    def is_allocated(self, port):
+        """
+        Return ``True`` if the passed port was allocated by this allocator.
+        """
+        return port in self._allocated
+
+    def get_bindable_port(self, host="127.0.0.1"):
+        """
+        Return the next allocated port nothing is bound to.
+
+        Meant for servers which bind right after, the salt daemons check their ports when starting.
+
+        :keyword str host:
+            The address to check the ports on
+        """
+        while True:
+            port = self.get_port()
+            if not is_port_in_use(port, host=host):
+                return port
+            log.debug("%s skipping port %d, something is already bound to it", self, port)
+
+    def resolve_conflicts(self, ports, host="127.0.0.1"):
+        """
+        Replace the allocated ports something is already bound to.
+
+        :param dict ports:
+            A mapping of names, for example, configuration keys, to ports. The ports not allocated by
+            this allocator are left alone.
+        :keyword str host:
+            The address to check the ports on
+        :return:
+            A mapping of the names whose port something is bound to, to their replacement ports
+        """
+        replacements = {}
+        for name, port in ports.items():
+            if not self.is_allocated(port) or not is_port_in_use(port, host=host):
+                continue
+            replacements[name] = self.get_bindable_port(host=host)
+            log.debug(
+                "%s replaced %s port %d by %d, something is already bound to it",
+                self,
+                name,
+                port,
+                replacements[name],
+            )
+        return replacements
+
+
+# The session's, or pytest-xdist worker's, port allocator
+allocator = PortAllocator()
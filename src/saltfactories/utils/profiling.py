@@ -0,0 +1,84 @@
+"""
+Salt daemons and CLI's profiling.
+
+Pass ``--salt-factories-profile=<glob>`` to pytest to run the salt daemons whose ID, and the salt daemons
+and CLI's whose script name, for example, ``salt-master`` or ``salt-call``, match the glob, under
+:py:mod:`cProfile`:
+
+.. code-block:: console
+
+    pytest --salt-factories-profile='master-*'
+
+Each profiled process, and each process it forks, writes its own profile, named
+``<daemon id or script name>.<pid>.prof``, when it exits, or is terminated, to the ``profiles`` directory under the
+salt-factories root directory. The profiles can be loaded with :py:mod:`pstats`, or any tool supporting
+them, like ``snakeviz``.
+
+At the end of the session, the hottest functions of each profiled daemon, or CLI, all its processes
+aggregated, are reported.
+
+.. admonition:: Attention
+
+    Only the main thread of each process is profiled, processes killed, instead of terminated, don't
+    write their profiles, and neither do processes started with the ``spawn`` multiprocessing start method.
+"""
+import logging
+import pstats
+from collections import defaultdict
+
+from saltfactories.utils import cast_to_pathlib_path
+
+log = logging.getLogger(__name__)
+
+
+def get_profiles(profiles_dir):
+    """
+    Return the profiles in the passed directory, grouped by daemon ID, or script name.
+
+    :param ~pathlib.Path profiles_dir:
+        The directory where the profiles were written to
+    :return:
+        A dictionary mapping each daemon ID, or script name, to the paths of the profiles of its
+        processes
+    """
+    profiles_dir = cast_to_pathlib_path(profiles_dir)
+    profiles = defaultdict(list)
+    if not profiles_dir.is_dir():
+        return {}
+    for path in sorted(profiles_dir.glob("*.prof")):
+        name, _, pid = path.stem.rpartition(".")
+        if not name or not pid.isdigit():
+            continue
+        profiles[name].append(path)
+    return dict(profiles)
+
+
+def hottest_functions(paths, count=10):
+    """
+    Return the functions where the profiled processes spent the most time.
+
+    :param list paths:
+        The paths to the profiles to aggregate
+    :keyword int count:
+        How many functions to return
+    :return:
+        A list of ``(function, calls, own_time, cumulative_time)`` tuples, sorted by the time spent
+        in the function itself, ``function`` being formatted as ``<path>:<line>(<name>)``
+    """
+    stats = None
+    for path in paths:
+        try:
+            if stats is None:
+                stats = pstats.Stats(str(path))
+            else:
+                stats.add(str(path))
+        except (OSError, EOFError, TypeError, ValueError) as exc:
+            log.warning("Failed to load the profile %s: %s", path, exc)
+    if stats is None:
+        return []
+    functions = [
+        (pstats.func_std_string(func), calls, own_time, cumulative_time)
+        for func, (_, calls, own_time, cumulative_time, _) in stats.stats.items()
+    ]
+    functions.sort(key=lambda function: function[2], reverse=True)
+    return functions[:count]
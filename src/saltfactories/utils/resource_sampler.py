@@ -0,0 +1,345 @@
+"""
+Salt daemons and containers resource sampling.
+
+When enabled, a background thread samples, at a configurable interval, the CPU usage, resident memory, open
+file descriptors, threads and child processes of every daemon, and container, started by salt-factories,
+children included.
+
+The samples are written to a compact, per-session, CSV file, with the following columns:
+
+``time``
+    The seconds since the sampling started
+``test``
+    The node ID of the test running when the sample was taken, empty between tests
+``process``
+    The daemon, or container, display name
+``cpu_percent``
+    The CPU usage, summed across the process and its children, which can exceed 100 on multi core systems
+``rss``
+    The resident memory, in bytes, summed across the process and its children
+``fds``
+    The open file descriptors, summed across the process and its children. Empty where not supported.
+``threads``
+    The threads, summed across the process and its children
+``children``
+    The number of child processes
+
+A per-test summary, the samples taken while each test ran aggregated per process, is written next to it as
+JSON, to spot memory growth and CPU hogs across long test suites.
+
+Pass ``--salt-factories-resources=<path>`` to pytest to enable it, and
+``--salt-factories-resources-interval=<seconds>`` to change the sampling interval.
+
+The sampler can be used wherever a :py:class:`pytestsysstats.plugin.StatsProcesses` is expected, to which,
+if passed one, it forwards the tracked processes.
+"""
+import contextlib
+import csv
+import json
+import logging
+import threading
+from collections import OrderedDict
+
+import attr
+import psutil
+from pytestshellutils.utils import time
+
+from saltfactories.utils import cast_to_pathlib_path
+
+log = logging.getLogger(__name__)
+
+FIELDS = ("time", "test", "process", "cpu_percent", "rss", "fds", "threads", "children")
+
+
+@attr.s(kw_only=True, slots=True)
+class ProcessSummary:
+    """
+    The aggregated samples of a process while a test ran.
+    """
+
+    samples = attr.ib(default=0)
+    cpu_total = attr.ib(default=0.0)
+    cpu_max = attr.ib(default=0.0)
+    rss_first = attr.ib(default=None)
+    rss_last = attr.ib(default=None)
+    rss_max = attr.ib(default=0)
+    fds_max = attr.ib(default=None)
+    threads_max = attr.ib(default=0)
+    children_max = attr.ib(default=0)
+
+    def add(self, sample):
+        """
+        Aggregate a sample.
+        """
+        self.samples += 1
+        self.cpu_total += sample["cpu_percent"]
+        self.cpu_max = max(self.cpu_max, sample["cpu_percent"])
+        if self.rss_first is None:
+            self.rss_first = sample["rss"]
+        self.rss_last = sample["rss"]
+        self.rss_max = max(self.rss_max, sample["rss"])
+        if sample["fds"] is not None:
+            self.fds_max = max(self.fds_max or 0, sample["fds"])
+        self.threads_max = max(self.threads_max, sample["threads"])
+        self.children_max = max(self.children_max, sample["children"])
+
+    @property
+    def cpu_mean(self):
+        """
+        The mean CPU usage.
+        """
+        if not self.samples:
+            return 0.0
+        return self.cpu_total / self.samples
+
+    @property
+    def rss_growth(self):
+        """
+        How much, in bytes, the resident memory grew, from the first to the last sample.
+        """
+        if self.rss_first is None:
+            return 0
+        return self.rss_last - self.rss_first
+
+    def to_dict(self):
+        """
+        Return the summary as a JSON serializable dictionary.
+        """
+        return {
+            "samples": self.samples,
+            "cpu_mean": round(self.cpu_mean, 2),
+            "cpu_max": self.cpu_max,
+            "rss_first": self.rss_first,
+            "rss_last": self.rss_last,
+            "rss_max": self.rss_max,
+            "rss_growth": self.rss_growth,
+            "fds_max": self.fds_max,
+            "threads_max": self.threads_max,
+            "children_max": self.children_max,
+        }
+
+
+@attr.s(kw_only=True, slots=True, eq=False)
+class ResourceSampler:
+    """
+    Sample the resource usage of the tracked processes.
+
+    :keyword ~pathlib.Path path:
+        The path to the CSV file to write the samples to. It's overwritten if it exists. When ``None``, the
+        samples are only aggregated per test.
+    :keyword float interval:
+        The interval, in seconds, between samples
+    :keyword ~pytestsysstats.plugin.StatsProcesses stats_processes:
+        Where to forward the tracked processes to, if anything.
+    """
+
+    path = attr.ib(default=None, converter=cast_to_pathlib_path)
+    interval = attr.ib(default=1.0)
+    stats_processes = attr.ib(repr=False, default=None)
+    processes = attr.ib(init=False, repr=False, factory=OrderedDict)
+    summaries = attr.ib(init=False, repr=False, factory=dict)
+    current_test = attr.ib(init=False, repr=False, default=None)
+    _psutil_processes = attr.ib(init=False, repr=False, factory=dict)
+    _fh = attr.ib(init=False, repr=False, default=None)
+    _writer = attr.ib(init=False, repr=False, default=None)
+    _started_at = attr.ib(init=False, repr=False, default=None)
+    _stop_event = attr.ib(init=False, repr=False, factory=threading.Event)
+    _sampler_thread = attr.ib(init=False, repr=False, default=None)
+    _lock = attr.ib(init=False, repr=False, factory=threading.RLock)
+
+    def add(self, display_name, process):
+        """
+        Track a process.
+
+        :param str display_name:
+            The name to report the process samples as
+        :param int,~psutil.Process process:
+            The process, or its PID
+        """
+        if isinstance(process, int):
+            process = psutil.Process(process)
+        with self._lock:
+            self.processes[display_name] = process
+        if self.stats_processes is not None:
+            self.stats_processes.add(display_name, process)
+
+    def remove(self, display_name):
+        """
+        Stop tracking a process.
+        """
+        with self._lock:
+            self.processes.pop(display_name, None)
+        if self.stats_processes is not None:
+            self.stats_processes.remove(display_name)
+
+    def items(self):
+        """
+        Return the tracked processes.
+        """
+        return self.processes.items()
+
+    def __iter__(self):
+        """
+        Iterate over the tracked processes names.
+        """
+        return iter(self.processes)
+
+    def start(self):
+        """
+        Start sampling.
+        """
+        if self._sampler_thread is not None:
+            return
+        log.debug("%s is starting", self)
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = self.path.open("w", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._fh)
+            self._writer.writerow(FIELDS)
+        self._started_at = time.monotonic()
+        self._stop_event.clear()
+        self._sampler_thread = threading.Thread(target=self._run, name="ResourceSampler")
+        self._sampler_thread.daemon = True
+        self._sampler_thread.start()
+
+    def stop(self):
+        """
+        Stop sampling and write the per-test summary.
+        """
+        if self._sampler_thread is None:
+            return
+        log.debug("%s is stopping", self)
+        self._stop_event.set()
+        self._sampler_thread.join()
+        self._sampler_thread = None
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+                self._writer = None
+        if self.path is not None:
+            self.summary_path.write_text(json.dumps(self.summary(), indent=2))
+
+    def __enter__(self):
+        """
+        Context manager support to start sampling.
+        """
+        self.start()
+        return self
+
+    def __exit__(self, *_):
+        """
+        Context manager support to stop sampling.
+        """
+        self.stop()
+
+    @property
+    def summary_path(self):
+        """
+        The path to the per-test summary JSON file.
+        """
+        return self.path.with_name(f"{self.path.stem}.summary.json")
+
+    def start_test(self, nodeid):
+        """
+        Attribute the next samples to the passed test.
+        """
+        with self._lock:
+            self.current_test = nodeid
+
+    def finish_test(self, nodeid):
+        """
+        Stop attributing samples to the passed test.
+        """
+        with self._lock:
+            if self.current_test == nodeid:
+                self.current_test = None
+
+    def summary(self):
+        """
+        Return the per-test summary, as a JSON serializable dictionary.
+        """
+        with self._lock:
+            return {
+                test: {name: summary.to_dict() for name, summary in processes.items()}
+                for test, processes in self.summaries.items()
+            }
+
+    def top(self, key, count=5):
+        """
+        Return the ``count`` highest ``(test, process, summary)`` tuples, sorted by ``key``.
+
+        :param str key:
+            A :py:class:`ProcessSummary` attribute, for example, ``rss_growth`` or ``cpu_mean``
+        """
+        with self._lock:
+            entries = [
+                (test, name, summary)
+                for test, processes in self.summaries.items()
+                for name, summary in processes.items()
+            ]
+        entries.sort(key=lambda entry: getattr(entry[2], key), reverse=True)
+        return entries[:count]
+
+    def sample(self):
+        """
+        Take a sample of every tracked process, returning them.
+        """
+        with self._lock:
+            processes = list(self.processes.items())
+            test = self.current_test
+        timestamp = round(time.monotonic() - self._started_at, 3) if self._started_at else 0.0
+        samples = []
+        for display_name, process in processes:
+            sample = self._sample_process(process)
+            if sample is None:
+                continue
+            sample.update(time=timestamp, test=test or "", process=display_name)
+            samples.append(sample)
+        with self._lock:
+            for sample in samples:
+                if self._writer is not None:
+                    self._writer.writerow([sample[field] for field in FIELDS])
+                if test is None:
+                    continue
+                summary = self.summaries.setdefault(test, {}).setdefault(
+                    sample["process"], ProcessSummary()
+                )
+                summary.add(sample)
+        return samples
+
+    def _sample_process(self, process):
+        try:
+            tree = [process, *process.children(recursive=True)]
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+        sample = {"cpu_percent": 0.0, "rss": 0, "fds": None, "threads": 0, "children": len(tree) - 1}
+        for proc in tree:
+            # The CPU usage is measured between calls, keep using the same instance
+            proc = self._psutil_processes.setdefault(proc.pid, proc)
+            with contextlib.suppress(psutil.NoSuchProcess, psutil.AccessDenied):
+                with proc.oneshot():
+                    sample["cpu_percent"] += proc.cpu_percent()
+                    sample["rss"] += proc.memory_info().rss
+                    sample["threads"] += proc.num_threads()
+                    with contextlib.suppress(AttributeError):
+                        # Not available on windows
+                        sample["fds"] = (sample["fds"] or 0) + proc.num_fds()
+        sample["cpu_percent"] = round(sample["cpu_percent"], 1)
+        return sample
+
+    def _run(self):
+        while True:
+            started = time.monotonic()
+            try:
+                self.sample()
+                self._forget_exited_processes()
+            except Exception:  # pragma: no cover pylint: disable=broad-except
+                log.exception("%s failed to sample the tracked processes", self)
+            if self._stop_event.wait(max(0, self.interval - (time.monotonic() - started))):
+                break
+
+    def _forget_exited_processes(self):
+        for pid, process in list(self._psutil_processes.items()):
+            if not process.is_running():
+                self._psutil_processes.pop(pid, None)
@@ -117,7 +117,13 @@ def setup_handlers():
         level = LOG_LEVELS[(log_opts.get("level") or "error").lower()]
     except KeyError:
         level = logging.ERROR
-    handler = ZMQHandler(host=host_addr, port=host_port, log_prefix=pytest_log_prefix, level=level)
+    handler = ZMQHandler(
+        host=host_addr,
+        port=host_port,
+        log_prefix=pytest_log_prefix,
+        level=level,
+        daemon_id=__opts__.get("id"),
+    )
     handler.setLevel(level)
     handler.start()
     return handler
@@ -138,12 +144,20 @@ class ZMQHandler(ExcInfoOnLogLevelFormatMixin, logging.Handler):
     # reconnect the ZMQ machinery.
 
     def __init__(
-        self, host="127.0.0.1", port=3330, log_prefix=None, level=logging.NOTSET, socket_hwm=100000
+        self,
+        host="127.0.0.1",
+        port=3330,
+        log_prefix=None,
+        level=logging.NOTSET,
+        socket_hwm=100000,
+        daemon_id=None,
     ):
         super().__init__(level=level)
         self.host = host
         self.port = port
         self._log_prefix = log_prefix
+        # Sent along with each record, so that a shared log server knows where to route it
+        self.daemon_id = daemon_id
         self.socket_hwm = socket_hwm
         self.log_prefix = self._get_log_prefix(log_prefix)
         self.context = self.pusher = None
@@ -182,6 +196,7 @@ class ZMQHandler(ExcInfoOnLogLevelFormatMixin, logging.Handler):
             "log_prefix": self._log_prefix,
             "level": self.level,
             "socket_hwm": self.socket_hwm,
+            "daemon_id": self.daemon_id,
         }
 
     def __setstate__(self, state):  # noqa: D105
@@ -325,6 +340,8 @@ class ZMQHandler(ExcInfoOnLogLevelFormatMixin, logging.Handler):
         record.message = None  # redundant with msg
         # On Python >= 3.5 we also have stack_info, but we've formatted already so, reset it
         record.stack_info = None
+        if self.daemon_id is not None:
+            record.daemon_id = self.daemon_id
         try:
             return msgpack.dumps(record.__dict__, use_bin_type=True)
         except TypeError as exc:
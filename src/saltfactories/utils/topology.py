@@ -0,0 +1,126 @@
+"""
+Topology aware test ordering.
+
+Tests which need the same salt daemons, say, a master and two minions, are usually spread across
+modules, and interleaved with tests which need other daemons, so, the daemons, when provided by
+package, or session, scoped fixtures which are parametrized, or pooled, are started, and stopped, over
+and over again.
+
+Marking the tests with the topology they need:
+
+.. code-block:: python
+
+    pytestmark = pytest.mark.salt_factories_topology("salt_master", "salt_minion")
+
+makes salt-factories reorder the collected tests so that the tests needing the same topology run one
+after the other, in the order they were collected, each topology placed where its first test was
+collected, and, when running under ``pytest-xdist`` with ``--dist loadgroup``, on the same worker.
+
+A topology is the sorted set of the marker's arguments, usually the names of the fixtures providing
+the daemons. Tests not marked keep their relative order.
+
+How long the first test of each topology took to set up, which is when its daemons start, is recorded
+in the pytest cache, and used, on the following sessions, to estimate how much time the reordering
+saves.
+
+.. admonition:: Attention
+
+    Module scoped fixtures are torn down at the end of each module, however the tests are ordered, and a
+    module whose tests need different topologies is split.
+"""
+import logging
+
+log = logging.getLogger(__name__)
+
+MARKER_NAME = "salt_factories_topology"
+# Where the topologies start up costs are kept, in the pytest cache
+CACHE_KEY = "saltfactories/topology-startup-costs"
+
+
+def get_topology(item):
+    """
+    Return the topology the passed test item needs, or ``None``.
+
+    :param ~_pytest.nodes.Item item:
+        The test item
+    :return:
+        The topology name, the sorted, comma separated, arguments of the closest
+        ``salt_factories_topology`` marker
+    """
+    marker = item.get_closest_marker(MARKER_NAME)
+    if marker is None or not marker.args:
+        return None
+    return ",".join(sorted({str(arg) for arg in marker.args}))
+
+
+def count_starts(topologies):
+    """
+    Count how many times each topology starts, when running tests in the passed order.
+
+    A topology starts each time a test needing it runs after a test which doesn't.
+
+    :param list topologies:
+        The topology, or ``None``, of each test, in the order they run
+    :return:
+        A dictionary mapping each topology to how many times it starts
+    """
+    starts = {}
+    previous = None
+    for topology in topologies:
+        if topology is not None and topology != previous:
+            starts[topology] = starts.get(topology, 0) + 1
+        previous = topology
+    return starts
+
+
+def reorder(items, get_topology_func=get_topology):
+    """
+    Reorder the test items so that the tests needing the same topology run one after the other.
+
+    Each topology takes the place of its first test, the tests keep their relative order within each
+    topology, and so do the tests not needing any.
+
+    :param list items:
+        The test items, in the order they were collected
+    :keyword callable get_topology_func:
+        Return the topology of the passed test item
+    :return:
+        The reordered items
+    """
+    groups = {}
+    for item in items:
+        topology = get_topology_func(item)
+        # Each unmarked test is its own group, so that they stay where they were
+        key = ("topology", topology) if topology is not None else ("item", id(item))
+        groups.setdefault(key, []).append(item)
+    return [item for group in groups.values() for item in group]
+
+
+def estimate_savings(starts_before, starts_after, costs):
+    """
+    Estimate the time saved by starting the topologies fewer times.
+
+    :param dict starts_before:
+        How many times each topology starts, in the collected order
+    :param dict starts_after:
+        How many times each topology starts, in the reordered order
+    :param dict costs:
+        The recorded start up cost, in seconds, of each topology
+    :return:
+        A tuple of the number of starts saved, the estimated seconds saved, ``None`` if none of the saved
+        starts could be estimated, and the topologies whose saved starts couldn't be estimated, since
+        their start up costs weren't recorded yet
+    """
+    saved_starts = 0
+    saved_seconds = None
+    unknown = []
+    for topology, before in starts_before.items():
+        saved = before - starts_after.get(topology, 0)
+        if saved <= 0:
+            continue
+        saved_starts += saved
+        if topology in costs:
+            saved_seconds = (saved_seconds or 0.0) + saved * costs[topology]
+        else:
+            unknown.append(topology)
+    return saved_starts, saved_seconds, sorted(unknown)
@@ -0,0 +1,280 @@
+"""
+Salt daemons and containers lifecycle tracing.
+
+When enabled, salt-factories records how long each phase of the lifecycle of the salt daemons and
+containers it starts took, for example, writing and verifying their configuration, generating their
+scripts, spawning them, waiting for their start events, accepting minion keys and terminating them.
+
+Each phase is a span, timed with a monotonic clock, recorded on the track of the daemon, or container, it
+belongs to, and the whole session can be exported as a `Chrome trace`_ JSON file, which can be loaded in
+``chrome://tracing`` or in `Perfetto`_, to see where the time went, and the start up critical path across
+the daemons started in parallel.
+
+Pass ``--salt-factories-trace=<path>`` to pytest to enable it. When running under ``pytest-xdist``, each
+worker writes its own file, suffixed with the worker id.
+
+Moments, rather than phases, like when the ``pytest`` engine of a daemon connects to the
+:py:class:`~saltfactories.plugins.event_listener.EventListener`, or when a start event is seen, are
+recorded as instant events.
+
+.. _Chrome trace: https://docs.google.com/document/d/1CvAClvFfyA5R-PhYUmn5OOQtYMH4h6I0nSsKchNAySU
+.. _Perfetto: https://ui.perfetto.dev
+"""
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+
+import attr
+from pytestshellutils.utils import time
+
+from saltfactories.utils import cast_to_pathlib_path
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TRACK = "salt-factories"
+
+
+def track_name(factory):
+    """
+    Return the name of the track the passed factory's spans are recorded on.
+
+    Salt daemons are tracked by their ID, which is also how their events identify them, containers by
+    their name.
+    """
+    track = getattr(factory, "id", None) or getattr(factory, "name", None)
+    if track is None:
+        return DEFAULT_TRACK
+    return str(track)
+
+
+@attr.s(kw_only=True, slots=True, hash=False)
+class Tracer:
+    """
+    Record lifecycle spans and export them as a Chrome trace.
+
+    :keyword bool enabled:
+        Whether to record anything at all. When not enabled, recording costs next to nothing.
+    """
+
+    enabled = attr.ib(default=False)
+    pid = attr.ib(init=False, factory=os.getpid)
+    _events = attr.ib(init=False, repr=False, factory=list)
+    _tracks = attr.ib(init=False, repr=False, factory=dict)
+    _origin = attr.ib(init=False, repr=False, factory=time.monotonic)
+    _lock = attr.ib(init=False, repr=False, factory=threading.Lock)
+
+    def __len__(self):
+        """
+        Return how many spans and instant events were recorded.
+        """
+        return len(self._events)
+
+    def clear(self):
+        """
+        Forget every recorded span and instant event.
+        """
+        with self._lock:
+            self._events.clear()
+            self._tracks.clear()
+
+    @contextlib.contextmanager
+    def span(self, name, track=DEFAULT_TRACK, category="lifecycle", **args):
+        """
+        Record the time spent in the ``with`` block as a span.
+
+        :param str name:
+            The span name
+        :keyword str track:
+            The track to record the span on, usually the daemon ID
+        :keyword str category:
+            The span category
+        :keyword args:
+            Additional, JSON serializable, information to attach to the span
+
+        The span is recorded even if the block raises, in which case, the exception type is added to
+        the span arguments.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.monotonic()
+        try:
+            yield
+        except BaseException as exc:
+            args["error"] = exc.__class__.__name__
+            raise
+        finally:
+            self.add_span(name, start, time.monotonic(), track=track, category=category, **args)
+
+    def add_span(self, name, start, end, track=DEFAULT_TRACK, category="lifecycle", **args):
+        """
+        Record a span.
+
+        :param str name:
+            The span name
+        :param float start:
+            When the span started, as returned by :py:func:`time.monotonic`
+        :param float end:
+            When the span ended, as returned by :py:func:`time.monotonic`
+        :keyword str track:
+            The track to record the span on, usually the daemon ID
+        :keyword str category:
+            The span category
+        :keyword args:
+            Additional, JSON serializable, information to attach to the span
+        """
+        if not self.enabled:
+            return
+        self._add_event(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": self._microseconds(start),
+                "dur": max(0, round((end - start) * 1000000)),
+                "args": args,
+            },
+            track,
+        )
+
+    def instant(
+        self, name, track=DEFAULT_TRACK, category="lifecycle", timestamp=None, wall_time=None, **args
+    ):
+        """
+        Record an instant event.
+
+        :param str name:
+            The event name
+        :keyword str track:
+            The track to record the event on, usually the daemon ID
+        :keyword str category:
+            The event category
+        :keyword float timestamp:
+            When it happened, as returned by :py:func:`time.monotonic`. Defaults to now.
+        :keyword float wall_time:
+            When it happened, as returned by :py:func:`time.time`, for example, a salt event's stamp.
+            Ignored if ``timestamp`` is passed.
+        :keyword args:
+            Additional, JSON serializable, information to attach to the event
+        """
+        if not self.enabled:
+            return
+        if timestamp is None:
+            timestamp = time.monotonic()
+            if wall_time is not None:
+                timestamp -= time.time() - wall_time
+        self._add_event(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "i",
+                "s": "t",
+                "ts": self._microseconds(timestamp),
+                "args": args,
+            },
+            track,
+        )
+
+    def _microseconds(self, timestamp):
+        return round((timestamp - self._origin) * 1000000)
+
+    def _add_event(self, event, track):
+        event["pid"] = self.pid
+        with self._lock:
+            try:
+                event["tid"] = self._tracks[track]
+            except KeyError:
+                event["tid"] = self._tracks[track] = len(self._tracks) + 1
+            self._events.append(event)
+
+    def to_dict(self):
+        """
+        Return the recorded spans as a Chrome trace dictionary.
+        """
+        with self._lock:
+            metadata = [
+                {
+                    "name": "process_name",
+                    "ph": "M",
+                    "pid": self.pid,
+                    "tid": 0,
+                    "args": {"name": f"salt-factories[{self.pid}]"},
+                },
+            ]
+            for track, tid in self._tracks.items():
+                metadata.append(
+                    {
+                        "name": "thread_name",
+                        "ph": "M",
+                        "pid": self.pid,
+                        "tid": tid,
+                        "args": {"name": track},
+                    }
+                )
+                # Keep the tracks in the order they were first seen
+                metadata.append(
+                    {
+                        "name": "thread_sort_index",
+                        "ph": "M",
+                        "pid": self.pid,
+                        "tid": tid,
+                        "args": {"sort_index": tid},
+                    }
+                )
+            events = sorted(self._events, key=lambda event: event["ts"])
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def write(self, path):
+        """
+        Write the recorded spans, as a Chrome trace JSON file, to the passed path.
+
+        :param ~pathlib.Path path:
+            The path to write to. It's overwritten if it exists.
+        """
+        path = cast_to_pathlib_path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), default=str))
+        log.debug("Wrote %d trace events to %s", len(self), path)
+        return path
+
+
+tracer = Tracer()
+
+
+def span(name, track=DEFAULT_TRACK, category="lifecycle", **args):
+    """
+    Record the time spent in the ``with`` block as a span on the session tracer.
+
+    See :py:meth:`Tracer.span`.
+    """
+    return tracer.span(name, track=track, category=category, **args)
+
+
+def instant(name, track=DEFAULT_TRACK, category="lifecycle", **kwargs):
+    """
+    Record an instant event on the session tracer.
+
+    See :py:meth:`Tracer.instant`.
+    """
+    tracer.instant(name, track=track, category=category, **kwargs)
+
+
+def traced(name, category="lifecycle"):
+    """
+    Decorate a factory method so that each call to it is recorded as a span on the factory's track.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not tracer.enabled:
+                return func(self, *args, **kwargs)
+            with tracer.span(name, track=track_name(self), category=category):
+                return func(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,218 @@
+"""
+Salt CLI zygote.
+
+Every call to :py:meth:`~saltfactories.bases.SaltCli.run` spawns a fresh python interpreter which then
+has to import salt and parse the configuration before doing any actual work. On test suites doing hundreds
+of CLI calls, most of the time is spent on interpreter startup.
+
+A zygote is a long running python process, one per ``(python_executable, config_dir)`` pair, which
+pre-imports :py:mod:`salt.scripts` and loads the configuration once, and then forks a child for each
+CLI call, with the right ``argv``, environment and standard streams.
+
+The zygote is opt-in, pass ``cli_zygote=True`` to :py:class:`~saltfactories.manager.FactoriesManager`,
+for example, through the ``salt_factories_config`` fixture:
+
+.. code-block:: python
+
+    @pytest.fixture(scope="session")
+    def salt_factories_config():
+        return {"cli_zygote": True}
+
+Only platforms where :py:func:`os.fork` is the default way to start processes are supported. On other
+platforms, the CLI's are run as regular subprocesses.
+"""
+import atexit
+import contextlib
+import json
+import logging
+import os
+import pathlib
+import socket
+import subprocess
+import tempfile
+
+import attr
+from pytestshellutils.exceptions import FactoryTimeout
+from pytestshellutils.utils import time
+from pytestshellutils.utils.processes import ProcessResult
+from pytestshellutils.utils.processes import terminate_process
+
+log = logging.getLogger(__name__)
+
+
+@attr.s(kw_only=True, slots=True, hash=True)
+class ScriptServer:
+    """
+    Base class for long running generated scripts which serve requests over a unix socket.
+
+    The script is started as ``<python_executable> <script_path> <socket_path> <config_dir>``.
+
+    :keyword str python_executable:
+        The python executable used to run the script.
+    :keyword str script_path:
+        The path to the generated script.
+    :keyword str config_dir:
+        The salt configuration directory which is loaded when the script starts.
+    :keyword str socket_path:
+        The path to the unix socket where the script listens for requests.
+    :keyword dict environ:
+        The environment to start the script with.
+    :keyword int,float start_timeout:
+        How long, in seconds, to wait for the script to start accepting connections.
+    """
+
+    python_executable = attr.ib()
+    script_path = attr.ib()
+    config_dir = attr.ib(converter=str)
+    socket_path = attr.ib(converter=str)
+    environ = attr.ib(repr=False, hash=False, factory=os.environ.copy)
+    start_timeout = attr.ib(repr=False, hash=False, default=30)
+    _process = attr.ib(init=False, repr=False, hash=False, default=None)
+
+    def is_running(self):
+        """
+        Returns true if the script process is alive.
+        """
+        if self._process is None:
+            return False
+        return self._process.poll() is None
+
+    def start(self):
+        """
+        Start the script process and wait until it's accepting connections.
+        """
+        if self.is_running():
+            return
+        log.info("%s is starting", self)
+        socket_path = pathlib.Path(self.socket_path)
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        with contextlib.suppress(FileNotFoundError):
+            socket_path.unlink()
+        self._process = subprocess.Popen(  # noqa: S603
+            [self.python_executable, self.script_path, self.socket_path, self.config_dir],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            env=self.environ,
+            close_fds=True,
+        )
+        atexit.register(self.stop)
+        timeout_at = time.time() + self.start_timeout
+        while time.time() <= timeout_at:
+            if not self.is_running():
+                break
+            try:
+                with self._connect(timeout=1):
+                    log.info("%s is started", self)
+                    return
+            except OSError:
+                time.sleep(0.1)
+        self.stop()
+        msg = f"Failed to start {self}"
+        raise RuntimeError(msg)
+
+    def stop(self):
+        """
+        Stop the script process, along with any of its children.
+        """
+        if self._process is None:
+            return
+        atexit.unregister(self.stop)
+        log.info("%s is stopping", self)
+        terminate_process(pid=self._process.pid, kill_children=True, slow_stop=False)
+        with contextlib.suppress(subprocess.TimeoutExpired):
+            self._process.wait(5)
+        self._process = None
+        with contextlib.suppress(FileNotFoundError):
+            pathlib.Path(self.socket_path).unlink()
+        log.info("%s stopped", self)
+
+    def _connect(self, timeout=None):
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.settimeout(timeout)
+        try:
+            conn.connect(self.socket_path)
+        except OSError:
+            conn.close()
+            raise
+        return conn
+
+
+@attr.s(kw_only=True, slots=True, hash=True)
+class CliZygote(ScriptServer):
+    """
+    Salt CLI zygote process.
+
+    Please look at :py:class:`~saltfactories.utils.zygote.ScriptServer` for the supported keyword
+    arguments documentation.
+    """
+
+    def run(self, cmdline, env, cwd, timeout=None, encoding="utf-8"):
+        """
+        Run the passed command line in a child forked from the zygote.
+
+        :param list cmdline:
+            The command line to run. If the first item is the zygote's python executable, it's
+            ignored since the child is already running under it.
+        :param dict env:
+            The environment the child should run with.
+        :param str cwd:
+            The working directory the child should run in.
+        :keyword int,float timeout:
+            How long, in seconds, to wait for the child to finish. When reached, the child process,
+            and its children, are killed and :py:class:`~pytestshellutils.exceptions.FactoryTimeout`
+            is raised.
+        :keyword str encoding:
+            The encoding used to decode the child's ``stdout`` and ``stderr``.
+
+        :return: A :py:class:`~pytestshellutils.utils.processes.ProcessResult` instance.
+        """
+        self.start()
+        argv = list(cmdline)
+        if argv[0] == self.python_executable:
+            argv.pop(0)
+        start_time = time.time()
+        with tempfile.TemporaryDirectory(prefix="zygote-") as tempdir:
+            stdout_path = os.path.join(tempdir, "stdout")
+            stderr_path = os.path.join(tempdir, "stderr")
+            request = {
+                "argv": argv,
+                "env": dict(env),
+                "cwd": str(cwd),
+                "stdout": stdout_path,
+                "stderr": stderr_path,
+            }
+            timed_out = False
+            with self._connect(timeout=10) as conn:
+                conn.sendall(json.dumps(request).encode() + b"\n")
+                rfile = conn.makefile("rb")
+                pid = json.loads(rfile.readline())["pid"]
+                log.debug("%s forked PID %s to run %r", self, pid, cmdline)
+                conn.settimeout(timeout)
+                try:
+                    line = rfile.readline()
+                except socket.timeout:
+                    timed_out = True
+                    terminate_process(pid=pid, kill_children=True, slow_stop=False)
+                    conn.settimeout(10)
+                    # A file object which timed out can't be read from anymore
+                    line = conn.makefile("rb").readline()
+            returncode = json.loads(line)["returncode"] if line else None
+            stdout = self._read_output(stdout_path, encoding)
+            stderr = self._read_output(stderr_path, encoding)
+        result = ProcessResult(returncode=returncode, stdout=stdout, stderr=stderr, cmdline=cmdline)
+        if timed_out:
+            msg = (
+                f"{self} Failed to run: {cmdline}; Error: Timed out after "
+                f"{time.time() - start_time:.2f} seconds!"
+            )
+            raise FactoryTimeout(msg, process_result=result)
+        return result
+
+    @staticmethod
+    def _read_output(path, encoding):
+        try:
+            with open(path, "rb") as rfh:
+                data = rfh.read()
+        except FileNotFoundError:
+            return ""
+        return data.decode(encoding, errors="replace").replace("\r\n", "\n")
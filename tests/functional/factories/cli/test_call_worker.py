@@ -0,0 +1,104 @@
+"""
+Test running ``salt-call`` through a persistent worker.
+"""
+import pytest
+from pytestshellutils.exceptions import FactoryTimeout
+
+pytestmark = [
+    pytest.mark.skip_on_windows,
+]
+
+
+@pytest.fixture
+def file_roots(tmp_path):
+    path = tmp_path / "file-roots"
+    path.mkdir()
+    return path
+
+
+@pytest.fixture
+def salt_minion(salt_master, minion_id, file_roots):
+    overrides = {
+        "file_client": "local",
+        "file_roots": {"base": [str(file_roots)]},
+    }
+    return salt_master.salt_minion_daemon(minion_id, overrides=overrides)
+
+
+@pytest.fixture
+def salt_call_cli(salt_minion):
+    cli = salt_minion.salt_call_cli(persistent=True)
+    try:
+        yield cli
+    finally:
+        cli.worker.stop()
+
+
+def test_worker_disabled_by_default(salt_minion):
+    assert salt_minion.salt_call_cli().worker is None
+
+
+def test_worker_shared_per_config_dir(salt_minion, salt_call_cli):
+    assert salt_minion.salt_call_cli(persistent=True).worker is salt_call_cli.worker
+
+
+def test_json_output(salt_call_cli):
+    ret = salt_call_cli.run("test.echo", "foo")
+    assert ret.returncode == 0, ret
+    assert ret.data == "foo"
+    worker_pid = salt_call_cli.worker._process.pid
+    ret = salt_call_cli.run("test.arg", "bar", baz=1)
+    assert ret.returncode == 0, ret
+    assert ret.data["args"] == ["bar"]
+    assert ret.data["kwargs"]["baz"] == 1
+    # Both calls were served by the same worker process
+    assert salt_call_cli.worker._process.pid == worker_pid
+
+
+def test_returncode(salt_call_cli):
+    ret = salt_call_cli.run("--retcode-passthrough", "test.retcode", "3")
+    assert ret.returncode == 3, ret
+    ret = salt_call_cli.run("test.retcode", "3")
+    assert ret.returncode == 1, ret
+    # The return code does not leak into the next call
+    ret = salt_call_cli.run("test.echo", "foo")
+    assert ret.returncode == 0, ret
+
+
+def test_unavailable_function(salt_call_cli):
+    ret = salt_call_cli.run("foo.bar")
+    assert ret.returncode != 0, ret
+    assert "'foo.bar' is not available" in ret.stderr
+    ret = salt_call_cli.run("test.echo", "foo")
+    assert ret.returncode == 0, ret
+    assert ret.data == "foo"
+
+
+def test_flags_run_in_subprocess(salt_call_cli):
+    ret = salt_call_cli.run("--local", "test.echo", "foo")
+    assert ret.returncode == 0, ret
+    assert ret.data == "foo"
+    assert not salt_call_cli.worker.is_running()
+
+
+def test_sync_invalidates_caller(salt_call_cli, file_roots):
+    ret = salt_call_cli.run("foo.bar")
+    assert ret.returncode != 0, ret
+    modules_dir = file_roots / "_modules"
+    modules_dir.mkdir()
+    modules_dir.joinpath("foo.py").write_text("def bar():\n    return 'bar'\n")
+    ret = salt_call_cli.run("saltutil.sync_modules")
+    assert ret.returncode == 0, ret
+    assert ret.data == ["modules.foo"]
+    ret = salt_call_cli.run("foo.bar")
+    assert ret.returncode == 0, ret
+    assert ret.data == "bar"
+
+
+def test_timeout(salt_call_cli):
+    with pytest.raises(FactoryTimeout):
+        salt_call_cli.run("test.sleep", "60", _timeout=1)
+    assert not salt_call_cli.worker.is_running()
+    ret = salt_call_cli.run("test.echo", "foo")
+    assert ret.returncode == 0, ret
+    assert ret.data == "foo"
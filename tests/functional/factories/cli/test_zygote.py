@@ -0,0 +1,57 @@
+"""
+Test running the salt CLI's through a zygote.
+"""
+import pathlib
+
+import pytest
+from pytestshellutils.exceptions import FactoryTimeout
+
+pytestmark = [
+    pytest.mark.skip_on_windows,
+    pytest.mark.skip_on_spawning_platform(reason="The CLI zygote relies on os.fork()"),
+]
+
+
+@pytest.fixture
+def salt_minion(salt_factories, salt_master, minion_id, monkeypatch):
+    monkeypatch.setattr(salt_factories, "cli_zygote", True)
+    return salt_master.salt_minion_daemon(minion_id)
+
+
+def test_zygote_disabled_by_default(salt_master):
+    assert salt_master.salt_key_cli().zygote is None
+
+
+def test_version_info(salt_minion, cli_salt_version):
+    cli = salt_minion.salt_call_cli()
+    assert cli.zygote is not None
+    ret = cli.run("--version")
+    assert ret.returncode == 0, ret
+    assert ret.stdout.strip() == f"{pathlib.Path(cli.script_name).name} {cli_salt_version}"
+    assert cli.zygote.is_running()
+
+
+def test_zygote_shared_per_config_dir(salt_minion):
+    assert salt_minion.salt_call_cli().zygote is salt_minion.salt_call_cli().zygote
+
+
+def test_json_output(salt_minion):
+    cli = salt_minion.salt_call_cli()
+    ret = cli.run("--local", "test.echo", "foo")
+    assert ret.returncode == 0, ret
+    assert ret.data == "foo"
+    ret = cli.run("--local", "test.echo", "bar", env={"FOO": "1"})
+    assert ret.returncode == 0, ret
+    assert ret.data == "bar"
+
+
+def test_returncode(salt_minion):
+    cli = salt_minion.salt_call_cli()
+    ret = cli.run("--local", "--retcode-passthrough", "test.retcode", "3")
+    assert ret.returncode == 3, ret
+
+
+def test_timeout(salt_minion):
+    cli = salt_minion.salt_call_cli()
+    with pytest.raises(FactoryTimeout):
+        cli.run("--local", "test.sleep", "60", _timeout=1)
@@ -1,4 +1,8 @@
+import contextlib
+import socket
+
 import pytest
+import yaml
 
 from saltfactories.utils import random_string
 from saltfactories.utils import running_username
@@ -111,3 +115,27 @@ def test_pytest_config(salt_factories, configure_kwargs):
     assert "log" in config[config_key]
     for key in ("host", "level", "port", "prefix"):
         assert key in config[config_key]["log"]
+
+
+def test_allocated_ports(salt_factories):
+    master = salt_factories.salt_master_daemon(random_string("master-"))
+    ports = [master.config[key] for key in ("publish_port", "ret_port", "tcp_master_workers")]
+    assert len(set(ports)) == len(ports)
+    assert all(salt_factories.port_allocator.is_allocated(port) for port in ports)
+
+
+def test_port_conflicts_resolved_before_start(salt_factories):
+    master = salt_factories.salt_master_daemon(
+        random_string("master-"), overrides={"publish_port": 4505}
+    )
+    ret_port = master.config["ret_port"]
+    with contextlib.closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as sock:
+        sock.bind(("127.0.0.1", ret_port))
+        sock.listen()
+        master._resolve_port_conflicts()
+    assert master.config["ret_port"] != ret_port
+    assert salt_factories.port_allocator.is_allocated(master.config["ret_port"])
+    # Ports which were not allocated are left alone
+    assert master.config["publish_port"] == 4505
+    with open(master.config_file, encoding="utf-8") as rfh:
+        assert yaml.safe_load(rfh)["ret_port"] == master.config["ret_port"]
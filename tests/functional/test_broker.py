@@ -0,0 +1,127 @@
+"""
+Test the shared event and log broker.
+"""
+import contextlib
+import logging
+import socket
+import time
+
+import msgpack
+import pytest
+
+from saltfactories.plugins.broker import BrokerSubscriber
+from saltfactories.plugins.broker import EventBroker
+from saltfactories.plugins.event_listener import EventListener
+from saltfactories.utils.saltext.log_handlers.pytest_log_handler import ZMQHandler
+
+
+@pytest.fixture
+def broker():
+    _broker = EventBroker()
+    _broker.start()
+    try:
+        yield _broker
+    finally:
+        _broker.stop()
+
+
+@pytest.fixture
+def subscriber(broker):
+    _subscriber = BrokerSubscriber(**broker.get_worker_config())
+    _subscriber.start()
+    try:
+        yield _subscriber
+    finally:
+        _subscriber.stop()
+
+
+def wait_for(func, timeout=5):
+    expire = time.time() + timeout
+    while time.time() < expire:
+        if func():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def forward_events(broker, *daemon_ids):
+    with contextlib.closing(socket.create_connection(("127.0.0.1", broker.events_port))) as sock:
+        for daemon_id in daemon_ids:
+            sock.sendall(
+                msgpack.packb(
+                    {
+                        "id": daemon_id,
+                        "tag": f"salt/test/{daemon_id}",
+                        "data": {"_stamp": time.time()},
+                    }
+                )
+            )
+
+
+def test_worker_config(broker):
+    config = broker.get_worker_config()
+    assert config == {
+        "host": broker.host,
+        "events_port": broker.events_port,
+        "logs_port": broker.logs_port,
+        "subscribers_port": broker.subscribers_port,
+    }
+    assert len({config["events_port"], config["logs_port"], config["subscribers_port"]}) == 3
+
+
+def test_only_registered_daemons_events_received(broker, subscriber):
+    with EventListener(broker_subscriber=subscriber) as event_listener:
+        assert event_listener.port == broker.events_port
+        assert event_listener.server is None
+        event_listener.register_daemon("master-1")
+        assert wait_for(lambda: "master-1" in broker.routes)
+        start_time = time.time()
+        forward_events(broker, "master-2", "master-1")
+        matched_events = event_listener.wait_for_events(
+            [("master-1", "salt/test/master-1")], timeout=5, after_time=start_time
+        )
+        assert matched_events.found_all_events
+        assert [event.daemon_id for event in event_listener.store] == ["master-1"]
+
+
+def test_routes_dropped_when_subscriber_disconnects(broker, subscriber):
+    subscriber.subscribe("minion-1")
+    assert wait_for(lambda: "minion-1" in broker.routes)
+    subscriber.stop()
+    assert wait_for(lambda: not broker.routes)
+
+
+def test_log_records_routed(broker, caplog):
+    handler = ZMQHandler(port=broker.logs_port, daemon_id="minion-1")
+    with contextlib.closing(
+        socket.create_connection(("127.0.0.1", broker.subscribers_port))
+    ) as sock:
+        sock.sendall(msgpack.packb({"subscribe": "minion-1"}))
+        assert wait_for(lambda: "minion-1" in broker.routes)
+        handler.emit(logging.makeLogRecord({"name": "foo", "msg": "Routed", "levelno": logging.INFO}))
+        sock.settimeout(5)
+        unpacker = msgpack.Unpacker(raw=False)
+        while True:
+            unpacker.feed(sock.recv(65536))
+            messages = list(unpacker)
+            if messages:
+                break
+    handler.close()
+    ((kind, record),) = messages
+    assert kind == "log"
+    assert record["daemon_id"] == "minion-1"
+    assert record["msg"] == "Routed"
+    # Routed to the subscriber, not handled locally
+    assert "Routed" not in caplog.text
+
+
+def test_unrouted_log_records_handled_locally(broker, caplog):
+    handler = ZMQHandler(port=broker.logs_port, daemon_id="minion-2")
+    with caplog.at_level(logging.INFO, logger="foo"):
+        handler.emit(
+            logging.makeLogRecord(
+                {"name": "foo", "msg": "Not routed", "levelno": logging.INFO, "levelname": "INFO"}
+            )
+        )
+        assert wait_for(lambda: "Not routed" in caplog.text)
+    handler.close()
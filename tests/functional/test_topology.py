@@ -0,0 +1,67 @@
+"""
+Test the topology aware test ordering.
+"""
+
+
+def test_tests_reordered(pytester):
+    pytester.makepyfile(
+        test_one="""
+        import pytest
+
+        @pytest.mark.salt_factories_topology("salt_master")
+        def test_1():
+            pass
+
+        def test_2():
+            pass
+
+        @pytest.mark.salt_factories_topology("salt_master", "salt_minion")
+        def test_3():
+            pass
+        """,
+        test_two="""
+        import pytest
+
+        pytestmark = pytest.mark.salt_factories_topology("salt_master")
+
+        def test_4():
+            pass
+
+        @pytest.mark.salt_factories_topology("salt_minion", "salt_master")
+        def test_5():
+            pass
+        """,
+    )
+    res = pytester.runpytest("-v")
+    res.assert_outcomes(passed=5)
+    res.stdout.fnmatch_lines(
+        [
+            "*test_one.py::test_1 PASSED*",
+            "*test_two.py::test_4 PASSED*",
+            "*test_one.py::test_2 PASSED*",
+            "*test_one.py::test_3 PASSED*",
+            "*test_two.py::test_5 PASSED*",
+            "*Salt Factories Topologies*",
+            "Ran the tests of 2 topologies one after the other, saving 2 topology starts",
+            "No start up cost recorded yet for: salt_master, salt_master,salt_minion",
+        ]
+    )
+    # The start up costs were recorded, the next session estimates the time saved
+    res = pytester.runpytest("-v")
+    res.assert_outcomes(passed=5)
+    res.stdout.fnmatch_lines(
+        ["Ran the tests of 2 topologies one after the other, saving 2 topology starts, an estimated *s*"]
+    )
+    res.stdout.no_fnmatch_line("No start up cost recorded yet*")
+
+
+def test_no_topologies(pytester):
+    pytester.makepyfile(
+        """
+        def test_one():
+            pass
+        """
+    )
+    res = pytester.runpytest()
+    res.assert_outcomes(passed=1)
+    res.stdout.no_fnmatch_line("*Salt Factories Topologies*")
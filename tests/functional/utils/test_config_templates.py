@@ -0,0 +1,78 @@
+"""
+Test producing the salt daemons configurations from templates.
+"""
+import pathlib
+from collections.abc import Mapping
+
+import pytest
+
+from saltfactories.utils import random_string
+from saltfactories.utils.config_templates import ConfigTemplates
+
+
+@pytest.fixture
+def config_templates(salt_factories, monkeypatch):
+    templates = ConfigTemplates()
+    monkeypatch.setattr(salt_factories, "config_templates", templates)
+    return templates
+
+
+def _thaw(value):
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)) or type(value).__name__ == "ImmutableList":
+        return [_thaw(item) for item in value]
+    return value
+
+
+def _assert_rendered_like_loaded(factory):
+    loaded_config = factory.load_config(factory.config_file, factory.config)
+    assert _thaw(factory.config) == _thaw(loaded_config)
+    for entry in factory._get_verify_config_entries(loaded_config):  # pylint: disable=protected-access
+        assert pathlib.Path(entry).is_dir()
+
+
+def test_master_and_minions(salt_factories, config_templates):
+    # The first is the template, the second, still loaded by salt, verifies it
+    masters = [salt_factories.salt_master_daemon(random_string("master-")) for _ in range(2)]
+    assert config_templates.hits == 0
+    master = salt_factories.salt_master_daemon(random_string("master-"))
+    assert config_templates.hits == 1
+    assert master.config["ret_port"] not in [other.config["ret_port"] for other in masters]
+    _assert_rendered_like_loaded(master)
+
+    for other in masters:
+        other.salt_minion_daemon(random_string("minion-"))
+    assert config_templates.hits == 1
+    minion = master.salt_minion_daemon(random_string("minion-"))
+    assert config_templates.hits == 2
+    assert minion.config["master_port"] == master.config["ret_port"]
+    assert minion.config["pytest-minion"]["master-id"] == master.id
+    _assert_rendered_like_loaded(minion)
+
+
+def test_different_config_not_rendered(salt_factories, config_templates):
+    for _ in range(2):
+        salt_factories.salt_master_daemon(random_string("master-"))
+    master = salt_factories.salt_master_daemon(random_string("master-"), overrides={"worker_threads": 3})
+    assert config_templates.hits == 0
+    assert master.config["worker_threads"] == 3
+
+
+def test_not_verified_discarded(salt_factories, config_templates):
+    salt_factories.salt_master_daemon(random_string("master-"))
+    (template,) = config_templates.templates.values()
+    # Whatever salt loads which the template doesn't reproduce
+    template.config["worker_threads"] += 1
+    salt_factories.salt_master_daemon(random_string("master-"))
+    assert list(config_templates.templates.values()) == [None]
+    master = salt_factories.salt_master_daemon(random_string("master-"))
+    assert config_templates.hits == 0
+    _assert_rendered_like_loaded(master)
+
+
+def test_disabled(salt_factories, monkeypatch):
+    monkeypatch.setattr(salt_factories, "config_templates", None)
+    for _ in range(3):
+        master = salt_factories.salt_master_daemon(random_string("master-"))
+    _assert_rendered_like_loaded(master)
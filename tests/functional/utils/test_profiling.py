@@ -0,0 +1,82 @@
+"""
+Test profiling the generated scripts.
+"""
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from saltfactories.utils import cli_scripts
+from saltfactories.utils import profiling
+
+
+@pytest.fixture
+def profile_environ(tmp_path):
+    profiles_dir = tmp_path / "profiles"
+    profiles_dir.mkdir()
+    return {
+        "SALT_FACTORIES_PROFILE": "*",
+        "SALT_FACTORIES_PROFILE_DIR": str(profiles_dir),
+    }
+
+
+def test_salt_cli(tmp_path, profile_environ):
+    script_path = cli_scripts.generate_script(tmp_path / "scripts", "salt-call", profile=True)
+    ret = subprocess.run(
+        [sys.executable, script_path, "--version"],
+        env=dict(profile_environ, SALT_FACTORIES_PROFILE_NAME="minion-1"),
+        check=False,
+    )
+    assert ret.returncode == 0
+    profiles = profiling.get_profiles(profile_environ["SALT_FACTORIES_PROFILE_DIR"])
+    assert list(profiles) == ["minion-1"]
+    functions = profiling.hottest_functions(profiles["minion-1"], count=5)
+    assert len(functions) == 5
+    function, calls, own_time, cumulative_time = functions[0]
+    assert calls > 0
+    assert cumulative_time >= own_time > 0
+
+
+def test_not_matching(tmp_path, profile_environ):
+    script_path = cli_scripts.generate_script(tmp_path / "scripts", "salt-call", profile=True)
+    ret = subprocess.run(
+        [sys.executable, script_path, "--version"],
+        env=dict(profile_environ, SALT_FACTORIES_PROFILE="master-*"),
+        check=False,
+    )
+    assert ret.returncode == 0
+    assert profiling.get_profiles(profile_environ["SALT_FACTORIES_PROFILE_DIR"]) == {}
+
+
+@pytest.mark.skip_unless_on_linux
+def test_forked_processes(tmp_path, profile_environ):
+    script_path = tmp_path / "script.py"
+    script_path.write_text(
+        "import os\nimport sys\n\n"
+        + cli_scripts.SCRIPT_TEMPLATES["profile"].format(script_name="daemon")
+        + textwrap.dedent(
+            """
+            import multiprocessing
+
+            def target():
+                sum(range(1000))
+
+            if __name__ == "__main__":
+                ctx = multiprocessing.get_context("fork")
+                for _ in range(2):
+                    proc = ctx.Process(target=target)
+                    proc.start()
+                    proc.join()
+                pid = os.fork()
+                if pid == 0:
+                    sys.exit(0)
+                os.waitpid(pid, 0)
+            """
+        )
+    )
+    ret = subprocess.run([sys.executable, str(script_path)], env=profile_environ, check=False)
+    assert ret.returncode == 0
+    profiles = profiling.get_profiles(profile_environ["SALT_FACTORIES_PROFILE_DIR"])
+    # The main process, the two multiprocessing children and the forked child
+    assert len(profiles["daemon"]) == 4
@@ -30,3 +30,8 @@ def test_merged_json_out_disabled(salt_cli, salt_minion, salt_minion_2):
     assert not ret.data
     assert f'"{salt_minion.id}": true' in ret.stdout
     assert f'"{salt_minion_2.id}": true' in ret.stdout
+
+
+def test_iter_run(salt_cli, salt_minion, salt_minion_2):
+    returns = dict(salt_cli.iter_run("test.ping", minion_tgt="*"))
+    assert returns == {salt_minion.id: True, salt_minion_2.id: True}
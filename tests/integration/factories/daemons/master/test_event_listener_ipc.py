@@ -0,0 +1,69 @@
+"""
+Test subscribing the event listener directly to a local master's event publisher.
+"""
+import time
+
+import pytest
+
+from saltfactories.client import Call
+from saltfactories.utils import random_string
+
+
+@pytest.fixture(scope="module")
+def master(salt_factories):
+    salt_factories.event_listener_ipc = True
+    try:
+        factory = salt_factories.salt_master_daemon(random_string("master-"))
+    finally:
+        salt_factories.event_listener_ipc = False
+    with factory.started():
+        yield factory
+
+
+@pytest.fixture(scope="module")
+def minion(master):
+    factory = master.salt_minion_daemon(random_string("minion-"))
+    with factory.started():
+        yield factory
+
+
+def test_engine_not_enabled(master):
+    assert master.event_listener_ipc is True
+    assert "pytest" not in master.config["engines"]
+
+
+def test_subscribed(master, event_listener):
+    assert master.id in event_listener.master_subscribers
+
+
+def test_events(master, minion, event_listener):
+    start_time = time.time()
+    salt_call_cli = minion.salt_call_cli()
+    event_tag = random_string("salt/test/event/")
+    ret = salt_call_cli.run("event.send", event_tag, data={"foo": "bar"})
+    assert ret.returncode == 0, ret
+    matched_events = event_listener.wait_for_events(
+        [(master.id, event_tag)], after_time=start_time, timeout=30
+    )
+    assert matched_events.found_all_events
+    for event in matched_events:
+        assert event.data["id"] == minion.id
+        assert event.data["data"]["foo"] == "bar"
+
+
+def test_wait_for_job(master, minion, event_listener):
+    (result,) = master.salt_client().run_many(
+        Call(function="test.ping", minion_tgt=minion.id), timeout=60
+    )
+    job = event_listener.wait_for_job(result.jid, timeout=30)
+    assert job.is_complete(), job.pending
+    assert job.returns[minion.id].data["return"] is True
+
+
+def test_unsubscribed_after_terminate(master, event_listener):
+    master.terminate()
+    try:
+        assert master.id not in event_listener.master_subscribers
+    finally:
+        master.start()
+    assert master.id in event_listener.master_subscribers
@@ -0,0 +1,91 @@
+"""
+Test the in-process salt local client.
+"""
+import asyncio
+
+import pytest
+
+from saltfactories.client import Call
+from saltfactories.utils import random_string
+
+
+@pytest.fixture(scope="module")
+def master(salt_factories):
+    factory = salt_factories.salt_master_daemon(random_string("master-"))
+    with factory.started():
+        yield factory
+
+
+@pytest.fixture(scope="module")
+def minion_1(master):
+    factory = master.salt_minion_daemon(random_string("minion-1-"))
+    with factory.started():
+        yield factory
+
+
+@pytest.fixture(scope="module")
+def minion_2(master):
+    factory = master.salt_minion_daemon(random_string("minion-2-"))
+    with factory.started():
+        yield factory
+
+
+@pytest.fixture
+def salt_client(master, minion_1, minion_2):
+    return master.salt_client()
+
+
+def test_run(salt_client, minion_1):
+    assert salt_client.run("test.echo", "foo", minion_tgt=minion_1.id) == "foo"
+
+
+def test_run_many(salt_client, minion_1, minion_2):
+    results = salt_client.run_many(
+        Call(function="test.ping", minion_tgt=[minion_1.id, minion_2.id], tgt_type="list"),
+        Call(function="test.arg", args=("foo",), kwargs={"bar": 1}, minion_tgt=minion_2.id),
+        Call(function="test.retcode", args=(3,), minion_tgt=minion_1.id),
+        timeout=60,
+    )
+    ping, arg, retcode = results
+    assert ping.complete, ping.missing
+    assert ping.returns == {minion_1.id: True, minion_2.id: True}
+    assert ping.publish_time > 0
+    assert set(ping.latencies) == {minion_1.id, minion_2.id}
+    assert ping.total_time >= ping.publish_time
+    assert arg.returns[minion_2.id]["args"] == ["foo"]
+    assert arg.returns[minion_2.id]["kwargs"]["bar"] == 1
+    assert retcode.retcodes == {minion_1.id: 3}
+    assert len({result.jid for result in results}) == 3
+
+
+def test_run_many_missing_returns(salt_client, minion_1):
+    (result,) = salt_client.run_many(
+        Call(function="test.sleep", args=(10,), minion_tgt=minion_1.id), timeout=1
+    )
+    assert not result.complete
+    assert result.missing == [minion_1.id]
+    assert result.total_time is None
+
+
+def test_async(salt_client, minion_1, minion_2):
+    async def run():
+        return await asyncio.gather(
+            salt_client.run_async("test.echo", "foo", minion_tgt=minion_1.id),
+            salt_client.run_many_async(Call(function="test.ping", minion_tgt=minion_2.id)),
+        )
+
+    echo, (ping,) = asyncio.run(run())
+    assert echo == "foo"
+    assert ping.returns == {minion_2.id: True}
+
+
+def test_event_listener_wait_for_job(salt_client, event_listener, master, minion_1, minion_2):
+    (result,) = salt_client.run_many(
+        Call(function="test.ping", minion_tgt=[minion_1.id, minion_2.id], tgt_type="list")
+    )
+    job = event_listener.wait_for_job(result.jid, timeout=30)
+    assert job.is_complete(), job.pending
+    assert job.daemon_id == master.id
+    assert job.minions == {minion_1.id, minion_2.id}
+    assert job.returns[minion_1.id].data["return"] is True
+    assert job.latency_stats["count"] == 2
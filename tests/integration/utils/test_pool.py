@@ -0,0 +1,70 @@
+"""
+Test the warm salt daemons pools.
+"""
+import pathlib
+
+import pytest
+
+from saltfactories.utils import random_string
+
+
+@pytest.fixture(scope="module")
+def pool(salt_factories):
+    with salt_factories.pool(random_string("pool-"), minions=1) as _pool:
+        yield _pool
+
+
+def test_lease_reset(pool):
+    with pool.lease() as daemons:
+        master = daemons.master
+        minion = daemons.minion
+        assert master.is_running()
+        assert minion.is_running()
+        master.state_tree.base.write_path.joinpath("leftover.sls").write_text("{}")
+        ret = master.salt_cli().run("test.ping", minion_tgt=minion.id)
+        assert ret.returncode == 0, ret
+        assert ret.data is True
+        jobs_dir = pathlib.Path(master.config["cachedir"]) / "jobs"
+        assert any(jobs_dir.iterdir())
+        master_pid = master.pid
+    assert daemons.leased is False
+    # Reset, not restarted
+    assert master.pid == master_pid
+    assert daemons.restarts == 0
+    assert not master.state_tree.base.write_path.joinpath("leftover.sls").exists()
+    assert not any(jobs_dir.iterdir())
+
+    with pool.lease() as daemons_again:
+        assert daemons_again is daemons
+        assert daemons.leases == 2
+        ret = master.salt_cli().run("test.ping", minion_tgt=minion.id)
+        assert ret.returncode == 0, ret
+        assert ret.data is True
+
+
+def test_restarted_when_stopped(pool):
+    with pool.lease() as daemons:
+        daemons.minion.terminate()
+    assert daemons.restarts == 1
+    assert daemons.minion.is_running()
+    with pool.lease() as daemons:
+        ret = daemons.master.salt_cli().run("test.ping", minion_tgt=daemons.minion.id)
+        assert ret.returncode == 0, ret
+        assert ret.data is True
+
+
+def test_restarted_when_config_changed(pool):
+    with pool.lease() as daemons:
+        config_file = pathlib.Path(daemons.minion.config_file)
+        contents = config_file.read_bytes()
+        config_file.write_bytes(contents + b"\nfoo: bar\n")
+        restarts = daemons.restarts
+    assert daemons.restarts == restarts + 1
+    assert config_file.read_bytes() == contents
+
+
+def test_grows_when_all_leased(pool):
+    with pool.lease() as first, pool.lease() as second:
+        assert first is not second
+        assert second.master.is_running()
+    assert len(pool.members) == 2
@@ -463,6 +463,27 @@ def test_process_output(cli_script_name, config_file):
     assert json_out is None
 
 
+@pytest.mark.parametrize("merge_json_output", (True, False))
+def test_process_output_multiple_minions(cli_script_name, config_file, merge_json_output):
+    returns = {
+        "minion-1": {"foo": "}\n{"},
+        "minion-2": True,
+    }
+    in_stdout = "\n".join(
+        json.dumps({minion_id: ret}, indent=0) for minion_id, ret in returns.items()
+    )
+    config = {"conf_file": config_file, "id": "the-id"}
+    proc = SaltCli(script_name=cli_script_name, config=config)
+    # Call proc.cmdline() so that proc.__json_output__ is properly set
+    proc.cmdline("*", merge_json_output=merge_json_output)
+    stdout, _, json_out = proc.process_output(in_stdout, "")
+    assert stdout == in_stdout
+    if merge_json_output:
+        assert json_out == returns
+    else:
+        assert json_out is None
+
+
 def test_non_string_cli_flags(minion_id, config_dir, config_file, cli_script_name):
     config = {"conf_file": config_file, "id": "the-id"}
     args = ["test.ping"]
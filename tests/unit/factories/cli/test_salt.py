@@ -2,8 +2,10 @@
 Test the ``salt`` CLI functionality.
 """
 import shutil
+import sys
 
 import pytest
+from pytestshellutils.exceptions import FactoryTimeout
 
 from saltfactories.cli.salt import Salt
 
@@ -114,3 +116,69 @@ def test_default_timeout_construct(minion_id, config_dir, config_file, cli_scrip
     ]
     cmdline = proc.cmdline(*args, minion_tgt=minion_id)
     assert cmdline == expected
+
+
+@pytest.fixture
+def iter_run_script_name(pytester, tmp_path):
+    marker = tmp_path / "marker"
+    py_file = pytester.makepyfile(
+        iter_run_script=f"""
+        import json
+        import os
+        import sys
+        import time
+
+        print("No minions matched the target.")
+        print(json.dumps({{"minion-1": {{"foo": "}}\\n{{"}}}}, indent=0), flush=True)
+        # Only print the next return once the test got the first one
+        while not os.path.exists({str(marker)!r}):
+            time.sleep(0.05)
+        print(json.dumps({{"minion-2": True}}, indent=0), flush=True)
+        if "test.sleep" in sys.argv:
+            time.sleep(60)
+        """
+    )
+    try:
+        yield str(py_file), marker
+    finally:
+        py_file.unlink()
+
+
+def test_iter_run(minion_id, config_file, iter_run_script_name):
+    script_name, marker = iter_run_script_name
+    config = {"conf_file": config_file, "id": "the-id"}
+    proc = Salt(script_name=script_name, config=config, python_executable=sys.executable)
+    returns = proc.iter_run("test.ping", minion_tgt="*")
+    assert next(returns) == ("minion-1", {"foo": "}\n{"})
+    marker.touch()
+    assert list(returns) == [("minion-2", True)]
+
+
+def test_iter_run_stop_early(minion_id, config_file, iter_run_script_name):
+    script_name, _ = iter_run_script_name
+    config = {"conf_file": config_file, "id": "the-id"}
+    proc = Salt(script_name=script_name, config=config, python_executable=sys.executable)
+    returns = proc.iter_run("test.ping", minion_tgt="*")
+    assert next(returns) == ("minion-1", {"foo": "}\n{"})
+    # The script would never exit by itself since the marker file is never created
+    returns.close()
+
+
+def test_iter_run_timeout(minion_id, config_file, iter_run_script_name):
+    script_name, marker = iter_run_script_name
+    marker.touch()
+    config = {"conf_file": config_file, "id": "the-id"}
+    proc = Salt(script_name=script_name, config=config, python_executable=sys.executable)
+    returns = []
+    with pytest.raises(FactoryTimeout):
+        for ret in proc.iter_run("--timeout=0", "test.sleep", minion_tgt="*", _timeout=2):
+            returns.append(ret)
+    assert returns == [("minion-1", {"foo": "}\n{"}), ("minion-2", True)]
+
+
+@pytest.mark.parametrize("flag", ["--static", "--out=yaml", "--out"])
+def test_iter_run_unsupported_flags(minion_id, config_file, cli_script_name, flag):
+    config = {"conf_file": config_file, "id": "the-id"}
+    proc = Salt(script_name=cli_script_name, config=config)
+    with pytest.raises(pytest.UsageError):
+        next(proc.iter_run(flag, "test.ping", minion_tgt="*"))
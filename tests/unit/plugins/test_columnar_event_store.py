@@ -0,0 +1,123 @@
+"""
+Test the event listener columnar event store.
+"""
+import time
+import tracemalloc
+from collections import deque
+
+import pytest
+
+from saltfactories.plugins.event_listener import ColumnarEventStore
+from saltfactories.plugins.event_listener import Event
+from saltfactories.plugins.event_listener import EventListener
+
+
+def make_event(num, daemon_id="master", tag=None, timestamp=None):
+    full_data = {
+        "jid": f"2022100911374512{num:04d}",
+        "fun": "test.ping",
+        "minions": ["minion-1", "minion-2"],
+        "_stamp": timestamp or time.time(),
+    }
+    return Event(
+        daemon_id=daemon_id,
+        tag=tag or f"salt/job/{full_data['jid']}/new",
+        timestamp=full_data["_stamp"],
+        data={key: value for key, value in full_data.items() if not key.startswith("_")},
+        full_data=full_data,
+        expire_seconds=120,
+    )
+
+
+@pytest.fixture
+def store():
+    return ColumnarEventStore(maxlen=100, expire_seconds=120)
+
+
+def test_append_and_iterate(store):
+    events = [make_event(num) for num in range(3)]
+    for event in events:
+        store.append(event)
+    assert len(store) == 3
+    stored = list(store)
+    assert [event.tag for event in stored] == [event.tag for event in events]
+    assert stored[0].data == {
+        "jid": events[0].data["jid"],
+        "fun": "test.ping",
+        "minions": ("minion-1", "minion-2"),
+    }
+    assert stored[0].timestamp == events[0].timestamp
+    assert "_stamp" in stored[0].full_data
+
+
+def test_maxlen(store):
+    for num in range(250):
+        store.append(make_event(num))
+    assert len(store) == 100
+    assert [event.data["jid"] for event in store] == [
+        make_event(num).data["jid"] for num in range(150, 250)
+    ]
+
+
+def test_select(store):
+    start_time = time.time()
+    store.append(make_event(1, timestamp=start_time - 10))
+    store.append(make_event(2, timestamp=start_time + 1))
+    store.append(make_event(3, daemon_id="other-master", timestamp=start_time + 1))
+    store.append(make_event(4, tag="salt/auth", timestamp=start_time + 1))
+    selected = store.select([("master", "salt/job/*/new")], after_time=start_time)
+    assert [event.data["jid"] for event in selected] == [make_event(2).data["jid"]]
+    selected = store.select(
+        [("master", "salt/job/*/new"), ("master", "salt/auth")], after_time=start_time - 60
+    )
+    assert len(selected) == 3
+    assert store.select([("unknown", "*")], after_time=0) == []
+
+
+def test_remove_expired(store):
+    store.append(make_event(1, timestamp=time.time() - 300))
+    store.append(make_event(2, tag="salt/auth"))
+    assert len(store) == 2
+    store.remove_expired()
+    assert [event.tag for event in store] == ["salt/auth"]
+    assert store.select([("master", "salt/job/*")], after_time=0) == []
+
+
+def test_clear(store):
+    store.append(make_event(1))
+    store.clear()
+    assert len(store) == 0
+    assert list(store) == []
+
+
+def test_event_listener_columnar_store():
+    listener = EventListener(columnar_store=True)
+    assert isinstance(listener.store, ColumnarEventStore)
+    start_time = time.time()
+    listener._process_event_payload(
+        {"id": "master", "tag": "salt/test/1", "data": {"foo": [1], "_stamp": time.time()}}
+    )
+    (event,) = listener.get_events([("master", "salt/test/*")], after_time=start_time - 1)
+    assert event.data == {"foo": (1,)}
+    matched_events = listener.wait_for_events(
+        [("master", "salt/test/1")], after_time=start_time - 1, timeout=1
+    )
+    assert matched_events.found_all_events
+
+
+def test_memory_usage():
+    events = [make_event(num) for num in range(2000)]
+
+    def measure(store):
+        tracemalloc.start()
+        try:
+            for event in events:
+                # The listener creates a new event per received payload
+                store.append(make_event(int(event.data["jid"][-4:]), timestamp=event.timestamp))
+            return tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+    deque_size = measure(deque(maxlen=10000))
+    columnar_size = measure(ColumnarEventStore(maxlen=10000))
+    assert columnar_size * 2 < deque_size
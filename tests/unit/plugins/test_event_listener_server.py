@@ -0,0 +1,127 @@
+"""
+Test the event listener TCP server protocol.
+"""
+import asyncio
+import time
+from datetime import datetime
+from datetime import timezone
+
+import msgpack
+import pytest
+
+from saltfactories.plugins.event_listener import EventListener
+from saltfactories.plugins.event_listener import EventListenerServer
+
+
+class FakeTransport(asyncio.Transport):
+    def __init__(self):
+        super().__init__()
+        self.paused = 0
+        self.resumed = 0
+        self.closed = False
+
+    def get_extra_info(self, name, default=None):
+        return default
+
+    def pause_reading(self):
+        self.paused += 1
+
+    def resume_reading(self):
+        self.resumed += 1
+
+    def is_closing(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def listener():
+    # The event listener is not started, the protocol is fed directly
+    return EventListener(max_buffer_size=1024)
+
+
+@pytest.fixture
+def transport():
+    return FakeTransport()
+
+
+@pytest.fixture
+def protocol(listener, transport):
+    protocol = EventListenerServer(listener)
+    protocol.connection_made(transport)
+    return protocol
+
+
+def pack_event(num, size=10):
+    return msgpack.packb(
+        {
+            "id": "master",
+            "tag": f"salt/test/{num}",
+            "data": {"num": num, "items": [num], "blob": "x" * size, "_stamp": time.time()},
+        }
+    )
+
+
+async def _drain():
+    # Let the scheduled feeding run
+    for _ in range(100):
+        await asyncio.sleep(0)
+
+
+def test_events_decoded(listener, protocol):
+    protocol.data_received(pack_event(1) + pack_event(2)[:5])
+    assert [event.tag for event in listener.store] == ["salt/test/1"]
+    protocol.data_received(pack_event(2)[5:])
+    assert [event.tag for event in listener.store] == ["salt/test/1", "salt/test/2"]
+    event = listener.store[0]
+    assert event.data == {"num": 1, "items": (1,), "blob": "x" * 10}
+    assert isinstance(event.timestamp, float)
+    assert "_stamp" in event.full_data
+
+
+def test_burst_is_not_lost(listener, protocol, transport):
+    burst = b"".join(pack_event(num, size=100) for num in range(50))
+    assert len(burst) > listener.max_buffer_size
+
+    async def _run():
+        protocol.data_received(burst)
+        await _drain()
+
+    asyncio.run(_run())
+    assert [event.data["num"] for event in listener.store] == list(range(50))
+    assert transport.paused == transport.resumed == 1
+    assert not transport.closed
+
+
+def test_event_bigger_than_buffer(listener, protocol, transport):
+    async def _run():
+        protocol.data_received(pack_event(1, size=2048))
+        await _drain()
+
+    asyncio.run(_run())
+    assert not listener.store
+    assert transport.closed
+
+
+def test_none_closes_connection(listener, protocol, transport):
+    protocol.data_received(pack_event(1) + msgpack.packb(None) + pack_event(2))
+    assert [event.tag for event in listener.store] == ["salt/test/1"]
+    assert transport.closed
+
+
+@pytest.mark.parametrize(
+    "stamp",
+    [
+        "2022-10-09T11:37:45.123456",
+        "2022-10-09T11:37:45.123456+00:00",
+        datetime(2022, 10, 9, 11, 37, 45, 123456, tzinfo=timezone.utc),
+        1665315465.123456,
+    ],
+)
+def test_stamp_conversion(listener, stamp):
+    listener._process_event_payload({"id": "master", "tag": "foo", "data": {"_stamp": stamp}})
+    (event,) = listener.store
+    assert event.timestamp == pytest.approx(1665315465.123456)
+    assert event.stamp == datetime(2022, 10, 9, 11, 37, 45, 123456, tzinfo=timezone.utc)
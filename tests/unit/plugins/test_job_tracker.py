@@ -0,0 +1,145 @@
+"""
+Test the event listener job tracker.
+"""
+import threading
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import pytest
+
+from saltfactories.plugins.event_listener import EventListener
+
+
+@pytest.fixture
+def listener():
+    # The event listener is not started, the payloads are processed directly
+    return EventListener()
+
+
+@pytest.fixture
+def jid():
+    return "20221009113745123456"
+
+
+@pytest.fixture
+def published_at():
+    return datetime.now(tz=timezone.utc)
+
+
+def send_new(listener, jid, published_at, minions):
+    listener._process_event_payload(
+        {
+            "id": "master",
+            "tag": f"salt/job/{jid}/new",
+            "data": {
+                "jid": jid,
+                "fun": "test.ping",
+                "minions": minions,
+                "_stamp": published_at.isoformat(),
+            },
+        }
+    )
+
+
+def send_return(listener, jid, published_at, minion_id, seconds):
+    stamp = published_at + timedelta(seconds=seconds)
+    listener._process_event_payload(
+        {
+            "id": "master",
+            "tag": f"salt/job/{jid}/ret/{minion_id}",
+            "data": {
+                "id": minion_id,
+                "jid": jid,
+                "fun": "test.ping",
+                "return": True,
+                "_stamp": stamp.replace(tzinfo=None).isoformat(),
+            },
+        }
+    )
+
+
+def test_job_indexing(listener, jid, published_at):
+    assert listener.get_job(jid) is None
+    send_new(listener, jid, published_at, ["minion-1", "minion-2"])
+    job = listener.get_job(jid)
+    assert job.daemon_id == "master"
+    assert job.function == "test.ping"
+    assert job.minions == {"minion-1", "minion-2"}
+    assert job.pending == {"minion-1", "minion-2"}
+    assert not job.is_complete()
+
+    send_return(listener, jid, published_at, "minion-1", 1)
+    assert job.pending == {"minion-2"}
+    assert not job.is_complete()
+    assert job.is_complete(minions=["minion-1"])
+    assert job.returns["minion-1"].data["return"] is True
+
+    send_return(listener, jid, published_at, "minion-2", 3)
+    assert job.is_complete()
+    assert job.latencies == {"minion-1": 1, "minion-2": 3}
+    assert job.latency_stats == {"count": 2, "min": 1, "max": 3, "mean": 2, "median": 2}
+
+
+def test_returns_before_new_event(listener, jid, published_at):
+    send_return(listener, jid, published_at, "minion-1", 1)
+    job = listener.get_job(jid)
+    # Without the new event, which minions should return is not known
+    assert not job.is_complete()
+    assert job.latencies == {}
+    assert job.latency_stats == {}
+    send_new(listener, jid, published_at, ["minion-1"])
+    assert job.is_complete()
+
+
+def test_non_job_events_ignored(listener, jid, published_at):
+    listener._process_event_payload(
+        {
+            "id": "master",
+            "tag": f"salt/job/{jid}/prog/minion-1/0",
+            "data": {"_stamp": published_at.isoformat()},
+        }
+    )
+    listener._process_event_payload(
+        {"id": "master", "tag": "salt/auth", "data": {"_stamp": published_at.isoformat()}}
+    )
+    assert listener.job_tracker.jobs == {}
+
+
+def test_wait_for_job(listener, jid, published_at):
+    send_new(listener, jid, published_at, ["minion-1", "minion-2"])
+
+    def send_returns():
+        send_return(listener, jid, published_at, "minion-1", 1)
+        send_return(listener, jid, published_at, "minion-2", 2)
+
+    timer = threading.Timer(0.2, send_returns)
+    timer.start()
+    try:
+        job = listener.wait_for_job(jid, timeout=10)
+    finally:
+        timer.join()
+    assert job.is_complete()
+    assert set(job.returns) == {"minion-1", "minion-2"}
+
+
+def test_wait_for_job_timeout(listener, jid, published_at):
+    job = listener.wait_for_job(jid, timeout=0.1)
+    assert job.jid == jid
+    assert not job.is_complete()
+    send_new(listener, jid, published_at, ["minion-1", "minion-2"])
+    send_return(listener, jid, published_at, "minion-1", 1)
+    job = listener.wait_for_job(jid, timeout=0.1)
+    assert not job.is_complete()
+    assert job.pending == {"minion-2"}
+    assert listener.wait_for_job(jid, minions=["minion-1"], timeout=0.1).is_complete(
+        minions=["minion-1"]
+    )
+
+
+def test_cleanup(jid, published_at):
+    listener = EventListener(timeout=60)
+    send_new(listener, jid, published_at - timedelta(seconds=120), ["minion-1"])
+    send_new(listener, "1", published_at, ["minion-1"])
+    listener.job_tracker.cleanup()
+    assert list(listener.job_tracker.jobs) == ["1"]
@@ -620,3 +620,18 @@ def test_generate_script_only_generates_once(tmpdir):
     statinfo_2 = os.stat(script_path)
 
     assert statinfo_1 == statinfo_2
+
+
+def test_generate_script_profile(tmp_path):
+    """
+    Test the script generated with profiling support is named differently and includes the profiler.
+    """
+    script_path = cli_scripts.generate_script(tmp_path, "salt-call", profile=True)
+    assert pathlib.Path(script_path).name == "cli_salt_call_profile.py"
+    contents = pathlib.Path(script_path).read_text(encoding="utf-8")
+    profile_code = cli_scripts.SCRIPT_TEMPLATES["profile"].format(script_name="salt-call").strip()
+    assert profile_code in contents
+    assert contents.index(profile_code) < contents.index("from salt.scripts import salt_call")
+    assert "SALT_FACTORIES_PROFILE" not in pathlib.Path(
+        cli_scripts.generate_script(tmp_path, "salt-call")
+    ).read_text(encoding="utf-8")
@@ -0,0 +1,83 @@
+"""
+Test recording and replaying the salt event stream.
+"""
+import time
+
+import pytest
+
+from saltfactories.plugins.event_listener import EventListener
+from saltfactories.utils.event_recording import read_recording
+from saltfactories.utils.event_recording import replay_events
+
+
+@pytest.fixture
+def recording(tmp_path):
+    # The event listener is not started, the payloads are processed directly
+    listener = EventListener()
+    path = tmp_path / "session.events"
+    jid = "20221009113745123456"
+    with listener.recording(path) as recorder:
+        listener._process_event_payload(
+            {
+                "id": "master",
+                "tag": f"salt/job/{jid}/new",
+                "data": {"jid": jid, "minions": ["minion-1"], "_stamp": time.time()},
+            }
+        )
+        time.sleep(0.2)
+        listener._process_event_payload(
+            {
+                "id": "master",
+                "tag": f"salt/job/{jid}/ret/minion-1",
+                "data": {"jid": jid, "id": "minion-1", "return": True, "_stamp": time.time()},
+            }
+        )
+    assert recorder.count == 2
+    assert not listener.recorders
+    # Not recorded
+    listener._process_event_payload(
+        {"id": "master", "tag": "salt/test", "data": {"_stamp": time.time()}}
+    )
+    return path
+
+
+def test_read_recording(recording):
+    header, events = read_recording(recording)
+    assert header["version"] == 1
+    events = list(events)
+    assert [payload["tag"] for _, payload in events] == [
+        "salt/job/20221009113745123456/new",
+        "salt/job/20221009113745123456/ret/minion-1",
+    ]
+    assert events[1][0] - events[0][0] >= 0.2
+    assert events[0][1]["data"]["minions"] == ("minion-1",)
+
+
+def test_replay_max_speed(recording):
+    listener = EventListener()
+    start_time = time.time()
+    result = replay_events(recording, listener, speed=None)
+    assert result.events == 2
+    assert result.duration < 0.2
+    assert result.events_per_second > 0
+    job = listener.wait_for_job("20221009113745123456", timeout=0)
+    assert job.is_complete()
+    # The stamps were rebased, the events are not expired
+    matched = listener.get_events([("master", "salt/job/*")], after_time=start_time)
+    assert len(matched) == 2
+
+
+def test_replay_recorded_pace(recording):
+    listener = EventListener()
+    result = replay_events(recording, listener, speed=1.0)
+    assert result.events == 2
+    assert result.duration >= 0.2
+    job = listener.get_job("20221009113745123456")
+    assert job.latencies["minion-1"] == pytest.approx(0.2, abs=0.1)
+
+
+def test_replay_not_a_recording(tmp_path):
+    path = tmp_path / "foo.events"
+    path.write_bytes(b"")
+    with pytest.raises(ValueError, match="is not a supported salt events recording"):
+        read_recording(path)
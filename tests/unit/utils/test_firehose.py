@@ -0,0 +1,47 @@
+"""
+Test the event listener load generator.
+"""
+import pytest
+
+from saltfactories.utils.firehose import Firehose
+from saltfactories.utils.firehose import FirehoseResult
+
+
+def test_run_count(event_firehose):
+    result = event_firehose.run(connections=3, count=200, payload_size=64)
+    assert result.sent == 600
+    assert result.received == 600
+    assert result.dropped == 0
+    assert len(result.latencies) == 600
+    assert 0 <= result.p50 <= result.p99
+    assert result.throughput > 0
+    assert "Dropped:    0" in result.summary()
+
+
+def test_run_rate(event_firehose):
+    result = event_firehose.run(connections=2, rate=100, duration=1)
+    assert 150 <= result.sent <= 210
+    assert result.duration >= 0.9
+    assert result.dropped == 0
+
+
+def test_no_event_listener(event_firehose):
+    firehose = Firehose(host=event_firehose.host, port=event_firehose.port)
+    result = firehose.run(count=10)
+    assert result.sent == 10
+    assert result.received is None
+    assert result.dropped is None
+    assert not result.latencies
+    assert "Received" not in result.summary()
+
+
+def test_address_required():
+    with pytest.raises(ValueError, match="Either pass 'event_listener' or both 'host' and 'port'"):
+        Firehose(host="127.0.0.1")
+
+
+def test_percentiles():
+    result = FirehoseResult(sent=100, duration=1, received=100, latencies=list(range(1, 101)))
+    assert result.p50 == pytest.approx(50.5)
+    assert result.p99 == pytest.approx(99.01)
+    assert FirehoseResult(sent=0, duration=0).p50 is None
@@ -0,0 +1,82 @@
+"""
+Test saltfactories.utils.jsonstream.
+"""
+import json
+
+import pytest
+
+from saltfactories.utils import jsonstream
+
+
+@pytest.fixture
+def documents():
+    return [
+        {"minion-1": {"foo": "}\n{", "bar": [1, 2, {"baz": None}]}},
+        {"minion-2": 'An escaped quote \\" and a backslash \\\\'},
+        {"minion-3": True},
+        "A bare string",
+        [1, 2, 3],
+    ]
+
+
+@pytest.fixture(params=(None, 0, 4), ids=("no-indent", "indent-0", "indent-4"))
+def stream(request, documents):
+    return "\n".join(json.dumps(document, indent=request.param) for document in documents) + "\n"
+
+
+def test_decode_documents(stream, documents):
+    assert jsonstream.decode_documents(stream) == documents
+
+
+@pytest.mark.parametrize("chunk_size", (1, 2, 7, 64))
+def test_feed_chunks(stream, documents, chunk_size):
+    decoder = jsonstream.JSONStreamDecoder()
+    decoded = []
+    for idx in range(0, len(stream), chunk_size):
+        decoded.extend(decoder.feed(stream[idx : idx + chunk_size]))
+    decoded.extend(decoder.close())
+    assert decoded == documents
+
+
+def test_documents_yielded_as_soon_as_complete():
+    decoder = jsonstream.JSONStreamDecoder()
+    assert decoder.feed('{\n"minion-1": true\n}\n{\n"minion-2": ') == [{"minion-1": True}]
+    assert decoder.feed("false\n") == []
+    assert decoder.feed("}") == [{"minion-2": False}]
+    assert decoder.close() == []
+
+
+def test_bare_scalars():
+    assert jsonstream.decode_documents("1 2.5 true null") == [1, 2.5, True, None]
+
+
+def test_empty():
+    assert jsonstream.decode_documents("") == []
+    assert jsonstream.decode_documents(" \n ") == []
+
+
+@pytest.mark.parametrize(
+    "data",
+    (
+        "No minions matched the target.",
+        '{"minion-1": ',
+        '"unterminated',
+        "{]",
+    ),
+)
+def test_invalid(data):
+    with pytest.raises(ValueError):
+        jsonstream.decode_documents(data)
+
+
+def test_loads_falls_back_to_json():
+    # orjson, when installed, refuses to decode these
+    assert jsonstream.loads(str(2**70)) == 2**70
+    assert jsonstream.loads('{"a": NaN}')["a"] != 0
+
+
+def test_skip_invalid():
+    decoder = jsonstream.JSONStreamDecoder(skip_invalid=True)
+    data = 'No minions matched the target.\n{\n"minion-1": true\n}\n{"minion-2": '
+    assert decoder.feed(data) == [{"minion-1": True}]
+    assert decoder.close() == []
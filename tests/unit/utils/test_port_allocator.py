@@ -0,0 +1,80 @@
+"""
+Test the port allocator.
+"""
+import contextlib
+import socket
+
+import pytest
+
+from saltfactories.utils import port_allocator
+from saltfactories.utils.port_allocator import PortAllocator
+
+
+@pytest.fixture
+def bound_port():
+    with contextlib.closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as sock:
+        sock.bind(("127.0.0.1", 0))
+        sock.listen()
+        yield sock.getsockname()[1]
+
+
+def test_contiguous_blocks():
+    allocator = PortAllocator(block_size=10, port_range=(30000, 30100), worker_index=0, worker_count=1)
+    ports = allocator.get_ports(15)
+    assert len(set(ports)) == 15
+    first_block, second_block = allocator.blocks
+    assert ports[:10] == list(range(*first_block))
+    assert ports[10:] == list(range(second_block[0], second_block[0] + 5))
+    for start, end in allocator.blocks:
+        assert 30000 <= start < end <= 30100
+        assert (start - 30000) % 10 == 0
+    assert all(allocator.is_allocated(port) for port in ports)
+    assert not allocator.is_allocated(30100)
+
+
+@pytest.mark.parametrize("worker_index", [0, 1, 2, 3])
+def test_worker_stripes(worker_index):
+    allocator = PortAllocator(
+        block_size=10, port_range=(30000, 30400), worker_index=worker_index, worker_count=4
+    )
+    start = 30000 + worker_index * 100
+    assert allocator.stripe == (start, start + 100)
+    assert all(start <= port < start + 100 for port in allocator.get_ports(100))
+
+
+def test_worker_from_environment(monkeypatch):
+    monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw2")
+    monkeypatch.setenv("PYTEST_XDIST_WORKER_COUNT", "4")
+    allocator = PortAllocator(port_range=(30000, 30400))
+    assert allocator.stripe == (30200, 30300)
+
+
+def test_reuses_blocks_when_exhausted():
+    allocator = PortAllocator(block_size=10, port_range=(30000, 30020), worker_index=0, worker_count=1)
+    ports = allocator.get_ports(30)
+    assert set(ports) == set(range(30000, 30020))
+
+
+def test_port_range_outside_ephemeral_range(monkeypatch):
+    monkeypatch.setattr(port_allocator, "get_ephemeral_port_range", lambda: (32768, 60999))
+    assert port_allocator.get_port_range() == (port_allocator.MIN_PORT, 32768)
+    monkeypatch.setattr(port_allocator, "get_ephemeral_port_range", lambda: (1024, 49151))
+    assert port_allocator.get_port_range() == (49152, 65536)
+
+
+def test_bindable_port(bound_port):
+    allocator = PortAllocator(port_range=(bound_port, bound_port + 2), worker_index=0, worker_count=1)
+    assert port_allocator.is_port_in_use(bound_port)
+    # A single block, starting at the bound port, which is skipped
+    assert allocator.get_bindable_port() == bound_port + 1
+
+
+def test_resolve_conflicts(bound_port):
+    allocator = PortAllocator(port_range=(bound_port, bound_port + 3), worker_index=0, worker_count=1)
+    ret_port, publish_port = allocator.get_ports(2)
+    assert ret_port == bound_port
+    replacements = allocator.resolve_conflicts(
+        {"ret_port": ret_port, "publish_port": publish_port, "master_port": 4506}
+    )
+    # Only the allocated port something is bound to is replaced
+    assert replacements == {"ret_port": bound_port + 2}
@@ -0,0 +1,95 @@
+"""
+Test the resource sampler.
+"""
+import csv
+import json
+import subprocess
+import sys
+import time
+
+import psutil
+import pytest
+from pytestsysstats.plugin import StatsProcesses
+
+from saltfactories.utils.resource_sampler import ResourceSampler
+
+
+@pytest.fixture
+def process():
+    # A process with a child process
+    code = "import subprocess, sys; subprocess.run([sys.executable, '-c', 'import time; time.sleep(30)'])"
+    proc = subprocess.Popen([sys.executable, "-c", code])  # noqa: S603
+    try:
+        timeout_at = time.time() + 10
+        while not psutil.Process(proc.pid).children() and time.time() < timeout_at:
+            time.sleep(0.1)
+        yield proc
+    finally:
+        for child in psutil.Process(proc.pid).children(recursive=True):
+            child.kill()
+        proc.kill()
+        proc.wait()
+
+
+def test_sample(process):
+    sampler = ResourceSampler()
+    sampler.add("Daemon", process.pid)
+    (sample,) = sampler.sample()
+    assert sample["process"] == "Daemon"
+    assert sample["test"] == ""
+    assert sample["children"] == 1
+    assert sample["rss"] > 0
+    assert sample["threads"] >= 2
+    if not sys.platform.startswith("win"):
+        assert sample["fds"] > 0
+
+
+def test_exited_process_is_skipped():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])  # noqa: S603
+    sampler = ResourceSampler()
+    sampler.add("Daemon", proc.pid)
+    proc.wait()
+    assert sampler.sample() == []
+
+
+def test_per_test_summary(process):
+    sampler = ResourceSampler()
+    sampler.add("Daemon", process.pid)
+    sampler.start_test("test_foo")
+    sampler.sample()
+    sampler.sample()
+    sampler.finish_test("test_foo")
+    # Not attributed to any test
+    sampler.sample()
+    summary = sampler.summary()
+    assert list(summary) == ["test_foo"]
+    assert summary["test_foo"]["Daemon"]["samples"] == 2
+    assert summary["test_foo"]["Daemon"]["children_max"] == 1
+    ((test, name, _),) = sampler.top("rss_growth")
+    assert (test, name) == ("test_foo", "Daemon")
+
+
+def test_session_files(process, tmp_path):
+    path = tmp_path / "resources" / "session.csv"
+    with ResourceSampler(path=path, interval=0.1) as sampler:
+        sampler.add("Daemon", process.pid)
+        sampler.start_test("test_foo")
+        time.sleep(0.5)
+        sampler.finish_test("test_foo")
+    with path.open(newline="", encoding="utf-8") as rfh:
+        rows = list(csv.DictReader(rfh))
+    assert len(rows) >= 3
+    assert {row["process"] for row in rows} == {"Daemon"}
+    assert "test_foo" in {row["test"] for row in rows}
+    summary = json.loads(sampler.summary_path.read_text())
+    assert summary["test_foo"]["Daemon"]["samples"] >= 3
+
+
+def test_forwards_to_stats_processes(process):
+    stats_processes = StatsProcesses()
+    sampler = ResourceSampler(stats_processes=stats_processes)
+    sampler.add("Daemon", process.pid)
+    assert stats_processes.processes["Daemon"].pid == process.pid
+    sampler.remove("Daemon")
+    assert "Daemon" not in stats_processes.processes
+    assert list(sampler) == []
@@ -0,0 +1,63 @@
+"""
+Test the topology aware test ordering.
+"""
+import attr
+import pytest
+
+from saltfactories.utils import topology
+
+
+@attr.s(frozen=True)
+class FakeItem:
+    name = attr.ib()
+    topology = attr.ib(default=None)
+    args = attr.ib(default=None)
+
+    def get_closest_marker(self, name):
+        assert name == topology.MARKER_NAME
+        if self.args is None:
+            return None
+        return pytest.mark.salt_factories_topology(*self.args).mark
+
+
+@pytest.mark.parametrize(
+    "args,expected",
+    [
+        (None, None),
+        ((), None),
+        (("salt_minion", "salt_master"), "salt_master,salt_minion"),
+        (("salt_master", "salt_master"), "salt_master"),
+    ],
+)
+def test_get_topology(args, expected):
+    assert topology.get_topology(FakeItem("test", args=args)) == expected
+
+
+def test_count_starts():
+    assert topology.count_starts(["a", "a", None, "a", "b", "a", None]) == {"a": 3, "b": 1}
+
+
+def test_reorder():
+    items = [
+        FakeItem("1", "a"),
+        FakeItem("2"),
+        FakeItem("3", "b"),
+        FakeItem("4", "a"),
+        FakeItem("5"),
+        FakeItem("6", "b"),
+        FakeItem("7", "a"),
+    ]
+    reordered = topology.reorder(items, get_topology_func=lambda item: item.topology)
+    assert [item.name for item in reordered] == ["1", "4", "7", "2", "3", "6", "5"]
+    assert topology.count_starts([item.topology for item in reordered]) == {"a": 1, "b": 1}
+
+
+def test_estimate_savings():
+    saved_starts, saved_seconds, unknown = topology.estimate_savings(
+        {"a": 3, "b": 2, "c": 1}, {"a": 1, "b": 1, "c": 1}, {"a": 1.5}
+    )
+    assert saved_starts == 3
+    assert saved_seconds == 3.0
+    assert unknown == ["b"]
+    assert topology.estimate_savings({"a": 2}, {"a": 1}, {}) == (1, None, ["a"])
+    assert topology.estimate_savings({"a": 1}, {"a": 1}, {"a": 1.5}) == (0, None, [])
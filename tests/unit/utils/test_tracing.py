@@ -0,0 +1,93 @@
+"""
+Test the lifecycle tracing.
+"""
+import json
+import time
+
+import attr
+import pytest
+
+from saltfactories.utils import tracing
+
+
+@pytest.fixture
+def tracer():
+    return tracing.Tracer(enabled=True)
+
+
+def test_disabled_records_nothing():
+    tracer = tracing.Tracer()
+    with tracer.span("start", track="master"):
+        pass
+    tracer.instant("engine connected", track="master")
+    assert len(tracer) == 0
+
+
+def test_span(tracer):
+    with tracer.span("start", track="master", attempt=1):
+        time.sleep(0.01)
+    (event,) = tracer.to_dict()["traceEvents"][-1:]
+    assert event["name"] == "start"
+    assert event["ph"] == "X"
+    assert event["dur"] >= 10000
+    assert event["args"] == {"attempt": 1}
+
+
+def test_span_error(tracer):
+    with pytest.raises(RuntimeError):
+        with tracer.span("start", track="master"):
+            raise RuntimeError
+    (event,) = tracer.to_dict()["traceEvents"][-1:]
+    assert event["args"] == {"error": "RuntimeError"}
+
+
+def test_tracks(tracer):
+    with tracer.span("start", track="master"):
+        pass
+    tracer.instant("engine connected", track="minion")
+    trace = tracer.to_dict()
+    tracks = {
+        event["args"]["name"]: event["tid"]
+        for event in trace["traceEvents"]
+        if event["name"] == "thread_name"
+    }
+    assert tracks == {"master": 1, "minion": 2}
+    events = [event for event in trace["traceEvents"] if event["ph"] != "M"]
+    # Sorted by when they started
+    assert [(event["name"], event["tid"]) for event in events] == [
+        ("start", 1),
+        ("engine connected", 2),
+    ]
+
+
+def test_instant_wall_time(tracer):
+    tracer.instant("start event", track="master", wall_time=time.time() - 1)
+    tracer.instant("now", track="master")
+    started, now = (event for event in tracer.to_dict()["traceEvents"] if event["ph"] == "i")
+    assert now["ts"] - started["ts"] == pytest.approx(1000000, abs=50000)
+
+
+def test_write(tracer, tmp_path):
+    with tracer.span("configure", track="master"):
+        pass
+    path = tracer.write(tmp_path / "trace" / "session.json")
+    trace = json.loads(path.read_text())
+    assert trace["displayTimeUnit"] == "ms"
+    assert [event["name"] for event in trace["traceEvents"] if event["ph"] == "X"] == ["configure"]
+
+
+def test_traced(monkeypatch, tracer):
+    monkeypatch.setattr(tracing, "tracer", tracer)
+
+    @attr.s(kw_only=True)
+    class Factory:
+        id = attr.ib()
+
+        @tracing.traced("start")
+        def start(self):
+            return True
+
+    assert Factory(id="minion-1").start() is True
+    (event,) = (event for event in tracer.to_dict()["traceEvents"] if event["ph"] == "X")
+    assert event["name"] == "start"
+    assert tracing.track_name(Factory(id="minion-1")) == "minion-1"